@@ -1,5 +1,9 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, make_response
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
+from werkzeug.middleware.proxy_fix import ProxyFix
+from functools import partial
+import hmac
 import sys
 import os
 
@@ -7,68 +11,106 @@ import os
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
-import joblib
-import numpy as np
-from deep_translator import GoogleTranslator
-import langdetect
-from textblob import TextBlob
-from scipy import sparse
-from scripts.utils import preprocess_text
+from scripts.inference import analyze_article, google_translate
+from scripts.limits import SizePolicy
+from scripts.quantize import compact_bundle
+from scripts.bundles import ModelManager, BundleError, activate_version, current_version, list_versions
+from scripts.dedup import NearDuplicateIndex
+from scripts.native import analyze_native
+from scripts.profiling import RequestProfiler, SORT_KEYS, aggregate, list_profiles
+from scripts.feedback import FeedbackStore, parse_label
+from scripts.admission import AdmissionController, Rejected, needs_translation
+from scripts.deadline import Deadline, TranslationGuard
+from scripts.fields import parse_fields, select_fields
+from scripts.warmup import warm_up
 
 app = Flask(__name__)
 CORS(app)
 
-# Global variables for loaded models
-model = None
-word_vectorizer = None
-char_vectorizer = None
-scaler = None
-feature_names = None
-metadata = None
-
-def load_models():
-    """Load ML models into memory"""
-    global model, word_vectorizer, char_vectorizer, scaler, feature_names, metadata
-    try:
-        model = joblib.load("models/news_svm_calibrated.pkl")
-        word_vectorizer = joblib.load("models/tfidf_word.pkl")
-        char_vectorizer = joblib.load("models/tfidf_char.pkl")
-        scaler = joblib.load("models/num_scaler.pkl")
-        feature_names = joblib.load("models/feature_names.pkl")
-        metadata = joblib.load("models/model_metadata.pkl")
-        print("Models loaded successfully!")
+# Reverse proxies in front of the app (e.g. the platform router) whose X-Forwarded-For
+# entry is trusted for request.remote_addr. Off by default, so a client connecting
+# directly cannot pick its own address; the Procfile sets it for the platform router
+trusted_proxies = int(os.environ.get('SATYASCAN_TRUSTED_PROXIES', 0))
+if trusted_proxies > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies)
+
+# Bounds on request size and on how much text each pipeline stage sees
+size_policy = SizePolicy.from_env()
+app.config['MAX_CONTENT_LENGTH'] = size_policy.max_request_bytes
+
+# Word-only model answers alone when at least this confident (unset or 0 disables the cascade)
+cascade_threshold = float(os.environ.get('SATYASCAN_CASCADE_THRESHOLD', 0)) or None
+
+# 'translate' (translate non-English text, then classify) or 'native' (score the original text)
+scoring_mode = os.environ.get('SATYASCAN_SCORING_MODE', 'translate')
+
+# Profiles a sample of /api/analyze requests when SATYASCAN_PROFILE_RATE is set
+request_profiler = RequestProfiler.from_env()
+
+# Recently analyzed articles, so lightly edited reposts reuse the stored verdict
+duplicate_index = NearDuplicateIndex.from_env()
+
+# Reviewer verdicts, folded into the model by `python scripts/feedback.py update`
+feedback_store = FeedbackStore.from_env()
+
+# Per-worker concurrency pools and optional per-client rate limit for /api/analyze
+admission = AdmissionController.from_env()
+
+# Time budget per /api/analyze request (0 disables it) and the part kept for local scoring
+request_budget = float(os.environ.get('SATYASCAN_REQUEST_BUDGET_MS', 8000)) / 1000
+scoring_reserve = float(os.environ.get('SATYASCAN_SCORING_RESERVE_MS', 500)) / 1000
+
+# Bounds translator calls by the request deadline and stops calling a failing translator
+translation_guard = TranslationGuard.from_env(google_translate)
+
+def _prepare_bundle(bundle):
+    """Apply the configured inference precision to a freshly loaded bundle"""
+    precision = os.environ.get('SATYASCAN_PRECISION', 'float64')
+    if precision != 'float64':
+        print(f"Using {precision} inference")
+    return compact_bundle(bundle, precision)
+
+# The active model bundle; swapped atomically when a new version is activated
+model_manager = ModelManager("models", prepare=_prepare_bundle,
+                             warm=partial(warm_up, mode=scoring_mode, cascade_threshold=cascade_threshold))
+
+def load_models(background=None):
+    """Load and warm up the current model version, then watch for new versions.
+
+    With background (or SATYASCAN_BACKGROUND_LOAD=1) this returns at once and
+    /api/ready stays false until warmup has finished.
+    """
+    if background is None:
+        background = os.environ.get('SATYASCAN_BACKGROUND_LOAD') == '1'
+    interval = float(os.environ.get('SATYASCAN_RELOAD_INTERVAL', 5))
+    if background:
+        model_manager.reload_async()
+        model_manager.watch(interval)
         return True
-    except Exception as e:
-        print(f"Error loading models: {str(e)}")
-        return False
-
-def extract_numeric_features(text, is_non_english):
-    """Extract numeric features matching the trained model"""
-    text = str(text)
-    blob = TextBlob(text)
-    length = len(text)
-    word_count = len(text.split())
-    avg_word_length = length / (word_count + 1)
-    capitals_ratio = sum(1 for c in text if c.isupper()) / (length + 1)
-    numbers_ratio = sum(c.isdigit() for c in text) / (length + 1)
-    sentiment = blob.sentiment.polarity
-    subjectivity = blob.sentiment.subjectivity
-    exclamations = text.count('!')
-    questions = text.count('?')
-    quotes = text.count('"') + text.count("'")
-    return {
-        'length': length,
-        'word_count': word_count,
-        'avg_word_length': avg_word_length,
-        'capitals_ratio': capitals_ratio,
-        'numbers_ratio': numbers_ratio,
-        'sentiment': sentiment,
-        'subjectivity': subjectivity,
-        'exclamations': exclamations,
-        'questions': questions,
-        'quotes': quotes,
-        'is_non_english': 1 if is_non_english else 0
-    }
+    loaded = model_manager.load()
+    if loaded:
+        warmup = model_manager.active.warmup
+        print(f"Models loaded successfully! Warmup took {warmup['seconds']:.2f}s")
+        model_manager.watch(interval)
+    return loaded
+
+def _token_matches(variable, header):
+    """True when the header carries the token in the environment; an unset token denies every request"""
+    token = os.environ.get(variable)
+    return bool(token) and hmac.compare_digest(request.headers.get(header, '').encode(), token.encode())
+
+def _admin_allowed():
+    return _token_matches('SATYASCAN_ADMIN_TOKEN', 'X-Admin-Token')
+
+def _reviewer_allowed():
+    return _token_matches('SATYASCAN_FEEDBACK_TOKEN', 'X-Feedback-Token')
+
+def _client_key():
+    """Rate-limit key: X-Client-Id only from callers holding SATYASCAN_CLIENT_TOKEN, else the client address"""
+    client_id = request.headers.get('X-Client-Id')
+    if client_id and _token_matches('SATYASCAN_CLIENT_TOKEN', 'X-Client-Token'):
+        return f"id:{client_id}"
+    return request.remote_addr
 
 @app.route('/')
 def index():
@@ -78,103 +120,201 @@ def index():
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
     """API endpoint for fake news detection"""
+    data = request.get_json(silent=True) or {}
+    deadline = Deadline(request_budget, scoring_reserve) if request_budget > 0 else None
+    pool = 'translate' if needs_translation(str(data.get('text') or ''), data.get('language', 'auto'),
+                                            data.get('mode', scoring_mode), bool(data.get('translate'))) else 'local'
+    try:
+        with admission.admit(pool, _client_key()):
+            return _profiled_analyze(data, deadline)
+    except Rejected as e:
+        response = jsonify({'error': 'Server busy, retry later', 'reason': e.reason})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response
+
+def _profiled_analyze(data, deadline):
+    if request_profiler is None or not request_profiler.sample():
+        return _analyze(deadline)
+    metadata = {
+        'text_length': len(data.get('text') or ''),
+        'language': data.get('language', 'auto'),
+        'mode': data.get('mode', scoring_mode),
+    }
+    with request_profiler.profile(metadata):
+        response = make_response(_analyze(deadline))
+        body = response.get_json(silent=True) or {}
+        metadata.update(status=response.status_code, model_version=body.get('model_version'),
+                        detected_language=body.get('detected_language'))
+    return response
+
+def _analyze(deadline=None):
     try:
         data = request.json
         text = data.get('text', '').strip()
         language = data.get('language', 'auto')
+        mode = data.get('mode', scoring_mode)
+        
+        if mode not in ('translate', 'native'):
+            return jsonify({'error': f"Unknown mode: {mode}"}), 400
+        
+        try:
+            fields = parse_fields(data.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
-        if model is None:
+        if size_policy.too_large(text):
+            return jsonify({
+                'error': f'Text too long ({len(text)} characters, limit {size_policy.max_text_chars})'
+            }), 413
+        
+        # Read the active bundle once so a concurrent swap cannot mix versions
+        bundle = model_manager.active
+        if bundle is None:
             return jsonify({
                 'error': 'Models not loaded. Please train the models first by running: python scripts/model_training.py'
             }), 503
         
-        # Detect language and translate if needed
-        original_text = text
-        translated_text = text
-        detected_lang = 'en'
-        is_non_english = False
-        
-        try:
-            if language == 'auto':
-                detected_lang = langdetect.detect(text)
-            else:
-                detected_lang = language
-            
-            if detected_lang not in ['en', 'english']:
-                is_non_english = True
-                translator = GoogleTranslator(source=detected_lang, target='en')
-                translated_text = translator.translate(text)
-        except Exception as e:
-            print(f"Translation error: {e}")
-            translated_text = text
-        
-        # Preprocess text
-        cleaned_text, _ = preprocess_text(translated_text)
-        
-        # Extract numeric features
-        num_features = extract_numeric_features(translated_text, is_non_english)
-        num_array = np.array([[num_features[col] for col in metadata.num_feature_columns]])
+        # Versions trained before the native model fall back to translate-then-classify
+        if mode == 'native' and bundle.get('native_model') is None:
+            mode = 'translate'
+        enrich = bool(data.get('translate', False))
         
-        # Transform text features
-        word_features = word_vectorizer.transform([cleaned_text])
-        char_features = char_vectorizer.transform([cleaned_text])
+        # Reuse the verdict of a near-duplicate scored by the same model version and mode
+        dedup_key = (bundle.version, language, mode, enrich, fields)
+        if duplicate_index is not None:
+            dedup_text = size_policy.analysis_text(text)
+            cached, similarity, signature = duplicate_index.lookup(dedup_text, dedup_key)
+            if cached is not None:
+                cached['near_duplicate'] = {'similarity': similarity}
+                return jsonify(select_fields(cached, fields))
         
-        # Scale numerical features
-        num_scaled = scaler.transform(num_array)
-        
-        # Combine features (sparse)
-        X_combined = sparse.hstack([word_features, char_features, num_scaled]).tocsr()
-        
-        # Make prediction
-        prediction = model.predict(X_combined)[0]
-        probabilities = model.predict_proba(X_combined)[0]
-        confidence = probabilities[1] if prediction == 1 else probabilities[0]
-        
-        # Try to derive feature importance
-        top_features = []
-        try:
-            calibrated = model.calibrated_classifiers_[0]
-            base_estimator = getattr(calibrated, 'base_estimator', None) or getattr(calibrated, 'base_estimator_', None)
-            if base_estimator is not None and hasattr(base_estimator, 'coef_'):
-                coef = base_estimator.coef_[0]
-                feature_importance = np.abs(coef)
-                top_indices = np.argsort(feature_importance)[-5:][::-1]
-                top_features = [(feature_names[i], float(coef[i])) for i in top_indices]
-        except Exception:
-            top_features = []
-        
-        # Add sentiment analysis
-        sentiment_info = {
-            'sentiment': float(num_features['sentiment']),
-            'subjectivity': float(num_features['subjectivity'])
-        }
+        translate = translation_guard.bind(deadline) if deadline is not None else google_translate
+        if mode == 'native':
+            result = analyze_native(bundle, text, language, policy=size_policy,
+                                    translate=translate if enrich else None, deadline=deadline, fields=fields)
+        else:
+            result = analyze_article(bundle, text, language, policy=size_policy, translate=translate,
+                                     cascade_threshold=cascade_threshold, deadline=deadline, fields=fields)
+        if result['model_stage'] == 'unsupported':
+            return jsonify({
+                'error': f"Unsupported language ({result['detected_language']}) and no translation available",
+                'detected_language': result['detected_language'],
+                'model_stage': 'unsupported',
+                'degraded_reasons': result['degraded_reasons'],
+            }), 422
+        result['model_version'] = bundle.version
+        result['near_duplicate'] = None
         
-        result = {
-            'is_fake': bool(prediction == 0),
-            'confidence': float(confidence),
-            'top_features': top_features,
-            'translation': translated_text if translated_text != original_text else None,
-            'sentiment': sentiment_info,
-            'detected_language': detected_lang
-        }
+        # Degraded verdicts are not reused for later reposts
+        if duplicate_index is not None and not result['degraded']:
+            duplicate_index.add(dedup_text, result, dedup_key, signature)
         
-        return jsonify(result)
+        return jsonify(select_fields(result, fields))
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in analyze endpoint: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.errorhandler(413)
+def request_too_large(error):
+    """Reject oversized request bodies before they are parsed"""
+    return jsonify({'error': f'Request too large (limit {size_policy.max_request_bytes} bytes)'}), 413
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    return jsonify({
+    status = {
         'status': 'healthy',
-        'models_loaded': model is not None
+        'models_loaded': model_manager.active is not None
+    }
+    status.update(model_manager.status())
+    status['dedup'] = duplicate_index.stats() if duplicate_index is not None else None
+    status['admission'] = admission.stats()
+    status['translator'] = translation_guard.stats()
+    return jsonify(status)
+
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 200 only after the models are loaded and warmed up"""
+    warmup = model_manager.active.warmup if model_manager.ready else None
+    return jsonify({
+        'ready': model_manager.ready,
+        'model_version': model_manager.version,
+        'loading_version': model_manager.loading,
+        'warmup': warmup
+    }), 200 if model_manager.ready else 503
+
+@app.route('/api/feedback', methods=['POST'])
+def feedback():
+    """Record a reviewer's verdict for an article (a correction or a confirmation)"""
+    if not _reviewer_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    data = request.get_json(silent=True) or {}
+    text = (data.get('text') or '').strip()
+    if not text:
+        return jsonify({'error': 'No text provided'}), 400
+    if size_policy.too_large(text):
+        return jsonify({
+            'error': f'Text too long ({len(text)} characters, limit {size_policy.max_text_chars})'
+        }), 413
+    try:
+        label = parse_label(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    record = feedback_store.add(text, label, language=data.get('language', 'auto'),
+                                model_version=data.get('model_version'), predicted=data.get('predicted'),
+                                reviewer=data.get('reviewer'))
+    return jsonify({'id': record['id'], 'label': 'real' if label else 'fake'}), 201
+
+@app.route('/api/admin/reload', methods=['POST'])
+def admin_reload():
+    """Activate a version (or re-read models/CURRENT) and load it in the background"""
+    if not _admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    version = (request.get_json(silent=True) or {}).get('version')
+    # Only published versions; the name is used as a path under models/versions/
+    if version and version not in [m['version'] for m in list_versions("models")]:
+        return jsonify({'error': f"Unknown model version: {version}"}), 400
+    try:
+        if version:
+            activate_version("models", version)
+    except BundleError as e:
+        return jsonify({'error': str(e)}), 400
+    model_manager.reload_async(version)
+    return jsonify({'reloading': version or current_version("models")}), 202
+
+@app.route('/api/admin/profiles', methods=['GET'])
+def admin_profiles():
+    """List stored request profiles and aggregate their hottest functions"""
+    if not _admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    directory = request_profiler.directory if request_profiler is not None else os.environ.get('SATYASCAN_PROFILE_DIR', 'profiles')
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in SORT_KEYS:
+        return jsonify({'error': f"sort must be one of {', '.join(SORT_KEYS)}"}), 400
+    return jsonify({
+        'profiler': request_profiler.status() if request_profiler is not None else None,
+        'profiles': list_profiles(directory),
+        'aggregate': aggregate(directory, top=request.args.get('top', 25, type=int), sort=sort)
     })
 
+@app.route('/api/admin/rollback', methods=['POST'])
+def admin_rollback():
+    """Reactivate the previous version for every worker"""
+    if not _admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    try:
+        loaded = model_manager.rollback()
+    except BundleError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'model_version': model_manager.version, 'loaded': loaded})
+
 if __name__ == '__main__':
     print("Loading ML models...")
     models_loaded = load_models()
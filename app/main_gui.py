@@ -6,143 +6,155 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                            QTextEdit, QPushButton, QLabel, QProgressBar, QComboBox)
+import itertools
+import queue
+import threading
+
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+                            QTextEdit, QPushButton, QLabel, QProgressBar, QComboBox, QFileDialog)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
-import joblib
-import numpy as np
-from deep_translator import GoogleTranslator
-import langdetect
-from textblob import TextBlob
-from scipy import sparse
-from scripts.utils import preprocess_text
+from scripts.inference import load_bundle, analyze_article, predict_batch
+
+def load_models(models_dir="models"):
+    """Load every model artifact once"""
+    print("Loading ML models...")
+    models = load_bundle(models_dir)
+    print("Models loaded successfully!")
+    return models
 
-def extract_numeric_features(text, is_non_english):
-    """Extract numeric features matching the trained model"""
-    text = str(text)
-    blob = TextBlob(text)
-    length = len(text)
-    word_count = len(text.split())
-    avg_word_length = length / (word_count + 1)
-    capitals_ratio = sum(1 for c in text if c.isupper()) / (length + 1)
-    numbers_ratio = sum(c.isdigit() for c in text) / (length + 1)
-    sentiment = blob.sentiment.polarity
-    subjectivity = blob.sentiment.subjectivity
-    exclamations = text.count('!')
-    questions = text.count('?')
-    quotes = text.count('"') + text.count("'")
-    return {
-        'length': length,
-        'word_count': word_count,
-        'avg_word_length': avg_word_length,
-        'capitals_ratio': capitals_ratio,
-        'numbers_ratio': numbers_ratio,
-        'sentiment': sentiment,
-        'subjectivity': subjectivity,
-        'exclamations': exclamations,
-        'questions': questions,
-        'quotes': quotes,
-        'is_non_english': 1 if is_non_english else 0
-    }
+_shared_models = None
+_shared_models_lock = threading.Lock()
+
+def get_shared_models():
+    """Return the process-wide models, loading them on first use"""
+    global _shared_models
+    with _shared_models_lock:
+        if _shared_models is None:
+            _shared_models = load_models()
+        return _shared_models
 
 class DetectionThread(QThread):
+    """One-shot analysis thread; reuses the shared preloaded models"""
     finished = pyqtSignal(dict)
     error = pyqtSignal(str)
     
-    def __init__(self, text, language='auto'):
+    def __init__(self, text, language='auto', models=None):
         super().__init__()
         self.text = text
         self.language = language
+        self.models = models
         
     def run(self):
         try:
-            # Load models
-            print("Loading ML models...")
-            model = joblib.load("models/news_svm_calibrated.pkl")
-            word_vectorizer = joblib.load("models/tfidf_word.pkl")
-            char_vectorizer = joblib.load("models/tfidf_char.pkl")
-            scaler = joblib.load("models/num_scaler.pkl")
-            feature_names = joblib.load("models/feature_names.pkl")
-            metadata = joblib.load("models/model_metadata.pkl")
-            print("Models loaded successfully!")
-            
-            # Detect language and translate if needed
-            original_text = self.text
-            translated_text = self.text
-            detected_lang = 'en'
-            is_non_english = False
-            
-            try:
-                if self.language == 'auto':
-                    detected_lang = langdetect.detect(self.text)
-                else:
-                    detected_lang = self.language
-                
-                if detected_lang not in ['en', 'english']:
-                    is_non_english = True
-                    translator = GoogleTranslator(source=detected_lang, target='en')
-                    translated_text = translator.translate(self.text)
-            except Exception as e:
-                print(f"Translation error: {e}")
-                translated_text = self.text
-            
-            # Preprocess text
-            cleaned_text, _ = preprocess_text(translated_text)
-            
-            # Extract numeric features
-            num_features = extract_numeric_features(translated_text, is_non_english)
-            num_array = np.array([[num_features[col] for col in metadata.num_feature_columns]])
-            
-            # Transform text features
-            word_features = word_vectorizer.transform([cleaned_text])
-            char_features = char_vectorizer.transform([cleaned_text])
-            
-            # Scale numerical features
-            num_scaled = scaler.transform(num_array)
-            
-            # Combine features (sparse)
-            X_combined = sparse.hstack([word_features, char_features, num_scaled]).tocsr()
-            
-            # Make prediction
-            prediction = model.predict(X_combined)[0]
-            probabilities = model.predict_proba(X_combined)[0]
-            confidence = probabilities[1] if prediction == 1 else probabilities[0]
-            
-            # Try to derive feature importance from the underlying LinearSVC; if unavailable, fall back gracefully
-            top_features = []
-            try:
-                calibrated = model.calibrated_classifiers_[0]
-                base_estimator = getattr(calibrated, 'base_estimator', None) or getattr(calibrated, 'base_estimator_', None)
-                if base_estimator is not None and hasattr(base_estimator, 'coef_'):
-                    coef = base_estimator.coef_[0]
-                    feature_importance = np.abs(coef)
-                    top_indices = np.argsort(feature_importance)[-5:][::-1]
-                    top_features = [(feature_names[i], coef[i]) for i in top_indices]
-            except Exception:
-                top_features = []
-            # top_features already computed if coefficients were available; otherwise remains empty
-            
-            # Add sentiment analysis
-            sentiment_info = {
-                'sentiment': num_features['sentiment'],
-                'subjectivity': num_features['subjectivity']
-            }
-            
-            result = {
-                'is_fake': prediction == 0,
-                'confidence': float(confidence),
-                'top_features': top_features,
-                'translation': translated_text if translated_text != original_text else None,
-                'sentiment': sentiment_info,
-                'detected_language': detected_lang
-            }
-            
-            self.finished.emit(result)
-            
+            models = self.models or get_shared_models()
+            self.finished.emit(analyze_article(models, self.text, self.language))
         except Exception as e:
             print(f"Error in detection thread: {str(e)}")
             self.error.emit(str(e))
 
+class ModelService(QThread):
+    """Long-lived worker that loads the models once and processes queued analysis jobs.
+
+    Jobs are submitted from the GUI thread and identified by an integer id.
+    Cancelled jobs are skipped if still queued; a running file job stops at
+    the next chunk and a running text job drops its result. stop() cancels
+    the running and queued jobs before waiting for the thread.
+    """
+    ready = pyqtSignal()
+    load_failed = pyqtSignal(str)
+    job_started = pyqtSignal(int)
+    job_finished = pyqtSignal(int, dict)
+    job_progress = pyqtSignal(int, int, int)
+    file_finished = pyqtSignal(int, list)
+    job_failed = pyqtSignal(int, str)
+    job_cancelled = pyqtSignal(int)
+
+    FILE_CHUNK_SIZE = 32
+
+    def __init__(self, models_dir="models"):
+        super().__init__()
+        self.models_dir = models_dir
+        self.models = None
+        self._jobs = queue.Queue()
+        self._cancelled = set()
+        self._stopping = False
+        self._lock = threading.Lock()
+        self._next_id = itertools.count(1)
+
+    def submit_text(self, text, language='auto'):
+        job_id = next(self._next_id)
+        self._jobs.put((job_id, 'text', text, language))
+        return job_id
+
+    def submit_file(self, path, language='auto'):
+        job_id = next(self._next_id)
+        self._jobs.put((job_id, 'file', path, language))
+        return job_id
+
+    def cancel(self, job_id):
+        with self._lock:
+            self._cancelled.add(job_id)
+
+    def stop(self):
+        with self._lock:
+            self._stopping = True
+        self._jobs.put(None)
+        self.wait()
+
+    def _is_cancelled(self, job_id):
+        with self._lock:
+            return self._stopping or job_id in self._cancelled
+
+    def run(self):
+        global _shared_models
+        try:
+            self.models = load_models(self.models_dir)
+        except Exception as e:
+            print(f"Error loading models: {str(e)}")
+            self.load_failed.emit(str(e))
+            return
+        with _shared_models_lock:
+            _shared_models = _shared_models or self.models
+        self.ready.emit()
+
+        while True:
+            job = self._jobs.get()
+            if job is None or self._stopping:
+                return
+            job_id, kind, payload, language = job
+            if self._is_cancelled(job_id):
+                self.job_cancelled.emit(job_id)
+                continue
+            self.job_started.emit(job_id)
+            try:
+                if kind == 'text':
+                    result = analyze_article(self.models, payload, language)
+                    if self._is_cancelled(job_id):
+                        self.job_cancelled.emit(job_id)
+                    else:
+                        self.job_finished.emit(job_id, result)
+                else:
+                    self._run_file_job(job_id, payload, language)
+            except Exception as e:
+                print(f"Error in model service: {str(e)}")
+                self.job_failed.emit(job_id, str(e))
+            finally:
+                with self._lock:
+                    self._cancelled.discard(job_id)
+
+    def _run_file_job(self, job_id, path, language):
+        with open(path, "r", encoding="utf-8") as f:
+            articles = [line.strip() for line in f if line.strip()]
+        results = []
+        self.job_progress.emit(job_id, 0, len(articles))
+        for start in range(0, len(articles), self.FILE_CHUNK_SIZE):
+            if self._is_cancelled(job_id):
+                self.job_cancelled.emit(job_id)
+                return
+            results.extend(predict_batch(self.models, articles[start:start + self.FILE_CHUNK_SIZE], language))
+            self.job_progress.emit(job_id, len(results), len(articles))
+        self.file_finished.emit(job_id, results)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -168,9 +180,18 @@ class MainWindow(QMainWindow):
         self.text_input = QTextEdit()
         self.text_input.setPlaceholderText("Paste news article text here...\nSupports 13+ Indian languages including Hindi, Tamil, Telugu, Bengali, Gujarati, Kannada, Malayalam, Punjabi, and more.")
         
-        self.analyze_button = QPushButton("Analyze Text")
+        self.analyze_button = QPushButton("Loading models...")
+        self.analyze_button.setEnabled(False)
         self.analyze_button.clicked.connect(self.analyze_text)
         
+        self.analyze_file_button = QPushButton("Analyze File...")
+        self.analyze_file_button.setEnabled(False)
+        self.analyze_file_button.clicked.connect(self.analyze_file)
+        
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_job)
+        
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
         
@@ -182,19 +203,30 @@ class MainWindow(QMainWindow):
         layout.addWidget(lang_label)
         layout.addWidget(self.language_combo)
         layout.addWidget(self.text_input)
-        layout.addWidget(self.analyze_button)
+        button_row = QHBoxLayout()
+        button_row.addWidget(self.analyze_button)
+        button_row.addWidget(self.analyze_file_button)
+        button_row.addWidget(self.cancel_button)
+        layout.addLayout(button_row)
         layout.addWidget(self.progress_bar)
         layout.addWidget(self.result_label)
         
+        # Load the models once in the background and keep them for every analysis
+        self.current_job = None
+        self.service = ModelService()
+        self.service.ready.connect(self.handle_models_ready)
+        self.service.load_failed.connect(self.handle_load_failed)
+        self.service.job_finished.connect(self.handle_job_finished)
+        self.service.job_progress.connect(self.handle_progress)
+        self.service.file_finished.connect(self.handle_file_result)
+        self.service.job_failed.connect(self.handle_job_failed)
+        self.service.job_cancelled.connect(self.handle_job_cancelled)
+        self.service.start()
+        
         print("Main window initialized successfully!")
     
-    def analyze_text(self):
-        text = self.text_input.toPlainText().strip()
-        if not text:
-            self.result_label.setText("Please enter some text to analyze.")
-            return
-        
-        # Get selected language
+    def selected_language(self):
+    
         lang_map = {
             'Auto Detect': 'auto',
             'English': 'en',
@@ -211,18 +243,94 @@ class MainWindow(QMainWindow):
             'Urdu': 'ur',
             'Assamese': 'as'
         }
-        selected_lang = lang_map[self.language_combo.currentText()]
+        return lang_map[self.language_combo.currentText()]
+    
+    def set_busy(self, busy):
+        self.analyze_button.setEnabled(not busy)
+        self.analyze_file_button.setEnabled(not busy)
+        self.cancel_button.setEnabled(busy)
+        self.progress_bar.setVisible(busy)
+    
+    def analyze_text(self):
+        text = self.text_input.toPlainText().strip()
+        if not text:
+            self.result_label.setText("Please enter some text to analyze.")
+            return
         
-        self.analyze_button.setEnabled(False)
-        self.progress_bar.setVisible(True)
+        self.set_busy(True)
+        self.progress_bar.setRange(0, 0)
         self.result_label.setText("Analyzing...")
+        self.current_job = self.service.submit_text(text, self.selected_language())
+    
+    def analyze_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Select a file with one article per line", "", "Text files (*.txt);;All files (*)")
+        if not path:
+            return
         
-        self.thread = DetectionThread(text, selected_lang)
-        self.thread.finished.connect(self.handle_result)
-        self.thread.error.connect(self.handle_error)
-        self.thread.start()
+        self.set_busy(True)
+        self.progress_bar.setRange(0, 0)
+        self.result_label.setText(f"Analyzing {os.path.basename(path)}...")
+        self.current_job = self.service.submit_file(path, self.selected_language())
+    
+    def cancel_job(self):
+        if self.current_job is not None:
+            self.service.cancel(self.current_job)
+            self.result_label.setText("Cancelling...")
+    
+    def handle_models_ready(self):
+        self.analyze_button.setText("Analyze Text")
+        self.set_busy(False)
+    
+    def handle_load_failed(self, error_message):
+        self.analyze_button.setText("Models unavailable")
+        self.result_label.setText(f"Error loading models: {error_message}\nTrain them with: python scripts/model_training.py")
+    
+    def handle_job_finished(self, job_id, result):
+        if job_id == self.current_job:
+            self.current_job = None
+            self.handle_result(result)
+    
+    def handle_progress(self, job_id, done, total):
+        if job_id == self.current_job:
+            self.progress_bar.setRange(0, max(total, 1))
+            self.progress_bar.setValue(done)
+            self.result_label.setText(f"Analyzed {done} of {total} articles...")
+    
+    def handle_file_result(self, job_id, results):
+        if job_id != self.current_job:
+            return
+        self.current_job = None
+        fake = sum(1 for r in results if r['label'] == 'fake')
+        real = sum(1 for r in results if r['label'] == 'real')
+        unsupported = len(results) - fake - real
+        text = f"<h3>Analyzed {len(results)} articles</h3>"
+        text += f"<p><b>Fake:</b> {fake} &nbsp; <b>Genuine:</b> {real} &nbsp; <b>Unsupported:</b> {unsupported}</p><ol>"
+        for r in results[:50]:
+            verdict = "FAKE" if r['label'] == 'fake' else "GENUINE" if r['label'] == 'real' else "UNSUPPORTED"
+            text += f"<li>{verdict} ({r['confidence'] * 100:.1f}%, {r['detected_language']})</li>"
+        text += "</ol>"
+        if len(results) > 50:
+            text += f"<p>... and {len(results) - 50} more</p>"
+        self.result_label.setText(text)
+        self.set_busy(False)
+    
+    def handle_job_failed(self, job_id, error_message):
+        if job_id == self.current_job:
+            self.current_job = None
+            self.handle_error(error_message)
+    
+    def handle_job_cancelled(self, job_id):
+        if job_id == self.current_job:
+            self.current_job = None
+            self.result_label.setText("Analysis cancelled.")
+            self.set_busy(False)
     
     def handle_result(self, result):
+        if result['model_stage'] == 'unsupported':
+            self.result_label.setText(f"<h3>Unsupported language ({result['detected_language']})</h3>"
+                                      "<p>The article could not be translated to English, so it was not scored.</p>")
+            self.set_busy(False)
+            return
         verdict = "FAKE" if result['is_fake'] else "GENUINE"
         confidence = result['confidence'] * 100
         
@@ -253,13 +361,17 @@ class MainWindow(QMainWindow):
         text += "</ul>"
         
         self.result_label.setText(text)
-        self.analyze_button.setEnabled(True)
-        self.progress_bar.setVisible(False)
+        self.set_busy(False)
     
     def handle_error(self, error_message):
         self.result_label.setText(f"Error during analysis: {error_message}")
-        self.analyze_button.setEnabled(True)
-        self.progress_bar.setVisible(False)
+        self.set_busy(False)
+    
+    def closeEvent(self, event):
+        if self.current_job is not None:
+            self.service.cancel(self.current_job)
+        self.service.stop()
+        super().closeEvent(event)
 
 def main():
     print("Starting application initialization...")
@@ -1,13 +1,20 @@
 # Gunicorn configuration file
 import multiprocessing
+import os
 
 # Server socket
-bind = "0.0.0.0:${PORT:-5000}"
+# Behind a reverse proxy, set SATYASCAN_TRUSTED_PROXIES to the number of proxies (the
+# Procfile sets 1 for the platform router) so clients are rate-limited on their own
+# address; left at 0, every request appears to come from the proxy
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
 backlog = 2048
 
 # Worker processes
 workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = "sync"
+# Threads beyond the admission pool slots (scripts/admission.py) answer 429 quickly
+# instead of leaving requests in the backlog
+worker_class = "gthread"
+threads = int(os.environ.get('SATYASCAN_WORKER_THREADS', 16))
 worker_connections = 1000
 timeout = 30
 keepalive = 2
@@ -20,3 +27,9 @@ loglevel = "info"
 # Process naming
 proc_name = "satyascan"
 
+# Load the current model version in a background thread of every worker, so
+# loading and warmup do not count against the worker timeout; /api/ready
+# answers 503 until that worker has warmed up
+def post_worker_init(worker):
+    from app import load_models
+    load_models(background=True)
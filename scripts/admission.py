@@ -0,0 +1,191 @@
+"""
+Admission control for /api/analyze.
+
+Each worker admits a bounded number of requests at a time, from two
+separate pools. Requests that need translation wait on the network and
+use the small 'translate' pool. Requests that can be scored locally use
+the 'local' pool, so a burst of non-English traffic cannot starve them.
+When a pool is full, the request gets an immediate 429 with a Retry-After
+header instead of sitting in the gunicorn backlog until it times out. An
+optional token bucket per client limits how fast any one client can send.
+
+Pools only matter when a worker handles requests concurrently, which is
+why gunicorn_config.py runs gthread workers with more threads than pool
+slots: the spare threads exist to answer 429s quickly.
+
+    SATYASCAN_TRANSLATE_SLOTS    concurrent translate requests per worker (default 2, 0 = unlimited)
+    SATYASCAN_LOCAL_SLOTS        concurrent local requests per worker (default 4, 0 = unlimited)
+    SATYASCAN_ADMISSION_WAIT_MS  how long a request may wait for a slot before the 429 (default 0)
+    SATYASCAN_RATE_LIMIT         requests per second per client and worker (default 0 = off)
+    SATYASCAN_RATE_BURST         token bucket size (default 2 * rate, at least 1)
+
+Clients are identified by their address, as resolved by app.py through
+SATYASCAN_TRUSTED_PROXIES (werkzeug's ProxyFix). The X-Client-Id header
+is only trusted when the request also carries an X-Client-Token matching
+SATYASCAN_CLIENT_TOKEN.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+ENGLISH = ('en', 'english')
+
+
+class Rejected(Exception):
+    """Raised by AdmissionController.admit; becomes a 429 response"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def needs_translation(text, language='auto', mode='translate', enrich=False):
+    """Cheap guess whether a request will call the translator, without running language detection.
+
+    With language='auto', text whose letters are nearly all ASCII is treated
+    as English; the supported non-English languages use other scripts.
+    """
+    if mode == 'native' and not enrich:
+        return False
+    if language != 'auto':
+        return language not in ENGLISH
+    letters = [c for c in text[:2000] if c.isalpha()]
+    if not letters:
+        return False
+    return sum(c.isascii() for c in letters) / len(letters) < 0.9
+
+
+class ConcurrencyPool:
+    """At most `limit` requests in flight; others wait up to `wait` seconds, then are rejected"""
+
+    def __init__(self, name, limit, wait=0.0):
+        self.name = name
+        self.limit = limit
+        self.wait = wait
+        self._slots = threading.BoundedSemaphore(limit) if limit else None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.mean_seconds = 0.0
+
+    def acquire(self):
+        with self._lock:
+            self.waiting += 1
+        if self._slots is None:
+            acquired = True
+        elif self.wait > 0:
+            acquired = self._slots.acquire(timeout=self.wait)
+        else:
+            acquired = self._slots.acquire(blocking=False)
+        with self._lock:
+            self.waiting -= 1
+            if acquired:
+                self.in_flight += 1
+                self.admitted += 1
+            else:
+                self.rejected += 1
+        return acquired
+
+    def release(self, seconds):
+        with self._lock:
+            self.in_flight -= 1
+            # Moving average of the service time, for Retry-After
+            self.mean_seconds = seconds if self.admitted == 1 else 0.9 * self.mean_seconds + 0.1 * seconds
+        if self._slots is not None:
+            self._slots.release()
+
+    def retry_after(self):
+        return max(1, math.ceil(self.mean_seconds))
+
+    def stats(self):
+        with self._lock:
+            return {'limit': self.limit, 'in_flight': self.in_flight, 'waiting': self.waiting,
+                    'admitted': self.admitted, 'rejected': self.rejected,
+                    'mean_ms': 1000 * self.mean_seconds}
+
+
+class TokenBucket:
+    """Per-client token buckets refilled at `rate` tokens per second, holding at most `burst`"""
+
+    def __init__(self, rate, burst=None, max_clients=10000):
+        self.rate = rate
+        self.burst = burst or max(1.0, 2 * rate)
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.limited = 0
+
+    def take(self, client, now=None):
+        """Spend one token; returns 0 when allowed, else the seconds until a token is available"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                wait, tokens = 0.0, tokens - 1
+            else:
+                wait = (1 - tokens) / self.rate
+                self.limited += 1
+            self._buckets[client] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def stats(self):
+        with self._lock:
+            return {'rate': self.rate, 'burst': self.burst, 'clients': len(self._buckets), 'limited': self.limited}
+
+
+class AdmissionController:
+    """Rate limit, then pool selection, for every analyze request in this worker"""
+
+    def __init__(self, translate_slots=2, local_slots=4, wait=0.0, rate=0.0, burst=None):
+        self.pools = {
+            'translate': ConcurrencyPool('translate', translate_slots, wait),
+            'local': ConcurrencyPool('local', local_slots, wait),
+        }
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        burst = float(environ.get('SATYASCAN_RATE_BURST', 0) or 0) or None
+        return cls(
+            translate_slots=int(environ.get('SATYASCAN_TRANSLATE_SLOTS', 2)),
+            local_slots=int(environ.get('SATYASCAN_LOCAL_SLOTS', 4)),
+            wait=float(environ.get('SATYASCAN_ADMISSION_WAIT_MS', 0)) / 1000,
+            rate=float(environ.get('SATYASCAN_RATE_LIMIT', 0) or 0),
+            burst=burst,
+        )
+
+    @contextmanager
+    def admit(self, pool_name, client):
+        """Hold a slot in pool_name for the block; raises Rejected when over the rate or capacity"""
+        if self.bucket is not None:
+            wait = self.bucket.take(client)
+            if wait > 0:
+                raise Rejected('rate_limited', max(1, math.ceil(wait)))
+        pool = self.pools[pool_name]
+        if not pool.acquire():
+            raise Rejected(f'{pool_name}_pool_full', pool.retry_after())
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            pool.release(time.perf_counter() - started)
+
+    def stats(self):
+        pools = {name: pool.stats() for name, pool in self.pools.items()}
+        return {
+            'pools': pools,
+            'in_flight': sum(p['in_flight'] for p in pools.values()),
+            'queue_depth': sum(p['waiting'] for p in pools.values()),
+            'rejected': sum(p['rejected'] for p in pools.values()),
+            'rate_limit': self.bucket.stats() if self.bucket is not None else None,
+        }
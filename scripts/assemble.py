@@ -0,0 +1,166 @@
+"""
+Feature assembly without sparse.hstack.
+
+Every inference path joined its feature blocks with
+sparse.hstack([word, char, numeric]).tocsr(). That converts each block to
+COO, concatenates, and converts back to CSR, with several temporary
+arrays per call, even though the numeric block has only 11 dense columns.
+hstack_csr sizes one CSR buffer from the per-row counts of the blocks. It
+then copies in the word indices unchanged, the char indices offset by the
+word vocabulary size, and the nonzero numeric values offset by both. The
+result is the same matrix as hstack, with the same sorted indices, data
+and indptr, for one article or a batch.
+
+Compare with hstack on a model bundle:
+    python scripts/assemble.py --models_dir models --batch_sizes 1 32 256
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from scipy import sparse
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+_INT32_MAX = np.iinfo(np.int32).max
+
+
+def _positions(starts, counts, block_starts):
+    """Buffer positions of each row's entries: row i's counts[i] entries go to starts[i] onwards.
+
+    block_starts[i] is where row i begins in the block's own data array.
+    """
+    positions = np.repeat(starts - block_starts, counts)
+    positions += np.arange(len(positions))
+    return positions
+
+
+def hstack_csr(blocks, dtype=None):
+    """Equivalent of sparse.hstack(blocks).tocsr() for CSR matrices and dense 2-D arrays.
+
+    Zeros in dense blocks are not stored, as with hstack. Blocks must have the
+    same number of rows.
+    """
+    n_rows = blocks[0].shape[0]
+    dtype = dtype or np.result_type(*[block.dtype for block in blocks])
+    parts, counts = [], np.zeros(n_rows, dtype=np.int64)
+    for block in blocks:
+        if sparse.issparse(block):
+            block = block.tocsr()
+            row_counts = np.diff(block.indptr)
+            parts.append((block, None, row_counts))
+        else:
+            block = np.asarray(block)
+            rows, columns = np.nonzero(block)
+            row_counts = np.bincount(rows, minlength=n_rows)
+            parts.append((block, (rows, columns), row_counts))
+        counts += row_counts
+
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    n_columns = sum(block.shape[1] for block in blocks)
+    index_dtype = np.int32 if max(indptr[-1], n_columns) <= _INT32_MAX else np.int64
+    data = np.empty(indptr[-1], dtype=dtype)
+    indices = np.empty(indptr[-1], dtype=index_dtype)
+
+    filled = indptr[:-1].copy()
+    column_offset = 0
+    for block, nonzero, row_counts in parts:
+        if n_rows == 1:
+            positions = slice(filled[0], filled[0] + row_counts[0])
+        else:
+            block_starts = block.indptr[:-1] if nonzero is None else np.cumsum(row_counts) - row_counts
+            positions = _positions(filled, row_counts, block_starts)
+        if nonzero is None:
+            data[positions] = block.data
+            indices[positions] = block.indices + column_offset
+        else:
+            rows, columns = nonzero
+            data[positions] = block[rows, columns]
+            indices[positions] = columns + column_offset
+        filled += row_counts
+        column_offset += block.shape[1]
+
+    matrix = sparse.csr_matrix((data, indices, indptr.astype(index_dtype)), shape=(n_rows, n_columns))
+    # Vectorizers may emit columns out of order within a row; hstack's COO round trip sorts them
+    matrix.sort_indices()
+    return matrix
+
+
+def _measure(function, repeat):
+    """(best seconds per call, peak bytes allocated during one call)"""
+    function()
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def benchmark(bundle, batch_sizes=(1, 32, 256), repeat=20):
+    """Time and peak allocation of hstack().tocsr() vs hstack_csr on real feature blocks"""
+    from scripts.inference import _numeric_features, prepare_article
+    from scripts.warmup import SAMPLE_TEXTS, _stub_translate
+
+    samples = list(SAMPLE_TEXTS.values())
+    report = []
+    for batch_size in batch_sizes:
+        articles = [prepare_article(samples[i % len(samples)] * (1 + i % 5), translate=_stub_translate)
+                    for i in range(batch_size)]
+        blocks = [
+            bundle.word_vectorizer.transform([article.cleaned_text for article in articles]),
+            bundle.char_vectorizer.transform([article.char_text for article in articles]),
+            _numeric_features(bundle, articles),
+        ]
+        expected = sparse.hstack(blocks).tocsr()
+        assembled = hstack_csr(blocks)
+        identical = (np.array_equal(expected.indptr, assembled.indptr)
+                     and np.array_equal(expected.indices, assembled.indices)
+                     and np.array_equal(expected.data, assembled.data))
+        hstack_seconds, hstack_peak = _measure(lambda: sparse.hstack(blocks).tocsr(), repeat)
+        csr_seconds, csr_peak = _measure(lambda: hstack_csr(blocks), repeat)
+        report.append({
+            'batch_size': batch_size,
+            'nnz': int(expected.nnz),
+            'identical': bool(identical),
+            'hstack_us': 1e6 * hstack_seconds,
+            'assembler_us': 1e6 * csr_seconds,
+            'hstack_peak_bytes': hstack_peak,
+            'assembler_peak_bytes': csr_peak,
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sparse.hstack().tocsr() with the preallocated assembler")
+    parser.add_argument("--models_dir", default="models")
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 32, 256])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from scripts.inference import load_bundle
+
+    report = benchmark(load_bundle(args.models_dir), args.batch_sizes, args.repeat)
+    print(f"\n {'batch':>6} {'nnz':>9} {'same':>5} {'hstack us':>10} {'assembler us':>13} "
+          f"{'hstack peak KB':>15} {'assembler peak KB':>18}")
+    for row in report:
+        print(f" {row['batch_size']:>6} {row['nnz']:>9,} {'yes' if row['identical'] else 'NO':>5} "
+              f"{row['hstack_us']:>10.1f} {row['assembler_us']:>13.1f} "
+              f"{row['hstack_peak_bytes'] / 1024:>15.1f} {row['assembler_peak_bytes'] / 1024:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
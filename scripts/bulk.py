@@ -0,0 +1,375 @@
+"""
+Sharded, resumable bulk scoring for backfills over large archives.
+
+An archive is a text file with one article per line, as for
+predict.py --batch. The job runs in three steps:
+
+    plan    splits the file into N byte ranges aligned to line starts and
+            writes JOB/plan.json. Each shard reads only its own range, so
+            shards can run on different machines that see the same file.
+    run     scores one shard in chunks with the batched pipeline and
+            appends to JOB/shard-XXXXX.jsonl. After every chunk,
+            JOB/shard-XXXXX.checkpoint.json records the input and output
+            byte positions. A re-run truncates whatever was written after
+            the last checkpoint and seeks straight back to the next unscored
+            line, so a crashed or preempted shard just runs again.
+    merge   checks that every shard is done and concatenates the shard
+            outputs in order. It numbers the articles 0..N-1 and writes the
+            same records as predict.py --batch.
+
+The plan fingerprints the input (size plus a hash of its first and last
+MB), and run refuses a file that does not match. `local` runs plan, every
+shard as its own process, and merge on one machine.
+
+Usage:
+    python scripts/bulk.py plan --input archive.txt --shards 16 --job job
+    python scripts/bulk.py run --job job --shard 3 --models_dir models     # on any node, in any order
+    python scripts/bulk.py status --job job
+    python scripts/bulk.py merge --job job --output scores.jsonl
+    python scripts/bulk.py local --input archive.txt --shards 4 --job job --output scores.jsonl
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+PLAN_FILE = "plan.json"
+OUTPUT_FIELDS = ['index', 'label', 'is_fake', 'confidence', 'detected_language']
+SHARD_FIELDS = ['offset', 'label', 'is_fake', 'confidence', 'detected_language']
+_SAMPLE_BYTES = 1 << 20
+
+
+class JobError(Exception):
+    pass
+
+
+def fingerprint(path):
+    """Size plus a hash of the first and last MB: cheap, and catches a different or modified archive"""
+    size = os.path.getsize(path)
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        digest.update(f.read(_SAMPLE_BYTES))
+        if size > _SAMPLE_BYTES:
+            f.seek(max(size - _SAMPLE_BYTES, _SAMPLE_BYTES))
+            digest.update(f.read())
+    return {'size': size, 'sha256': digest.hexdigest()}
+
+
+def _line_start(f, position):
+    """The first line start at or after position"""
+    if position == 0:
+        return 0
+    f.seek(position - 1)
+    f.readline()
+    return f.tell()
+
+
+def plan_job(input_path, shards, job_dir):
+    """Split input_path into shards line-aligned byte ranges and write job_dir/plan.json"""
+    if shards < 1:
+        raise JobError("--shards must be at least 1")
+    size = os.path.getsize(input_path)
+    with open(input_path, "rb") as f:
+        bounds = [_line_start(f, size * k // shards) for k in range(shards)] + [size]
+    plan = {
+        'input': os.path.abspath(input_path),
+        'fingerprint': fingerprint(input_path),
+        'shards': [{'shard': k, 'start': bounds[k], 'end': bounds[k + 1]} for k in range(shards)],
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    os.makedirs(job_dir, exist_ok=True)
+    if os.path.exists(os.path.join(job_dir, PLAN_FILE)):
+        existing = load_plan(job_dir)
+        if existing['fingerprint'] != plan['fingerprint'] or existing['shards'] != plan['shards']:
+            raise JobError(f"{job_dir} already holds a different plan; use a new job directory")
+        return existing
+    _write_json(os.path.join(job_dir, PLAN_FILE), plan)
+    return plan
+
+
+def load_plan(job_dir):
+    path = os.path.join(job_dir, PLAN_FILE)
+    if not os.path.exists(path):
+        raise JobError(f"No {PLAN_FILE} in {job_dir}; run: python scripts/bulk.py plan")
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_json(path, payload):
+    with open(path + ".tmp", "w") as f:
+        json.dump(payload, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+
+def shard_paths(job_dir, shard):
+    stem = os.path.join(job_dir, f"shard-{shard:05d}")
+    return stem + ".jsonl", stem + ".checkpoint.json"
+
+
+def load_checkpoint(job_dir, entry):
+    _, checkpoint_path = shard_paths(job_dir, entry['shard'])
+    if not os.path.exists(checkpoint_path):
+        return {'next': entry['start'], 'articles': 0, 'output_bytes': 0, 'done': entry['start'] >= entry['end']}
+    with open(checkpoint_path) as f:
+        return json.load(f)
+
+
+def _chunks(f, position, end, chunk_size):
+    """Yield (offsets, texts, next_position) for non-empty lines starting in [position, end)"""
+    f.seek(position)
+    offsets, texts = [], []
+    while position < end:
+        line = f.readline()
+        if not line:
+            break
+        text = line.decode("utf-8", errors="replace").strip()
+        if text:
+            offsets.append(position)
+            texts.append(text)
+        position += len(line)
+        if len(texts) == chunk_size:
+            yield offsets, texts, position
+            offsets, texts = [], []
+    if texts:
+        yield offsets, texts, position
+
+
+def run_shard(job_dir, shard, bundle, chunk_size=256, cascade_threshold=None, translate=None,
+              input_path=None, max_chunks=None, log=None):
+    """Score one shard from its last checkpoint; returns the checkpoint.
+
+    max_chunks stops early, as a time-boxed or preempted run would; the next
+    call resumes after the last completed chunk.
+    """
+    from scripts.inference import predict_batch
+
+    plan = load_plan(job_dir)
+    if not 0 <= shard < len(plan['shards']):
+        raise JobError(f"Shard {shard} is not in the plan (0..{len(plan['shards']) - 1})")
+    entry = plan['shards'][shard]
+    input_path = input_path or plan['input']
+    if fingerprint(input_path) != plan['fingerprint']:
+        raise JobError(f"{input_path} does not match the planned input")
+
+    output_path, checkpoint_path = shard_paths(job_dir, shard)
+    checkpoint = load_checkpoint(job_dir, entry)
+    if checkpoint['done']:
+        return checkpoint
+    options = {} if translate is None else {'translate': translate}
+
+    started = time.perf_counter()
+    scored = 0
+    with open(input_path, "rb") as source, open(output_path, "a+b") as sink:
+        # Anything after the checkpoint is a torn or unconfirmed write from a crashed run
+        sink.truncate(checkpoint['output_bytes'])
+        sink.seek(checkpoint['output_bytes'])
+        for number, (offsets, texts, position) in enumerate(
+                _chunks(source, checkpoint['next'], entry['end'], chunk_size)):
+            if max_chunks is not None and number >= max_chunks:
+                return checkpoint
+            records = predict_batch(bundle, texts, cascade_threshold=cascade_threshold, **options)
+            for offset, record in zip(offsets, records):
+                record['offset'] = offset
+                record['confidence'] = round(record['confidence'], 6)
+                sink.write((json.dumps({k: record[k] for k in SHARD_FIELDS}, ensure_ascii=False) + "\n").encode("utf-8"))
+            sink.flush()
+            os.fsync(sink.fileno())
+            checkpoint = {'next': position, 'articles': checkpoint['articles'] + len(texts),
+                          'output_bytes': sink.tell(), 'done': False}
+            _write_json(checkpoint_path, checkpoint)
+            scored += len(texts)
+            if log:
+                elapsed = time.perf_counter() - started
+                done = (position - entry['start']) / max(entry['end'] - entry['start'], 1)
+                log(f" shard {shard}: {checkpoint['articles']} articles, {done:.0%} of its bytes "
+                    f"({scored / elapsed:.1f} articles/sec)")
+    checkpoint = dict(checkpoint, next=entry['end'], done=True)
+    _write_json(checkpoint_path, checkpoint)
+    return checkpoint
+
+
+def job_status(job_dir):
+    """One row per shard: bytes planned, bytes and articles done, finished or not"""
+    plan = load_plan(job_dir)
+    rows = []
+    for entry in plan['shards']:
+        checkpoint = load_checkpoint(job_dir, entry)
+        rows.append({'shard': entry['shard'], 'bytes': entry['end'] - entry['start'],
+                     'bytes_done': checkpoint['next'] - entry['start'],
+                     'articles': checkpoint['articles'], 'done': checkpoint['done']})
+    return rows
+
+
+def merge_job(job_dir, output_path, fmt="jsonl"):
+    """Concatenate finished shards in order into predict.py --batch records; returns the article count"""
+    plan = load_plan(job_dir)
+    pending = [row['shard'] for row in job_status(job_dir) if not row['done']]
+    if pending:
+        raise JobError(f"{len(pending)} shard(s) not finished: {', '.join(map(str, pending[:20]))}")
+
+    index = 0
+    with open(output_path + ".tmp", "w", encoding="utf-8", newline="") as out:
+        writer = csv.DictWriter(out, fieldnames=OUTPUT_FIELDS) if fmt == "csv" else None
+        if writer:
+            writer.writeheader()
+        for entry in plan['shards']:
+            shard_output, _ = shard_paths(job_dir, entry['shard'])
+            checkpoint = load_checkpoint(job_dir, entry)
+            if not os.path.exists(shard_output):
+                continue
+            with open(shard_output, "rb") as f:
+                data = f.read(checkpoint['output_bytes'])
+            last_offset = -1
+            for line in data.decode("utf-8").splitlines():
+                record = json.loads(line)
+                if record['offset'] <= last_offset:
+                    raise JobError(f"Shard {entry['shard']} output is out of order at offset {record['offset']}")
+                last_offset = record['offset']
+                record = {'index': index, **{k: record[k] for k in OUTPUT_FIELDS[1:]}}
+                if writer:
+                    writer.writerow(record)
+                else:
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                index += 1
+    os.replace(output_path + ".tmp", output_path)
+    return index
+
+
+def _identity_translate(text, source):
+    return text
+
+
+def _load_scoring_bundle(models_dir, precision):
+    from scripts.inference import load_bundle
+    from scripts.quantize import compact_bundle
+
+    return compact_bundle(load_bundle(models_dir), precision)
+
+
+def _run_command(args):
+    translate = _identity_translate if args.translator == "identity" else None
+    bundle = _load_scoring_bundle(args.models_dir, args.precision)
+    log = lambda message: print(message, file=sys.stderr)
+    checkpoint = run_shard(args.job, args.shard, bundle, args.chunk_size, args.cascade_threshold, translate,
+                           input_path=args.input, max_chunks=args.max_chunks, log=log)
+    state = "done" if checkpoint['done'] else f"stopped at byte {checkpoint['next']}"
+    print(f" Shard {args.shard}: {checkpoint['articles']} articles, {state}", file=sys.stderr)
+
+
+def _print_status(job_dir):
+    rows = job_status(job_dir)
+    print(f"\n {'shard':>6} {'MB':>9} {'done':>6} {'articles':>10} {'state':>8}")
+    for row in rows:
+        share = row['bytes_done'] / row['bytes'] if row['bytes'] else 1.0
+        print(f" {row['shard']:>6} {row['bytes'] / 1e6:>9.1f} {share:>6.0%} {row['articles']:>10,} "
+              f"{'done' if row['done'] else 'pending':>8}")
+    print(f" {sum(row['done'] for row in rows)}/{len(rows)} shards done, "
+          f"{sum(row['articles'] for row in rows):,} articles scored")
+
+
+def _run_local(args):
+    """plan, one process per shard (at most --parallel at a time), merge"""
+    plan = plan_job(args.input, args.shards, args.job)
+    command = [sys.executable, os.path.abspath(__file__), "run", "--job", args.job,
+               "--models_dir", args.models_dir, "--chunk_size", str(args.chunk_size),
+               "--precision", args.precision, "--translator", args.translator]
+    if args.cascade_threshold is not None:
+        command += ["--cascade_threshold", str(args.cascade_threshold)]
+    started = time.perf_counter()
+    waiting = [entry['shard'] for entry in plan['shards']]
+    running, failed = {}, []
+    while waiting or running:
+        while waiting and len(running) < (args.parallel or len(plan['shards'])):
+            shard = waiting.pop(0)
+            running[shard] = subprocess.Popen(command + ["--shard", str(shard)])
+        for shard, process in list(running.items()):
+            if process.poll() is not None:
+                del running[shard]
+                if process.returncode != 0:
+                    failed.append(shard)
+        time.sleep(0.05)
+    if failed:
+        raise JobError(f"Shard(s) {', '.join(map(str, failed))} failed; re-run the same command to resume them")
+    articles = merge_job(args.job, args.output, args.format)
+    elapsed = time.perf_counter() - started
+    print(f" Scored {articles:,} articles in {len(plan['shards'])} shards in {elapsed:.1f}s "
+          f"({articles / elapsed:.1f} articles/sec) -> {args.output}")
+
+
+def main():
+    from scripts.quantize import PRECISIONS
+
+    parser = argparse.ArgumentParser(description="Sharded, resumable bulk scoring")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plan = commands.add_parser("plan", help="Split an archive into line-aligned shards")
+    plan.add_argument("--input", required=True, help="Text file with one article per line")
+    plan.add_argument("--shards", type=int, required=True)
+    plan.add_argument("--job", required=True, help="Job directory for the plan, shard outputs and checkpoints")
+
+    def scoring_options(command):
+        command.add_argument("--models_dir", default="models")
+        command.add_argument("--chunk_size", type=int, default=256, help="Articles scored (and checkpointed) together")
+        command.add_argument("--precision", choices=PRECISIONS, default="float64")
+        command.add_argument("--cascade_threshold", type=float, default=None)
+        command.add_argument("--translator", choices=["google", "identity"], default="google",
+                             help="identity scores non-English text untranslated, for offline runs")
+
+    run = commands.add_parser("run", help="Score one shard, resuming from its checkpoint")
+    run.add_argument("--job", required=True)
+    run.add_argument("--shard", type=int, required=True)
+    run.add_argument("--input", default=None, help="This node's path to the archive, if not the planned one")
+    run.add_argument("--max_chunks", type=int, default=None, help="Stop after this many chunks (time-boxed runs)")
+    scoring_options(run)
+
+    status = commands.add_parser("status", help="Progress of every shard")
+    status.add_argument("--job", required=True)
+
+    merge = commands.add_parser("merge", help="Concatenate finished shards into one output")
+    merge.add_argument("--job", required=True)
+    merge.add_argument("--output", required=True)
+    merge.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+
+    local = commands.add_parser("local", help="plan, run every shard as a separate process, merge")
+    local.add_argument("--input", required=True)
+    local.add_argument("--shards", type=int, default=4)
+    local.add_argument("--job", required=True)
+    local.add_argument("--output", required=True)
+    local.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    local.add_argument("--parallel", type=int, default=None, help="Shard processes at a time (default: all)")
+    scoring_options(local)
+
+    args = parser.parse_args()
+    try:
+        if args.command == "plan":
+            plan = plan_job(args.input, args.shards, args.job)
+            sizes = [entry['end'] - entry['start'] for entry in plan['shards']]
+            print(f" Planned {len(sizes)} shards of {min(sizes) / 1e6:.1f}-{max(sizes) / 1e6:.1f} MB in {args.job}")
+        elif args.command == "run":
+            _run_command(args)
+        elif args.command == "status":
+            _print_status(args.job)
+        elif args.command == "merge":
+            articles = merge_job(args.job, args.output, args.format)
+            print(f" Merged {articles:,} articles into {args.output}")
+        else:
+            _run_local(args)
+    except JobError as e:
+        print(f" {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
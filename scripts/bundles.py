@@ -0,0 +1,342 @@
+"""
+Versioned model bundles and zero-downtime hot reload.
+
+Layout under models/:
+    versions/<version>/           the model artifacts plus manifest.json
+    versions/<version>/manifest.json
+                                  version, creation time and sha256 of every file
+    CURRENT                       name of the active version
+    PREVIOUS                      version that was active before it (for rollback)
+
+The flat models/*.pkl files written by model_training.py keep working; they
+are served as version "legacy" until a versioned bundle is published.
+
+Usage:
+    python scripts/bundles.py publish --source models
+    python scripts/bundles.py list
+    python scripts/bundles.py activate 20240101-120000-1a2b3c4d
+    python scripts/bundles.py rollback
+    python scripts/bundles.py verify 20240101-120000-1a2b3c4d
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from scripts.inference import MODEL_FILES, OPTIONAL_MODEL_FILES, load_bundle
+from scripts.warmup import warm_up
+
+LEGACY_VERSION = "legacy"
+MANIFEST = "manifest.json"
+
+
+class BundleError(Exception):
+    pass
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_pointer(models_dir, name, version):
+    """Atomically point models/<name> at version"""
+    path = os.path.join(models_dir, name)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp_path, path)
+
+
+def _read_pointer(models_dir, name):
+    try:
+        with open(os.path.join(models_dir, name)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def versions_dir(models_dir):
+    return os.path.join(models_dir, "versions")
+
+
+def current_version(models_dir="models"):
+    """Return the active version, or LEGACY_VERSION for flat artifacts"""
+    return _read_pointer(models_dir, "CURRENT") or LEGACY_VERSION
+
+
+def previous_version(models_dir="models"):
+    return _read_pointer(models_dir, "PREVIOUS")
+
+
+def bundle_path(models_dir, version):
+    return models_dir if version == LEGACY_VERSION else os.path.join(versions_dir(models_dir), version)
+
+
+def list_versions(models_dir="models"):
+    """Return manifests of every published version, oldest first"""
+    root = versions_dir(models_dir)
+    if not os.path.isdir(root):
+        return []
+    manifests = []
+    for version in sorted(os.listdir(root)):
+        manifest_path = os.path.join(root, version, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifests.append(json.load(f))
+    return manifests
+
+
+def read_manifest(models_dir, version):
+    if version == LEGACY_VERSION:
+        return {'version': LEGACY_VERSION, 'files': {}}
+    manifest_path = os.path.join(bundle_path(models_dir, version), MANIFEST)
+    if not os.path.exists(manifest_path):
+        raise BundleError(f"Unknown model version: {version}")
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def verify_bundle(models_dir, version):
+    """Check every artifact against the manifest checksums; returns the manifest"""
+    manifest = read_manifest(models_dir, version)
+    path = bundle_path(models_dir, version)
+    for filename, expected in manifest['files'].items():
+        file_path = os.path.join(path, filename)
+        if not os.path.exists(file_path):
+            raise BundleError(f"{version}: missing {filename}")
+        if _sha256(file_path) != expected['sha256']:
+            raise BundleError(f"{version}: checksum mismatch for {filename}")
+    return manifest
+
+
+def publish_bundle(source_dir="models", models_dir="models", version=None, activate=True, extra=None):
+    """Copy the artifacts in source_dir into a new immutable version and optionally activate it"""
+    files = {}
+    for filename in MODEL_FILES.values():
+        file_path = os.path.join(source_dir, filename)
+        if not os.path.exists(file_path):
+            raise BundleError(f"Missing artifact {file_path}")
+        files[filename] = {'sha256': _sha256(file_path), 'bytes': os.path.getsize(file_path)}
+    for filename in OPTIONAL_MODEL_FILES.values():
+        file_path = os.path.join(source_dir, filename)
+        if os.path.exists(file_path):
+            files[filename] = {'sha256': _sha256(file_path), 'bytes': os.path.getsize(file_path)}
+
+    if version is None:
+        combined = hashlib.sha256("".join(files[f]['sha256'] for f in sorted(files)).encode()).hexdigest()
+        version = f"{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}-{combined[:8]}"
+
+    root = versions_dir(models_dir)
+    final_path = os.path.join(root, version)
+    if os.path.exists(final_path):
+        raise BundleError(f"Version {version} already exists")
+    staging_path = os.path.join(root, f".{version}.staging")
+    os.makedirs(staging_path, exist_ok=True)
+    for filename in files:
+        shutil.copy2(os.path.join(source_dir, filename), os.path.join(staging_path, filename))
+    manifest = {
+        'version': version,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'files': files,
+    }
+    manifest.update(extra or {})
+    with open(os.path.join(staging_path, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(staging_path, final_path)
+
+    if activate:
+        activate_version(models_dir, version)
+    return manifest
+
+
+def activate_version(models_dir, version):
+    """Point CURRENT at version (after verifying it) and remember the old one for rollback"""
+    verify_bundle(models_dir, version)
+    active = current_version(models_dir)
+    if active != version:
+        _write_pointer(models_dir, "PREVIOUS", active)
+    _write_pointer(models_dir, "CURRENT", version)
+
+
+def rollback(models_dir="models"):
+    """Swap CURRENT and PREVIOUS; returns the version now active"""
+    previous = previous_version(models_dir)
+    if previous is None:
+        raise BundleError("No previous version to roll back to")
+    activate_version(models_dir, previous)
+    return previous
+
+
+def load_version(models_dir="models", version=None, prepare=None):
+    """Verify and load one version; prepare(bundle) may wrap it (e.g. reduced precision)"""
+    version = version or current_version(models_dir)
+    manifest = verify_bundle(models_dir, version)
+    bundle = load_bundle(bundle_path(models_dir, version))
+    if prepare is not None:
+        bundle = prepare(bundle)
+    bundle.version = version
+    bundle.manifest = manifest
+    return bundle
+
+
+class ModelManager:
+    """Serves one active bundle and swaps in new versions without dropping requests.
+
+    Request handlers read `manager.active` once and keep using that bundle,
+    so a swap only affects requests that start after it. New versions are
+    loaded, verified and warmed up (see scripts/warmup.py) before the single
+    reference assignment that makes them active. Every worker process polls
+    models/CURRENT, so activating or rolling back a version on disk reaches
+    all gunicorn workers. Only the version name of the replaced bundle is
+    kept, so its arrays are freed once the requests still using it finish.
+    """
+
+    def __init__(self, models_dir="models", prepare=None, warm=warm_up):
+        self.models_dir = models_dir
+        self.prepare = prepare
+        self.warm = warm
+        self.active = None
+        self.previous_version = None
+        self.loading = None
+        self.last_error = None
+        self.loaded_at = None
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    @property
+    def version(self):
+        return self.active.version if self.active is not None else None
+
+    @property
+    def ready(self):
+        """True once a bundle has been loaded and warmed up"""
+        return self.active is not None
+
+    def load(self, version=None):
+        """Load, verify and warm a version, then swap it in; returns True on success"""
+        version = version or current_version(self.models_dir)
+        with self._lock:
+            if self.active is not None and self.active.version == version:
+                return True
+            self.loading = version
+            try:
+                bundle = load_version(self.models_dir, version, self.prepare)
+                bundle.warmup = self.warm(bundle) if self.warm is not None else None
+            except Exception as e:
+                self.last_error = f"{version}: {e}"
+                print(f"Error loading model version {version}: {e}")
+                return False
+            finally:
+                self.loading = None
+            self.previous_version = self.version
+            self.active = bundle
+            self.loaded_at = time.time()
+            self.last_error = None
+            print(f"Model version {version} is now active")
+            return True
+
+    def reload_async(self, version=None):
+        """Load a version in a background thread; ready stays false until the first load finishes"""
+        thread = threading.Thread(target=self.load, args=(version,), daemon=True)
+        thread.start()
+        return thread
+
+    def rollback(self):
+        """Activate the previous version on disk for every worker and load it here"""
+        version = rollback(self.models_dir)
+        return self.load(version)
+
+    def check(self):
+        """Reload if models/CURRENT names a version other than the active one"""
+        version = current_version(self.models_dir)
+        if self.active is None or version != self.active.version:
+            self.load(version)
+
+    def watch(self, interval=5.0):
+        """Poll models/CURRENT in a background thread"""
+        if self._watcher is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.check()
+                except Exception as e:
+                    print(f"Model watcher error: {e}")
+
+        self._watcher = threading.Thread(target=run, daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        return {
+            'model_version': self.version,
+            'previous_version': self.previous_version,
+            'loading_version': self.loading,
+            'available_versions': [m['version'] for m in list_versions(self.models_dir)],
+            'last_reload_error': self.last_error,
+            'ready': self.ready,
+            'warmup': self.active.warmup if self.active is not None else None,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage versioned model bundles")
+    parser.add_argument("--models_dir", default="models")
+    commands = parser.add_subparsers(dest="command", required=True)
+    publish = commands.add_parser("publish", help="Publish the artifacts in --source as a new version")
+    publish.add_argument("--source", default="models")
+    publish.add_argument("--version", default=None)
+    publish.add_argument("--no-activate", action="store_true")
+    commands.add_parser("list", help="List published versions")
+    activate = commands.add_parser("activate", help="Make a version current")
+    activate.add_argument("version")
+    commands.add_parser("rollback", help="Reactivate the previous version")
+    verify = commands.add_parser("verify", help="Check a version against its manifest")
+    verify.add_argument("version", nargs="?")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "publish":
+            manifest = publish_bundle(args.source, args.models_dir, args.version, not args.no_activate)
+            print(f" Published {manifest['version']}")
+        elif args.command == "list":
+            active = current_version(args.models_dir)
+            for manifest in list_versions(args.models_dir):
+                marker = "*" if manifest['version'] == active else " "
+                size = sum(f['bytes'] for f in manifest['files'].values())
+                print(f" {marker} {manifest['version']}  {manifest['created_at']}  {size / 1e6:.1f} MB")
+        elif args.command == "activate":
+            activate_version(args.models_dir, args.version)
+            print(f" Activated {args.version}")
+        elif args.command == "rollback":
+            print(f" Rolled back to {rollback(args.models_dir)}")
+        elif args.command == "verify":
+            version = args.version or current_version(args.models_dir)
+            verify_bundle(args.models_dir, version)
+            print(f" {version}: all checksums match")
+    except BundleError as e:
+        print(f" Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Ensemble vs single-model sigmoid calibration.
+
+CalibratedClassifierCV(LinearSVC, method='sigmoid', cv=3) keeps one SVM and
+one sigmoid per fold. All three SVMs are evaluated on every prediction and
+their probabilities averaged. With calibration='single' (ensemble=False),
+one LinearSVC is fitted on all the training rows. A single sigmoid is
+fitted on its cross-validated decision values, so inference is one dot
+product and the pickle holds one coefficient vector instead of three.
+
+model_training.py --calibration single trains the served models this way.
+This script fits both on the same training split and compares the fit
+time, model size, per-article latency, accuracy and calibration (log loss,
+Brier score, expected calibration error) on the held-out split.
+
+Usage:
+    python scripts/calibration.py --sample_size 5000
+    python scripts/calibration.py --csv corpus.csv --json calibration_report.json
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.metrics import brier_score_loss, log_loss
+from sklearn.svm import LinearSVC
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from scripts.evaluate import expected_calibration_error
+
+CALIBRATIONS = ('ensemble', 'single')
+
+
+def make_calibrated_svm(calibration='ensemble', cv=3):
+    """The calibrated LinearSVC used for every served model.
+
+    'ensemble' keeps the cv fold SVMs and averages them; 'single' keeps one
+    SVM fitted on all rows plus one sigmoid fitted on its cross-validated
+    decision values.
+    """
+    if calibration not in CALIBRATIONS:
+        raise ValueError(f"Unknown calibration: {calibration} (choose from {', '.join(CALIBRATIONS)})")
+    return CalibratedClassifierCV(
+        estimator=LinearSVC(C=1.0, class_weight='balanced', max_iter=5000, dual=True),
+        method='sigmoid', cv=cv, ensemble=calibration == 'ensemble'
+    )
+
+
+def calibration_metrics(model, X, labels):
+    proba = model.predict_proba(X)
+    positive = proba[:, list(model.classes_).index(1)]
+    predicted = model.classes_[np.argmax(proba, axis=1)]
+    correct = predicted == np.asarray(labels)
+    return {
+        'accuracy': float(np.mean(correct)),
+        'log_loss': float(log_loss(labels, proba, labels=model.classes_)),
+        'brier': float(brier_score_loss(labels, positive)),
+        'ece': expected_calibration_error(proba.max(axis=1), correct),
+    }, predicted
+
+
+def _latency_ms(model, X, articles=200, batch_size=256, repeat=5):
+    """(ms per article scored one at a time, ms per article in batches of batch_size)"""
+    rows = [X[i] for i in range(min(articles, X.shape[0]))]
+    batch = X[:batch_size]
+    single = batch_time = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for row in rows:
+            model.predict_proba(row)
+        elapsed = (time.perf_counter() - started) / len(rows)
+        single = elapsed if single is None else min(single, elapsed)
+        started = time.perf_counter()
+        model.predict_proba(batch)
+        elapsed = (time.perf_counter() - started) / batch.shape[0]
+        batch_time = elapsed if batch_time is None else min(batch_time, elapsed)
+    return 1000 * single, 1000 * batch_time
+
+
+def compare_calibrations(X_train, y_train, X_test, y_test, calibrations=CALIBRATIONS, repeat=5):
+    """Fit a model per calibration on the training rows and report its cost and quality on the test rows"""
+    X_train, X_test = sparse.csr_matrix(X_train), sparse.csr_matrix(X_test)
+    report, predictions = {}, {}
+    for calibration in calibrations:
+        started = time.perf_counter()
+        model = make_calibrated_svm(calibration).fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - started
+        metrics, predictions[calibration] = calibration_metrics(model, X_test, y_test)
+        single_ms, batch_ms = _latency_ms(model, X_test, repeat=repeat)
+        report[calibration] = {
+            'svms': len(model.calibrated_classifiers_),
+            'fit_seconds': fit_seconds,
+            'model_bytes': len(pickle.dumps(model)),
+            **metrics,
+            'single_ms_per_article': single_ms,
+            'batch_ms_per_article': batch_ms,
+        }
+    if 'ensemble' in predictions:
+        for calibration, predicted in predictions.items():
+            report[calibration]['agreement_with_ensemble'] = float(np.mean(predicted == predictions['ensemble']))
+    return report
+
+
+def print_report(report, articles):
+    print(f"\n Calibration on {articles} held-out articles")
+    print(f" {'mode':<9} {'svms':>5} {'fit s':>7} {'model MB':>9} {'accuracy':>9} {'agree':>7} "
+          f"{'log loss':>9} {'brier':>7} {'ece':>7} {'1-by-1 ms':>10} {'batch ms':>9}")
+    for calibration, row in report.items():
+        print(f" {calibration:<9} {row['svms']:>5} {row['fit_seconds']:>7.1f} {row['model_bytes'] / 1e6:>9.2f} "
+              f"{row['accuracy']:>9.4f} {row.get('agreement_with_ensemble', 1.0):>7.4f} "
+              f"{row['log_loss']:>9.4f} {row['brier']:>7.4f} {row['ece']:>7.4f} "
+              f"{row['single_ms_per_article']:>10.3f} {row['batch_ms_per_article']:>9.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost and calibration of ensemble vs single-model calibration")
+    parser.add_argument("--csv", default=None, help="Labeled CSV with 'text' and 'label' (1 = real, 0 = fake) columns; defaults to data/True.csv + data/Fake.csv")
+    parser.add_argument("--sample_size", type=int, default=10000, help="Rows per class from data/ (0 = all rows)")
+    parser.add_argument("--feature_store", default="features",
+                        help="Directory of cached feature rows shared with model_training.py")
+    parser.add_argument("--no_feature_store", action="store_true", help="Recompute every feature from scratch")
+    parser.add_argument("--repeat", type=int, default=5, help="Latency rounds; the fastest is reported")
+    parser.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    from scripts.feature_store import FeatureStore
+    from scripts.model_training import load_data, training_features
+
+    if args.csv:
+        df = pd.read_csv(args.csv)
+    else:
+        true_df, fake_df = load_data(sample_size=args.sample_size or None)
+        if true_df is None or fake_df is None:
+            print(" Failed to load required data files")
+            sys.exit(1)
+        true_df['label'] = 1
+        fake_df['label'] = 0
+        df = pd.concat([true_df, fake_df]).sample(frac=1, random_state=42).reset_index(drop=True)
+
+    store = None if args.no_feature_store else FeatureStore(args.feature_store)
+    features = training_features(df['text'], df['label'], store)
+    X_train = sparse.hstack([features.X_train_word, features.X_train_char, features.X_train_num_scaled]).tocsr()
+    X_test = sparse.hstack([features.X_test_word, features.X_test_char, features.X_test_num_scaled]).tocsr()
+
+    report = compare_calibrations(X_train, features.y_train, X_test, features.y_test, repeat=args.repeat)
+    print_report(report, X_test.shape[0])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'articles': X_test.shape[0], 'calibrations': report}, f, indent=2)
+        print(f"\n Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
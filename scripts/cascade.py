@@ -0,0 +1,136 @@
+"""
+Accuracy and latency of the two-stage cascade.
+
+The word-only model (models/news_svm_word.pkl, trained by model_training.py)
+scores every article; the full word + char model only runs when its
+confidence is below the threshold. For each threshold this reports the
+fraction of articles that exit early, the per-article latency of the
+featurize + score stages and end to end, and the accuracy change against
+always running the full model.
+
+Usage:
+    python scripts/cascade.py --thresholds 0.9 0.95 0.99
+    python scripts/cascade.py --csv heldout.csv --json cascade_report.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from scripts.inference import load_bundle, prepare_article, score_articles
+from scripts.quantize import load_heldout
+
+DEFAULT_THRESHOLDS = (0.8, 0.9, 0.95, 0.98, 0.99)
+
+
+def _identity_translate(text, source):
+    return text
+
+
+def cascade_report(bundle, texts, labels, thresholds=DEFAULT_THRESHOLDS):
+    """Score held-out articles one at a time, as the web API does, at every threshold"""
+    if bundle.get('word_model') is None:
+        raise ValueError("Bundle has no word-only model; retrain with scripts/model_training.py")
+
+    prepare_seconds = 0.0
+    articles = []
+    for text in texts:
+        started = time.perf_counter()
+        articles.append(prepare_article(text, translate=_identity_translate))
+        prepare_seconds += time.perf_counter() - started
+    keep = [i for i, article in enumerate(articles) if article.cleaned_text]
+    articles = [articles[i] for i in keep]
+    labels = np.asarray(labels)[keep]
+    prepare_ms = 1000 * prepare_seconds / len(texts)
+
+    def run(threshold):
+        predictions, early = [], []
+        started = time.perf_counter()
+        for article in articles:
+            prediction, _, early_exit = score_articles(bundle, [article], threshold)
+            predictions.append(prediction[0])
+            early.append(early_exit[0])
+        ms = 1000 * (time.perf_counter() - started) / len(articles)
+        return np.array(predictions), np.array(early), ms
+
+    full_predictions, _, full_ms = run(None)
+    full_accuracy = float(np.mean(full_predictions == labels))
+    report = {
+        'articles': len(articles),
+        'prepare_ms': prepare_ms,
+        'full': {'accuracy': full_accuracy, 'model_ms': full_ms, 'total_ms': prepare_ms + full_ms},
+        'thresholds': {},
+    }
+    for threshold in thresholds:
+        predictions, early, ms = run(threshold)
+        accuracy = float(np.mean(predictions == labels))
+        report['thresholds'][str(threshold)] = {
+            'early_exit_fraction': float(early.mean()),
+            'accuracy': accuracy,
+            'accuracy_delta': accuracy - full_accuracy,
+            'agreement_with_full': float(np.mean(predictions == full_predictions)),
+            'model_ms': ms,
+            'total_ms': prepare_ms + ms,
+            'latency_saved': 1 - (prepare_ms + ms) / (prepare_ms + full_ms),
+        }
+    return report
+
+
+def print_report(report):
+    full = report['full']
+    print(f"\n Cascade on {report['articles']} held-out articles "
+          f"(detect/clean/numeric features {report['prepare_ms']:.2f} ms per article)")
+    print(f" {'threshold':>9} {'early exit':>11} {'accuracy':>9} {'delta':>8} {'agree':>7} "
+          f"{'model ms':>9} {'total ms':>9} {'saved':>7}")
+    print(f" {'full only':>9} {0:>11.3f} {full['accuracy']:>9.4f} {0:>8.4f} {1:>7.3f} "
+          f"{full['model_ms']:>9.3f} {full['total_ms']:>9.3f} {0:>7.1%}")
+    for threshold, row in report['thresholds'].items():
+        print(f" {threshold:>9} {row['early_exit_fraction']:>11.3f} {row['accuracy']:>9.4f} "
+              f"{row['accuracy_delta']:>+8.4f} {row['agreement_with_full']:>7.3f} {row['model_ms']:>9.3f} "
+              f"{row['total_ms']:>9.3f} {row['latency_saved']:>7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Early-exit rate, latency and accuracy of the word-only cascade")
+    parser.add_argument("--models_dir", default="models")
+    parser.add_argument("--csv", default=None, help="Labeled CSV with 'text' and 'label' (1 = real, 0 = fake) columns; defaults to the training held-out split")
+    parser.add_argument("--sample_size", type=int, default=10000, help="Rows per class when rebuilding the held-out split")
+    parser.add_argument("--limit", type=int, default=None, help="Only score the first N articles")
+    parser.add_argument("--thresholds", nargs="+", type=float, default=list(DEFAULT_THRESHOLDS))
+    parser.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    if args.csv:
+        df = pd.read_csv(args.csv)
+        texts, labels = df['text'].astype(str).tolist(), df['label'].tolist()
+    else:
+        texts, labels = load_heldout(args.sample_size)
+        if texts is None:
+            print(" No held-out data available; pass --csv")
+            sys.exit(1)
+    if args.limit:
+        texts, labels = texts[:args.limit], labels[:args.limit]
+
+    try:
+        report = cascade_report(load_bundle(args.models_dir), texts, labels, args.thresholds)
+    except ValueError as e:
+        print(f" Error: {e}")
+        sys.exit(1)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Fast inference-time replacement for TfidfVectorizer(analyzer='char').
+
+sklearn's char analyzer builds a Python list with every 3-5 character
+substring of the article and looks each one up in the vocabulary dict.
+FastCharVectorizer instead encodes the text once as an integer array and
+computes every n-gram as an exact base-(alphabet + 1) number over the
+characters that occur in the vocabulary, so n-grams are matched against
+a sorted key array with numpy and never exist as Python strings. Counts
+go through the fitted TfidfTransformer, so rows are identical to
+char_vectorizer.transform.
+
+Usage:
+    python scripts/char_ngrams.py --lengths 200 1000 5000 20000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+
+import joblib
+import numpy as np
+from scipy import sparse
+
+_white_spaces = re.compile(r"\s\s+")
+_MAX_KEY = 2 ** 63 - 1
+
+
+def _codepoints(text):
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+
+class FastCharVectorizer:
+    """Drop-in transform() for a fitted char TfidfVectorizer"""
+
+    def __init__(self, vectorizer, dtype=None):
+        if not self.supports(vectorizer):
+            raise ValueError("FastCharVectorizer needs a fitted analyzer='char' vectorizer with a compact alphabet")
+        self.vectorizer = vectorizer
+        self.dtype = dtype or vectorizer.dtype
+        self.vocabulary_ = vectorizer.vocabulary_
+        self.n_features = len(vectorizer.vocabulary_)
+        self.min_n, self.max_n = vectorizer.ngram_range
+        self.preprocess = vectorizer.build_preprocessor()
+
+        alphabet = sorted(set("".join(self.vocabulary_)))
+        self.alphabet = np.array([ord(c) for c in alphabet], dtype=np.uint32)
+        self.base = len(alphabet) + 1
+
+        keys, columns = [], []
+        for n, terms in self._terms_by_length().items():
+            codes = np.searchsorted(self.alphabet, _codepoints("".join(terms))).reshape(-1, n) + 1
+            term_keys = np.zeros(len(terms), dtype=np.int64)
+            for offset in range(n):
+                term_keys = term_keys * self.base + codes[:, offset]
+            keys.append(term_keys)
+            columns.append(np.array([self.vocabulary_[term] for term in terms], dtype=np.int64))
+        keys = np.concatenate(keys)
+        columns = np.concatenate(columns)
+        order = np.argsort(keys)
+        self.keys = keys[order]
+        self.columns = columns[order]
+
+    @staticmethod
+    def supports(vectorizer):
+        if getattr(vectorizer, 'analyzer', None) != 'char' or getattr(vectorizer, 'input', None) != 'content':
+            return False
+        if not hasattr(vectorizer, 'vocabulary_'):
+            return False
+        base = len(set("".join(vectorizer.vocabulary_))) + 1
+        return base ** vectorizer.ngram_range[1] <= _MAX_KEY
+
+    def _terms_by_length(self):
+        groups = {}
+        for term in self.vocabulary_:
+            groups.setdefault(len(term), []).append(term)
+        return groups
+
+    def _encode(self, text):
+        """Map characters to 1..len(alphabet), and 0 for characters outside the vocabulary"""
+        points = _codepoints(text)
+        positions = np.searchsorted(self.alphabet, points)
+        positions[positions == len(self.alphabet)] = 0
+        known = self.alphabet[positions] == points
+        return np.where(known, positions + 1, 0).astype(np.int64)
+
+    def _document_columns(self, text):
+        codes = self._encode(_white_spaces.sub(" ", self.preprocess(text)))
+        length = len(codes)
+        unknown = np.concatenate(([0], np.cumsum(codes == 0)))
+        matched = []
+        for n in range(self.min_n, min(self.max_n, length) + 1):
+            windows = length - n + 1
+            keys = np.zeros(windows, dtype=np.int64)
+            for offset in range(n):
+                keys = keys * self.base + codes[offset:offset + windows]
+            keys = keys[unknown[n:] == unknown[:windows]]
+            slots = np.searchsorted(self.keys, keys)
+            slots[slots == len(self.keys)] = 0
+            hits = self.keys[slots] == keys
+            matched.append(self.columns[slots[hits]])
+        if not matched:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(matched), return_counts=True)
+
+    def counts(self, raw_documents, dtype=None):
+        """Return the raw n-gram count matrix, like CountVectorizer.transform"""
+        if isinstance(raw_documents, str):
+            raise ValueError("Iterable over raw text documents expected, string object received.")
+        indptr = [0]
+        indices, values = [], []
+        for document in raw_documents:
+            columns, counts = self._document_columns(document)
+            indices.append(columns)
+            values.append(counts)
+            indptr.append(indptr[-1] + len(columns))
+        indices = np.concatenate(indices).astype(np.int32) if indices else np.empty(0, dtype=np.int32)
+        values = np.concatenate(values) if values else np.empty(0)
+        return sparse.csr_matrix(
+            (values.astype(dtype or self.dtype), indices, np.array(indptr, dtype=np.int32)),
+            shape=(len(indptr) - 1, self.n_features),
+        )
+
+    def transform(self, raw_documents):
+        return self.vectorizer._tfidf.transform(self.counts(raw_documents), copy=False)
+
+
+def fast_char_vectorizer(vectorizer):
+    """Wrap vectorizer in FastCharVectorizer when it can be reproduced exactly, else return it unchanged"""
+    if FastCharVectorizer.supports(vectorizer):
+        return FastCharVectorizer(vectorizer)
+    return vectorizer
+
+
+def _synthetic_article(vectorizer, length, seed=0):
+    rng = random.Random(seed)
+    words = [term.strip() for term in vectorizer.vocabulary_ if " " not in term.strip()]
+    parts, size = [], 0
+    while size < length:
+        word = rng.choice(words) + rng.choice(words)
+        parts.append(word)
+        size += len(word) + 1
+    return " ".join(parts)[:length]
+
+
+def benchmark(vectorizer, lengths, repeat=5):
+    """Time sklearn's transform against FastCharVectorizer for each article length"""
+    fast = FastCharVectorizer(vectorizer)
+    rows = []
+    for length in lengths:
+        documents = [_synthetic_article(vectorizer, length, seed) for seed in range(repeat)]
+        started = time.perf_counter()
+        expected = vectorizer.transform(documents)
+        sklearn_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        actual = fast.transform(documents)
+        fast_seconds = time.perf_counter() - started
+        rows.append({
+            'length': length,
+            'sklearn_ms': 1000 * sklearn_seconds / repeat,
+            'fast_ms': 1000 * fast_seconds / repeat,
+            'identical': (expected != actual).nnz == 0,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fast char n-gram vectorizer against sklearn")
+    parser.add_argument("--vectorizer", default="models/tfidf_char.pkl")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[200, 1000, 5000, 20000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    vectorizer = joblib.load(args.vectorizer)
+    if not FastCharVectorizer.supports(vectorizer):
+        print(" This vectorizer cannot be reproduced exactly by FastCharVectorizer")
+        sys.exit(1)
+
+    print(f" {'chars':>8} {'sklearn ms':>11} {'fast ms':>9} {'speedup':>8} {'identical':>10}")
+    for row in benchmark(vectorizer, args.lengths, args.repeat):
+        speedup = row['sklearn_ms'] / row['fast_ms'] if row['fast_ms'] else float('inf')
+        print(f" {row['length']:>8} {row['sklearn_ms']:>11.2f} {row['fast_ms']:>9.2f} "
+              f"{speedup:>7.1f}x {str(row['identical']):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import StandardScaler
+from sklearn.utils import Bunch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.calibration import make_calibrated_svm
+from scripts.inference import extract_numeric_features
+from scripts.model_training import NUM_FEATURE_COLUMNS
+from scripts.utils import clean_text
+
+REAL_WORDS = ("government official report minister announced parliament economy "
+              "growth policy data survey researchers confirmed statement").split()
+FAKE_WORDS = ("shocking secret miracle cure exposed hoax truth they hide click "
+              "share viral unbelievable banned").split()
+
+
+def toy_articles(n=200, seed=0):
+    """Labeled English articles (1 = real, 0 = fake) with separable vocabularies"""
+    rng = np.random.RandomState(seed)
+    texts, labels = [], []
+    for i in range(n):
+        label = i % 2
+        words = list(rng.choice(REAL_WORDS if label else FAKE_WORDS, size=rng.randint(20, 60)))
+        words += list(rng.choice(REAL_WORDS + FAKE_WORDS, size=5))
+        texts.append(" ".join(words).capitalize() + ("." if label else "!!!"))
+        labels.append(label)
+    return texts, labels
+
+
+def train_toy_bundle(texts, labels):
+    """Fit the production pipeline (word + char TF-IDF, scaled numeric features, calibrated SVM
+    and the word-only cascade model) on texts"""
+    cleaned = [clean_text(text) for text in texts]
+    num = np.array([[extract_numeric_features(text, False)[col] for col in NUM_FEATURE_COLUMNS] for text in texts])
+    word_vectorizer = TfidfVectorizer(ngram_range=(1, 2), min_df=2, max_df=0.95, strip_accents='unicode')
+    char_vectorizer = TfidfVectorizer(analyzer='char', ngram_range=(3, 5), min_df=2)
+    scaler = StandardScaler(with_mean=False)
+    X_word = word_vectorizer.fit_transform(cleaned)
+    X_num = scaler.fit_transform(num)
+    X = sparse.hstack([X_word, char_vectorizer.fit_transform(cleaned), X_num]).tocsr()
+    model = make_calibrated_svm().fit(X, labels)
+    word_model = make_calibrated_svm().fit(sparse.hstack([X_word, X_num]).tocsr(), labels)
+    feature_names = (list(word_vectorizer.get_feature_names_out())
+                     + [f"<char:{f}>" for f in char_vectorizer.get_feature_names_out()]
+                     + NUM_FEATURE_COLUMNS)
+    metadata = Bunch(model_type='CalibratedLinearSVC', num_feature_columns=NUM_FEATURE_COLUMNS,
+                     word_vocab_size=len(word_vectorizer.vocabulary_),
+                     char_vocab_size=len(char_vectorizer.vocabulary_))
+    return Bunch(model=model, word_vectorizer=word_vectorizer, char_vectorizer=char_vectorizer,
+                 scaler=scaler, feature_names=feature_names, metadata=metadata, word_model=word_model)
+
+
+@pytest.fixture(scope="session")
+def toy_bundle():
+    return train_toy_bundle(*toy_articles())
+
+
+def fake_translate(text, source):
+    """Offline stand-in for GoogleTranslator"""
+    return "translated " + text
@@ -0,0 +1,341 @@
+"""
+Deterministic synthetic corpus for offline training, benchmarks and load tests.
+
+Writes data/True.csv and data/Fake.csv in the schema load_data reads
+(title, text, subject, date, plus a language column). Optionally it also
+writes one labeled CSV for the --csv options of the report scripts, and a
+one-article-per-line file for predict.py --batch and loadgen.py.
+
+Articles are drawn from per-language vocabularies, one for each of the 13
+supported languages, in their own scripts. Each vocabulary is seeded from
+the warmup sample sentences and extended with recombined word fragments,
+and words follow a Zipf distribution. Real and fake articles differ in
+cue words, punctuation, capitals and numbers, so a model trained on the
+corpus learns something, and label_noise makes the task harder. The knobs:
+
+    length          lognormal (median_words, sigma) or uniform, clipped to min_words..max_words
+    languages       share of each language, e.g. "en=0.5" (the rest split evenly) or "all"
+    code_mix        share of non-English articles with English words mixed in
+    duplicate_rate  share of rows that are perturbed reposts of an earlier row
+    label_noise     share of rows whose stored label is flipped
+
+The same seed and options always give the same rows. Generating more rows
+only appends: the first k rows of a larger corpus are the k-row corpus.
+
+Usage:
+    python scripts/corpus.py --rows 20000 --out data
+    python scripts/corpus.py --rows 1000000 --out /tmp/big --duplicate_rate 0.05 --labeled /tmp/big/corpus.csv
+    python scripts/corpus.py --rows 5000 --languages all --code_mix 0.2 --articles articles.txt
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import sys
+import time
+import unicodedata
+import zlib
+from collections import Counter, deque
+from functools import lru_cache
+
+import numpy as np
+from sklearn.utils import Bunch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+LANGUAGES = ('en', 'hi', 'mr', 'ta', 'te', 'bn', 'gu', 'kn', 'ml', 'pa', 'or', 'ur', 'as')
+CSV_FIELDS = ['title', 'text', 'subject', 'date', 'language']
+LABELED_FIELDS = ['id', 'title', 'text', 'label', 'language', 'duplicate_of']
+SUBJECTS = {1: ('politicsNews', 'worldnews'), 0: ('News', 'politics', 'left-news', 'Government News')}
+
+_ENGLISH = ("the a of and to in on for with at by from as that this was were is are has have had will would "
+            "said says after before over under about more than new year years people city state country "
+            "government minister report police court election market health school village farmers river "
+            "bridge project budget officials statement company workers students hospital vaccine rally "
+            "protest border army water power scheme tax price railway airport festival temple flood "
+            "drought rain survey data study scientists doctors media channel party leader district nation "
+            "week month today morning evening local national public private service plan support growth "
+            "policy economy council committee agency program region official security trade energy").split()
+_REAL_CUES = ("announced confirmed according statement spokesperson quarterly parliament ministry "
+              "researchers published percent estimated officials reported").split()
+_FAKE_CUES = ("shocking secret miracle exposed hoax truth hidden viral unbelievable banned leaked "
+              "insiders share forward urgent").split()
+_FOOTERS = ["Share this with everyone before it gets deleted!", "Forward to all your groups.",
+            "Follow us for more updates.", "Source: WhatsApp forward"]
+_PUNCTUATION = ".,!?;:\"'()“”‘’।॥۔"
+_CUE_WORDS = 16
+
+
+def _is_mark(char):
+    return unicodedata.category(char).startswith('M')
+
+
+def _fragments_word(rng, words):
+    """A new word from the start of one known word and the end of another"""
+    first, second = words[rng.randint(len(words))], words[rng.randint(len(words))]
+    head = first[:rng.randint(1, len(first) + 1)]
+    start = rng.randint(len(second))
+    # Two vowel signs in a row do not occur in these scripts; drop the tail's leading ones
+    while start < len(second) and _is_mark(second[start]) and _is_mark(head[-1]):
+        start += 1
+    return head + second[start:]
+
+
+@lru_cache(maxsize=None)
+def _language_pool(language, size):
+    """Vocabulary (sample words first, most frequent), Zipf cdf, sentence terminator and cue words"""
+    from scripts.warmup import SAMPLE_TEXTS
+
+    sample = SAMPLE_TEXTS[language]
+    seen = _ENGLISH if language == 'en' else [word.strip(_PUNCTUATION) for word in sample.split()]
+    seen = list(dict.fromkeys(word for word in seen if word))
+    rng = np.random.RandomState(zlib.crc32(language.encode()))
+    vocabulary, known = list(seen), set(seen)
+    while len(vocabulary) < size:
+        # Recombine generated words too: a dozen sample words alone do not yield enough distinct fragments
+        word = _fragments_word(rng, vocabulary)
+        if 1 < len(word) <= 14 and word not in known:
+            known.add(word)
+            vocabulary.append(word)
+    vocabulary = np.array(vocabulary[:size], dtype=object)
+
+    weights = 1.0 / (np.arange(len(vocabulary)) + 2.7) ** 1.05
+    cdf = np.cumsum(weights)
+    cdf /= cdf[-1]
+    if language == 'en':
+        real_cues, fake_cues = np.array(_REAL_CUES, dtype=object), np.array(_FAKE_CUES, dtype=object)
+    else:
+        cues = rng.choice(np.arange(len(seen), len(vocabulary)), size=2 * _CUE_WORDS, replace=False)
+        real_cues, fake_cues = vocabulary[cues[:_CUE_WORDS]], vocabulary[cues[_CUE_WORDS:]]
+    terminator = sample.rstrip()[-1] if sample.rstrip()[-1] in "।۔" else "."
+    return Bunch(words=vocabulary, cdf=cdf, terminator=terminator, real_cues=real_cues, fake_cues=fake_cues)
+
+
+def parse_language_mix(spec):
+    """{language: share} from "all", or "en=0.5,hi=0.1" with unlisted languages splitting the rest evenly"""
+    if spec in (None, '', 'all'):
+        return {language: 1.0 / len(LANGUAGES) for language in LANGUAGES}
+    mix = {}
+    for part in spec.split(','):
+        language, _, share = part.partition('=')
+        language = language.strip()
+        if language not in LANGUAGES:
+            raise ValueError(f"Unknown language: {language} (choose from {', '.join(LANGUAGES)})")
+        mix[language] = float(share) if share else 1.0
+    listed = sum(mix.values())
+    rest = [language for language in LANGUAGES if language not in mix]
+    if listed < 1.0 and rest:
+        mix.update({language: (1.0 - listed) / len(rest) for language in rest})
+    total = sum(mix.values())
+    return {language: mix.get(language, 0.0) / total for language in LANGUAGES if mix.get(language, 0.0) > 0}
+
+
+def _length(rng, length, median_words, sigma, min_words, max_words):
+    if length == 'uniform':
+        return rng.randint(min_words, max_words + 1)
+    return int(np.clip(median_words * np.exp(sigma * rng.standard_normal()), min_words, max_words))
+
+
+def _words(rng, pool, n):
+    return pool.words[np.searchsorted(pool.cdf, rng.random_sample(n))]
+
+
+def _sentences(rng, words, label, pool, styled):
+    """Join words into sentences; fake articles shout more"""
+    ends = np.cumsum(rng.randint(8, 21, size=len(words) // 8 + 1))
+    ends = np.append(ends[ends < len(words)], len(words))
+    draws = rng.random_sample((3, len(ends)))
+    shouts = draws[0] < (0.35 if label == 0 else 0.02)
+    upper = draws[1] < 0.15 if styled and label == 0 else np.zeros(len(ends), dtype=bool)
+    quoted = draws[2] < 0.1 if label == 1 else np.zeros(len(ends), dtype=bool)
+    marks = rng.randint(1, 4, size=len(ends))
+    parts, start = [], 0
+    for i, end in enumerate(ends):
+        sentence = " ".join(words[start:end])
+        sentence = sentence.upper() if upper[i] else sentence[:1].upper() + sentence[1:]
+        sentence += "!" * marks[i] if shouts[i] else pool.terminator
+        parts.append(f'"{sentence}"' if quoted[i] else sentence)
+        start = end
+    return " ".join(parts)
+
+
+def _article(rng, language, label, n_words, pools, cue_rate, code_mixed):
+    pool = pools[language]
+    words = _words(rng, pool, n_words)
+    cues = np.flatnonzero(rng.random_sample(n_words) < cue_rate)
+    cue_words = pool.real_cues if label else pool.fake_cues
+    words[cues] = cue_words[rng.randint(len(cue_words), size=len(cues))]
+    if code_mixed:
+        mixed = np.flatnonzero(rng.random_sample(n_words) < 0.25)
+        words[mixed] = _words(rng, pools['en'], len(mixed))
+    numbers = np.flatnonzero(rng.random_sample(n_words) < (0.02 if label else 0.005))
+    words[numbers] = [str(value) for value in rng.randint(1, 2030, size=len(numbers))]
+    return _sentences(rng, words, label, pool, styled=language == 'en' or code_mixed)
+
+
+def _title(rng, language, label, pools):
+    pool = pools[language]
+    words = _words(rng, pool, rng.randint(6, 15))
+    cue_words = pool.real_cues if label else pool.fake_cues
+    words[rng.randint(len(words))] = cue_words[rng.randint(len(cue_words))]
+    title = " ".join(words)
+    title = title[:1].upper() + title[1:]
+    if label == 0 and rng.rand() < 0.4:
+        title = ("BREAKING: " if rng.rand() < 0.5 else "WATCH: ") + title.upper()
+    return title
+
+
+def _perturb(rng, text, language, pools):
+    """A repost: new opening, added footer, a few replaced words, or whitespace noise"""
+    words = text.split()
+    edits = rng.choice(4, size=rng.randint(1, 3), replace=False)
+    if 0 in edits:
+        words = ["BREAKING:"] + list(_words(rng, pools[language], 4)) + words[6:]
+    if 1 in edits:
+        words = words + _FOOTERS[rng.randint(len(_FOOTERS))].split()
+    if 2 in edits:
+        replace = rng.choice(len(words), size=max(len(words) // 40, 1), replace=False)
+        for i, word in zip(replace, _words(rng, pools[language], len(replace))):
+            words[i] = word
+    return ("  \n " if 3 in edits else " ").join(words)
+
+
+def iter_articles(n_rows, seed=0, languages='en=0.5', length='lognormal', median_words=350, sigma=0.6,
+                  min_words=20, max_words=3000, real_share=0.5, cue_rate=0.04, code_mix=0.0,
+                  duplicate_rate=0.0, label_noise=0.0, vocabulary=20000, recent=10000):
+    """Yield n_rows article dicts (LABELED_FIELDS plus subject and date) in a fixed order for seed"""
+    if length not in ('lognormal', 'uniform'):
+        raise ValueError(f"Unknown length distribution: {length}")
+    mix = parse_language_mix(languages) if isinstance(languages, str) else dict(languages)
+    names = list(mix)
+    shares = np.cumsum([mix[name] for name in names])
+    pools = {language: _language_pool(language, vocabulary) for language in set(names) | {'en'}}
+    rng = np.random.RandomState(seed)
+    originals = deque(maxlen=recent)
+    first_day = datetime.date(2016, 1, 1)
+
+    for i in range(n_rows):
+        if originals and rng.rand() < duplicate_rate:
+            source = originals[rng.randint(len(originals))]
+            language, label, duplicate_of = source['language'], source['true_label'], source['id']
+            title = source['title']
+            text = _perturb(rng, source['text'], language, pools)
+        else:
+            language = names[min(int(np.searchsorted(shares, rng.rand() * shares[-1], side='right')), len(names) - 1)]
+            label = int(rng.rand() < real_share)
+            n_words = _length(rng, length, median_words, sigma, min_words, max_words)
+            code_mixed = language != 'en' and rng.rand() < code_mix
+            title = _title(rng, language, label, pools)
+            text = _article(rng, language, label, n_words, pools, cue_rate, code_mixed)
+            duplicate_of = -1
+        stored = 1 - label if rng.rand() < label_noise else label
+        subjects = SUBJECTS[stored]
+        day = first_day + datetime.timedelta(days=int(rng.randint(730)))
+        row = {'id': i, 'title': title, 'text': text, 'label': stored, 'language': language,
+               'duplicate_of': duplicate_of, 'subject': subjects[rng.randint(len(subjects))],
+               'date': day.strftime("%B %d, %Y"), 'true_label': label}
+        if duplicate_of < 0:
+            originals.append(row)
+        yield row
+
+
+def write_corpus(out_dir, n_rows, labeled=None, articles=None, progress=None, **options):
+    """Stream the corpus into out_dir/True.csv and out_dir/Fake.csv (plus the optional outputs); returns a summary"""
+    os.makedirs(out_dir, exist_ok=True)
+    files = {label: open(os.path.join(out_dir, name), "w", encoding="utf-8", newline="")
+             for label, name in ((1, "True.csv"), (0, "Fake.csv"))}
+    if labeled:
+        files['labeled'] = open(labeled, "w", encoding="utf-8", newline="")
+    if articles:
+        files['articles'] = open(articles, "w", encoding="utf-8")
+    writers = {label: csv.DictWriter(files[label], fieldnames=CSV_FIELDS, extrasaction='ignore') for label in (0, 1)}
+    if labeled:
+        writers['labeled'] = csv.DictWriter(files['labeled'], fieldnames=LABELED_FIELDS, extrasaction='ignore')
+    for writer in writers.values():
+        writer.writeheader()
+
+    labels, languages, lengths, duplicates = Counter(), Counter(), [], 0
+    started = time.perf_counter()
+    try:
+        for row in iter_articles(n_rows, **options):
+            writers[row['label']].writerow(row)
+            if labeled:
+                writers['labeled'].writerow(row)
+            if articles:
+                files['articles'].write(" ".join(row['text'].split()) + "\n")
+            labels[row['label']] += 1
+            languages[row['language']] += 1
+            lengths.append(len(row['text'].split()))
+            duplicates += row['duplicate_of'] >= 0
+            if progress and (row['id'] + 1) % progress == 0:
+                print(f" {row['id'] + 1:,} rows ({(row['id'] + 1) / (time.perf_counter() - started):,.0f} rows/sec)",
+                      file=sys.stderr)
+    finally:
+        for f in files.values():
+            f.close()
+
+    lengths = np.array(lengths) if lengths else np.zeros(1)
+    return {
+        'rows': n_rows,
+        'real': labels[1],
+        'fake': labels[0],
+        'duplicates': duplicates,
+        'languages': dict(sorted(languages.items(), key=lambda item: -item[1])),
+        'words_p50': float(np.percentile(lengths, 50)),
+        'words_p95': float(np.percentile(lengths, 95)),
+        'words_max': int(lengths.max()),
+        'bytes': sum(os.path.getsize(f.name) for f in files.values()),
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic multilingual news corpus")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--out", default="data", help="Directory for True.csv and Fake.csv")
+    parser.add_argument("--labeled", default=None, help="Also write every row to this CSV with a label column")
+    parser.add_argument("--articles", default=None, help="Also write the texts to this file, one per line")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--languages", default="en=0.5", help='"all", or shares such as "en=0.5,hi=0.2"')
+    parser.add_argument("--length", choices=["lognormal", "uniform"], default="lognormal")
+    parser.add_argument("--median_words", type=int, default=350)
+    parser.add_argument("--sigma", type=float, default=0.6, help="Spread of the lognormal length distribution")
+    parser.add_argument("--min_words", type=int, default=20)
+    parser.add_argument("--max_words", type=int, default=3000)
+    parser.add_argument("--real_share", type=float, default=0.5)
+    parser.add_argument("--code_mix", type=float, default=0.0, help="Share of non-English articles mixing in English words")
+    parser.add_argument("--duplicate_rate", type=float, default=0.0, help="Share of rows that are perturbed reposts")
+    parser.add_argument("--label_noise", type=float, default=0.0, help="Share of rows with a flipped label")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="Words per language")
+    parser.add_argument("--json", default=None, help="Also write the summary to this JSON file")
+    args = parser.parse_args()
+
+    try:
+        summary = write_corpus(
+            args.out, args.rows, labeled=args.labeled, articles=args.articles, progress=100000,
+            seed=args.seed, languages=args.languages, length=args.length, median_words=args.median_words,
+            sigma=args.sigma, min_words=args.min_words, max_words=args.max_words, real_share=args.real_share,
+            code_mix=args.code_mix, duplicate_rate=args.duplicate_rate, label_noise=args.label_noise,
+            vocabulary=args.vocabulary,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"\n Wrote {summary['rows']:,} rows ({summary['real']:,} real, {summary['fake']:,} fake, "
+          f"{summary['duplicates']:,} near-duplicates) to {args.out}/ in {summary['seconds']:.1f}s "
+          f"({summary['bytes'] / 1e6:,.1f} MB)")
+    print(f" Words per article: p50 {summary['words_p50']:.0f}, p95 {summary['words_p95']:.0f}, "
+          f"max {summary['words_max']}")
+    print(" Languages: " + ", ".join(f"{language} {count:,}" for language, count in summary['languages'].items()))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Per-request deadlines and a circuit breaker around the translator.
+
+Every /api/analyze request gets a Deadline. The translator is the only
+stage that can take unbounded time, so it runs through a TranslationGuard.
+The guard waits for the translator only as long as the deadline allows,
+less a reserve kept for cleaning, vectorizing and scoring. It skips the
+call entirely when that budget is too small, or when its circuit breaker
+has opened after repeated translator failures or timeouts. A skipped or
+failed translation leaves the original text to be scored and records the
+reason on the deadline. The response then carries "degraded": true and
+the reasons. The cascade also checks the deadline: when over half of the
+reserve has been used up before scoring (a translator timeout leaves all
+of it) and a word-only model exists, it answers with that model instead
+of running char n-grams and the full model.
+
+    SATYASCAN_REQUEST_BUDGET_MS    time budget per request (default 8000, 0 = no deadline)
+    SATYASCAN_SCORING_RESERVE_MS   part of the budget kept for the local stages (default 500)
+    SATYASCAN_MIN_TRANSLATE_MS     skip translation when less than this is left for it (default 300)
+    SATYASCAN_BREAKER_FAILURES     consecutive translator failures that open the breaker (default 5)
+    SATYASCAN_BREAKER_RESET_S      seconds before an open breaker lets one trial call through (default 30)
+
+Show the tail latency with a slow translator, with and without the deadline:
+    python scripts/deadline.py --models_dir models --translate_delay 5 --requests 40
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from scripts.translation import TranslationError
+
+
+class TranslationSkipped(TranslationError):
+    """The guard did not use the translator for this request; reason says why"""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Deadline:
+    """Absolute time budget of one request; stages record why they had to cut corners"""
+
+    def __init__(self, seconds, reserve=0.0):
+        self.seconds = seconds
+        self.reserve = reserve
+        self.expires_at = time.monotonic() + seconds
+        self.degraded = []
+
+    def remaining(self):
+        return self.expires_at - time.monotonic()
+
+    def budget(self):
+        """Time optional stages may still use, leaving the scoring reserve untouched"""
+        return self.remaining() - self.reserve
+
+    def reserve_spent(self):
+        """True once less than half the scoring reserve is left, too little for the full model"""
+        return self.remaining() <= self.reserve / 2
+
+    def degrade(self, reason):
+        if reason not in self.degraded:
+            self.degraded.append(reason)
+
+
+class CircuitBreaker:
+    """Opens after `failures` consecutive failures; after `reset_after` seconds one trial call may close it"""
+
+    def __init__(self, failures=5, reset_after=30.0):
+        self.failures = failures
+        self.reset_after = reset_after
+        self.state = 'closed'
+        self.consecutive = 0
+        self.opened_at = None
+        self.trips = 0
+        self.short_circuited = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_after:
+                self.state = 'half_open'
+                self._trial = False
+            if self.state == 'closed' or (self.state == 'half_open' and not self._trial):
+                self._trial = self.state == 'half_open'
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.consecutive = 0
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self.consecutive >= self.failures):
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self.trips += 1
+            self._trial = False
+
+    def stats(self):
+        with self._lock:
+            return {'state': self.state, 'consecutive_failures': self.consecutive,
+                    'trips': self.trips, 'short_circuited': self.short_circuited}
+
+
+class TranslationGuard:
+    """Runs translate(text, source) under a request deadline and a circuit breaker"""
+
+    def __init__(self, translate, breaker=None, min_seconds=0.3, workers=8):
+        self.translate = translate
+        self.breaker = breaker or CircuitBreaker()
+        self.min_seconds = min_seconds
+        # Calls run on these threads so the request can stop waiting; a hung call keeps its thread
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="guarded-translate")
+        self.timeouts = 0
+        self.errors = 0
+
+    def __call__(self, text, source, deadline):
+        try:
+            return self._translate(text, source, deadline)
+        except TranslationSkipped as e:
+            deadline.degrade(e.reason)
+            raise
+
+    def _translate(self, text, source, deadline):
+        budget = deadline.budget()
+        if budget < self.min_seconds:
+            raise TranslationSkipped('deadline')
+        if not self.breaker.allow():
+            raise TranslationSkipped('translator_unavailable')
+        future = self._executor.submit(self.translate, text, source)
+        try:
+            translated = future.result(timeout=budget)
+        except FutureTimeout:
+            future.cancel()
+            self.timeouts += 1
+            self.breaker.record_failure()
+            raise TranslationSkipped('translator_timeout')
+        except Exception:
+            self.errors += 1
+            self.breaker.record_failure()
+            raise TranslationSkipped('translator_error')
+        self.breaker.record_success()
+        return translated
+
+    def bind(self, deadline):
+        """translate(text, source) for one request, as the pipeline expects"""
+        return lambda text, source: self(text, source, deadline)
+
+    @classmethod
+    def from_env(cls, translate, environ=os.environ):
+        breaker = CircuitBreaker(failures=int(environ.get('SATYASCAN_BREAKER_FAILURES', 5)),
+                                 reset_after=float(environ.get('SATYASCAN_BREAKER_RESET_S', 30)))
+        return cls(translate, breaker, min_seconds=float(environ.get('SATYASCAN_MIN_TRANSLATE_MS', 300)) / 1000)
+
+    def stats(self):
+        stats = self.breaker.stats()
+        stats.update(timeouts=self.timeouts, errors=self.errors)
+        return stats
+
+
+class SlowTranslator:
+    """Offline translator that sleeps delay seconds per call, standing in for a degraded provider"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def __call__(self, text, source):
+        time.sleep(self.delay)
+        return text
+
+
+def tail_latency(bundle, texts, translate, budget=None, reserve=0.5, guard=None):
+    """Per-request latency percentiles of analyze_article, with a Deadline when budget is set"""
+    from scripts.inference import analyze_article
+
+    latencies, degraded = [], 0
+    for text in texts:
+        started = time.perf_counter()
+        if budget is None:
+            result = analyze_article(bundle, text, 'hi', translate=translate, explain=False)
+        else:
+            deadline = Deadline(budget, reserve)
+            result = analyze_article(bundle, text, 'hi', translate=guard.bind(deadline), explain=False,
+                                     deadline=deadline)
+        latencies.append(time.perf_counter() - started)
+        degraded += result['degraded']
+    latencies = np.array(latencies) * 1000
+    return {
+        'requests': len(texts),
+        'degraded': degraded,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'max_ms': float(latencies.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tail latency of /api/analyze scoring with a slow translator")
+    parser.add_argument("--models_dir", default="models")
+    parser.add_argument("--translate_delay", type=float, default=5.0, help="Seconds the fake translator sleeps")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--budget_ms", type=float, default=1000)
+    parser.add_argument("--reserve_ms", type=float, default=200)
+    parser.add_argument("--breaker_failures", type=int, default=5)
+    parser.add_argument("--skip_baseline", action="store_true", help="Only run with the deadline")
+    args = parser.parse_args()
+
+    from scripts.bundles import ModelManager
+    from scripts.warmup import SAMPLE_TEXTS
+
+    manager = ModelManager(args.models_dir)
+    if not manager.load():
+        print(f" No model bundle found in {args.models_dir}")
+        sys.exit(1)
+    texts = [SAMPLE_TEXTS['hi']] * args.requests
+    translate = SlowTranslator(args.translate_delay)
+
+    rows = []
+    if not args.skip_baseline:
+        rows.append(('no deadline', tail_latency(manager.active, texts, translate)))
+    guard = TranslationGuard(translate, CircuitBreaker(args.breaker_failures, reset_after=3600))
+    rows.append((f'deadline {args.budget_ms:.0f} ms',
+                 tail_latency(manager.active, texts, translate, args.budget_ms / 1000, args.reserve_ms / 1000, guard)))
+
+    print(f"\n Translator delay {args.translate_delay:.1f}s, {args.requests} Hindi requests")
+    print(f" {'':<18} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'degraded':>9}")
+    for name, row in rows:
+        print(f" {name:<18} {row['p50_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f} {row['degraded']:>9}")
+    print(f" Breaker: {guard.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Near-duplicate index over recently analyzed articles.
+
+Reposted fake stories usually differ only in the headline, a share footer or
+whitespace. Each article is reduced to a MinHash signature over word
+3-shingles. LSH banding then finds candidates in a few dict lookups, and the
+stored verdict is reused when the estimated Jaccard similarity reaches the
+threshold. The index holds at most max_entries articles and evicts the least
+recently used one.
+
+    SATYASCAN_DEDUP_THRESHOLD   minimum estimated similarity for a hit (default 0.7)
+    SATYASCAN_DEDUP_ENTRIES     articles kept in the index (default 10000, 0 disables)
+
+Benchmark on a synthetic corpus of perturbed duplicates:
+    python scripts/dedup.py --articles 2000 --duplicates 2000
+"""
+
+import argparse
+import copy
+import json
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+SHINGLE_SIZE = 3
+_WORD = re.compile(r"[^\s!\"#$%&'()*+,\-./:;<=>?@\[\\\]^_`{|}~।॥“”‘’«»…–—]+")
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Hashes of the word shingles of text, ignoring case, punctuation and whitespace"""
+    words = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in _WORD.findall(text.lower())), dtype=np.uint64)
+    if len(words) <= size:
+        return words[:1] if len(words) == 0 else np.array([np.bitwise_xor.reduce(words * _MIX)])
+    combined = np.zeros(len(words) - size + 1, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for offset in range(size):
+            combined = combined * _MIX + words[offset:len(words) - size + 1 + offset]
+    return combined
+
+
+class MinHasher:
+    """Multiply-shift MinHash: h_i(x) = (a_i * x + b_i) mod 2**64 >> 32"""
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, 2 ** 62, size=num_perm, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.randint(0, 2 ** 62, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signature(self, text):
+        hashes = shingles(text)
+        if not len(hashes):
+            return None
+        with np.errstate(over='ignore'):
+            values = (hashes[:, None] * self.a[None, :] + self.b[None, :]) >> np.uint64(32)
+        return values.min(axis=0).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    """Bounded LRU index from MinHash signatures to stored analysis results"""
+
+    def __init__(self, threshold=0.7, max_entries=10000, num_perm=NUM_PERM, bands=BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self._entries = OrderedDict()
+        self._buckets = [{} for _ in range(bands)]
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.lookups = self.hits = self.inserts = self.evictions = 0
+        self.lookup_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        entries = int(environ.get('SATYASCAN_DEDUP_ENTRIES', 10000))
+        if entries <= 0:
+            return None
+        return cls(threshold=float(environ.get('SATYASCAN_DEDUP_THRESHOLD', 0.7)), max_entries=entries)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def lookup(self, text, key=None, signature=None):
+        """Return (result, similarity, signature); result is None on a miss.
+
+        key (e.g. model version and language) must match the stored entry.
+        Pass the returned signature to add() to avoid hashing the text twice.
+        """
+        started = time.perf_counter()
+        if signature is None:
+            signature = self.hasher.signature(text)
+        best, best_similarity = None, 0.0
+        with self._lock:
+            self.lookups += 1
+            if signature is not None:
+                candidates = set()
+                for band, band_key in enumerate(self._band_keys(signature)):
+                    candidates.update(self._buckets[band].get(band_key, ()))
+                for entry_id in candidates:
+                    entry_signature, entry_key, result = self._entries[entry_id]
+                    if entry_key != key:
+                        continue
+                    similarity = float(np.mean(entry_signature == signature))
+                    if similarity > best_similarity:
+                        best, best_similarity = entry_id, similarity
+                if best is not None and best_similarity >= self.threshold:
+                    self._entries.move_to_end(best)
+                    self.hits += 1
+                    self.lookup_seconds += time.perf_counter() - started
+                    return copy.deepcopy(self._entries[best][2]), best_similarity, signature
+            self.lookup_seconds += time.perf_counter() - started
+        return None, best_similarity, signature
+
+    def add(self, text, result, key=None, signature=None):
+        """Remember the result for text, evicting the least recently used entry when full"""
+        if signature is None:
+            signature = self.hasher.signature(text)
+        if signature is None:
+            return
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (signature, key, copy.deepcopy(result))
+            for band, band_key in enumerate(band_keys):
+                self._buckets[band].setdefault(band_key, set()).add(entry_id)
+            self.inserts += 1
+            while len(self._entries) > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        entry_id, (signature, _, _) = self._entries.popitem(last=False)
+        for band, band_key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band][band_key]
+            bucket.discard(entry_id)
+            if not bucket:
+                del self._buckets[band][band_key]
+        self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets = [{} for _ in range(self.bands)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'threshold': self.threshold,
+                'lookups': self.lookups,
+                'hits': self.hits,
+                'hit_rate': self.hits / self.lookups if self.lookups else 0.0,
+                'inserts': self.inserts,
+                'evictions': self.evictions,
+                'mean_lookup_us': 1e6 * self.lookup_seconds / self.lookups if self.lookups else 0.0,
+            }
+
+
+_WORDS = ("government minister report police court election market health school city village "
+          "farmers river bridge project budget officials statement company workers students hospital "
+          "vaccine rally protest border army water power scheme tax price railway airport festival "
+          "temple flood drought rain survey data study scientists doctors video viral claim secret "
+          "shocking leaked exposed truth media channel party leader village district state nation").split()
+_FOOTERS = ["Share this with everyone before it gets deleted!", "Forward to all your groups.",
+            "Follow us for more updates.", "Source: WhatsApp forward"]
+
+
+def perturb(text, rng):
+    """A repost of text: new headline, added footer, whitespace noise or a few changed words"""
+    words = text.split()
+    edits = rng.choice(4, size=rng.randint(1, 3), replace=False)
+    if 0 in edits:
+        words = ["BREAKING:"] + [str(rng.choice(_WORDS)).upper() for _ in range(4)] + ["!!"] + words[8:]
+    if 1 in edits:
+        words = words + _FOOTERS[rng.randint(len(_FOOTERS))].split()
+    if 2 in edits:
+        for i in rng.choice(len(words), size=max(len(words) // 40, 1), replace=False):
+            words[i] = str(rng.choice(_WORDS))
+    separator = "  \n " if 3 in edits else " "
+    return separator.join(words)
+
+
+def synthetic_corpus(n_articles=1000, n_duplicates=1000, seed=0, length=(80, 400)):
+    """Random base articles plus perturbed reposts; returns (originals, reposts, repost_of)"""
+    rng = np.random.RandomState(seed)
+    originals = [" ".join(rng.choice(_WORDS, size=rng.randint(*length))) for _ in range(n_articles)]
+    repost_of = rng.randint(n_articles, size=n_duplicates)
+    reposts = [perturb(originals[i], rng) for i in repost_of]
+    return originals, reposts, repost_of
+
+
+def benchmark(n_articles=1000, n_duplicates=1000, threshold=0.7, max_entries=None, seed=0):
+    """Index the originals, then look up reposts (should hit) and fresh articles (should miss)"""
+    originals, reposts, repost_of = synthetic_corpus(n_articles, n_duplicates, seed)
+    fresh, _, _ = synthetic_corpus(n_duplicates, 0, seed + 1)
+    index = NearDuplicateIndex(threshold, max_entries or n_articles)
+
+    started = time.perf_counter()
+    for i, text in enumerate(originals):
+        index.add(text, {'is_fake': bool(i % 2), 'article': i})
+    insert_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    signatures = [index.hasher.signature(text) for text in reposts]
+    signature_seconds = time.perf_counter() - started
+
+    hits = correct = false_hits = 0
+    started = time.perf_counter()
+    for text, signature, source in zip(reposts, signatures, repost_of):
+        result, _, _ = index.lookup(text, signature=signature)
+        hits += result is not None
+        correct += result is not None and result['article'] == source
+    lookup_seconds = time.perf_counter() - started
+    for text in fresh:
+        false_hits += index.lookup(text)[0] is not None
+
+    return {
+        'indexed': len(originals),
+        'reposts': len(reposts),
+        'repost_hit_rate': hits / len(reposts),
+        'repost_correct_rate': correct / len(reposts),
+        'fresh_false_hit_rate': false_hits / len(fresh),
+        'insert_us': 1e6 * insert_seconds / len(originals),
+        'signature_us': 1e6 * signature_seconds / len(reposts),
+        'lookup_us': 1e6 * lookup_seconds / len(reposts),
+        'stats': index.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the near-duplicate index on perturbed reposts")
+    parser.add_argument("--articles", type=int, default=2000, help="Distinct articles to index")
+    parser.add_argument("--duplicates", type=int, default=2000, help="Perturbed reposts to look up")
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--models_dir", default=None, help="Also time the full pipeline a hit skips")
+    parser.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = benchmark(args.articles, args.duplicates, args.threshold)
+    print(f"\n Near-duplicate index: {report['indexed']} articles, {report['reposts']} perturbed reposts")
+    print(f" Repost hit rate {report['repost_hit_rate']:.4f} (matched the right article "
+          f"{report['repost_correct_rate']:.4f}), false hits on fresh articles {report['fresh_false_hit_rate']:.4f}")
+    print(f" Per article: signature {report['signature_us']:.1f} us, index lookup {report['lookup_us']:.1f} us, "
+          f"insert {report['insert_us']:.1f} us")
+
+    if args.models_dir:
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        sys.path.append(os.path.dirname(current_dir))
+        from scripts.inference import load_bundle, analyze_article
+
+        bundle = load_bundle(args.models_dir)
+        originals, _, _ = synthetic_corpus(50, 0)
+        started = time.perf_counter()
+        for text in originals:
+            analyze_article(bundle, text, 'en')
+        pipeline_us = 1e6 * (time.perf_counter() - started) / len(originals)
+        report['pipeline_us'] = pipeline_us
+        print(f" Full pipeline {pipeline_us:.1f} us per article (English, no translation); "
+              f"a hit saves {pipeline_us - report['signature_us'] - report['lookup_us']:.1f} us")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Offline evaluation: accuracy, calibration and throughput in one run.
+
+Replays a labeled corpus through the serving pipeline (prepare_article,
+then score_articles in chunks) with the translator stubbed out. It reports
+quality (accuracy, F1, Brier score, log loss, expected calibration error)
+next to speed (articles/sec and per-stage milliseconds per article). With
+several --bundle arguments the bundles are evaluated on the same corpus and
+shown side by side, with deltas against the first one, so an optimization
+can be accepted or rejected on evidence.
+
+A bundle is given as DIR[:PRECISION[:CASCADE_THRESHOLD]], for example:
+
+    python scripts/evaluate.py --csv heldout.csv --bundle models --bundle models:int8
+    python scripts/evaluate.py --bundle models/versions/<old> --bundle models/versions/<new> --json eval.json
+    python scripts/evaluate.py --articles test_articles.txt --bundle models::0.95
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, brier_score_loss, f1_score, log_loss
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from scripts.inference import StageTimer, load_bundle, prepare_article, score_articles
+from scripts.quantize import compact_bundle, load_heldout
+from scripts.warmup import warm_up
+
+CALIBRATION_BINS = 10
+_ARTICLE_HEADER = re.compile(r"=== [^=]*?\((Known (Real|Fake) News|[^)]*)\) ===")
+
+
+def _stub_translate(text, source):
+    return text
+
+
+def expected_calibration_error(confidence, correct, bins=CALIBRATION_BINS):
+    """Weighted mean |accuracy - confidence| over equal-width confidence bins.
+
+    confidence is the probability of each predicted label and correct whether
+    that label was right (top-label ECE); scripts/calibration.py reports the same.
+    """
+    confidence, correct = np.asarray(confidence, dtype=float), np.asarray(correct, dtype=float)
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    which = np.clip(np.digitize(confidence, edges[1:-1]), 0, bins - 1)
+    error = 0.0
+    for b in range(bins):
+        mask = which == b
+        if mask.any():
+            error += mask.mean() * abs(correct[mask].mean() - confidence[mask].mean())
+    return float(error)
+
+
+def evaluate(bundle, texts, labels, chunk_size=256, cascade_threshold=None, translate=_stub_translate):
+    """Score labeled texts with the batched pipeline and return quality and speed metrics"""
+    labels = np.asarray(labels)
+    timer = StageTimer()
+    started = time.perf_counter()
+    articles = []
+    for text in texts:
+        timer.start()
+        articles.append(prepare_article(text, 'auto', translate, timer=timer))
+    valid = np.array([i for i, article in enumerate(articles) if article.cleaned_text], dtype=int)
+
+    predictions, probabilities, early_exit = [], [], []
+    for start in range(0, len(valid), chunk_size):
+        chunk = [articles[i] for i in valid[start:start + chunk_size]]
+        timer.start()
+        chunk_predictions, chunk_probabilities, chunk_early = score_articles(bundle, chunk, cascade_threshold, timer)
+        predictions.append(chunk_predictions)
+        probabilities.append(chunk_probabilities)
+        early_exit.append(chunk_early)
+    elapsed = time.perf_counter() - started
+
+    predictions = np.concatenate(predictions) if predictions else np.empty(0, dtype=int)
+    probabilities = np.vstack(probabilities) if probabilities else np.empty((0, 2))
+    early_exit = np.concatenate(early_exit) if early_exit else np.empty(0, dtype=bool)
+    y = labels[valid]
+    real_column = list(bundle.model.classes_).index(1)
+    proba_real = probabilities[:, real_column]
+    confidence = probabilities.max(axis=1)
+
+    report = {
+        'articles': len(texts),
+        'scored': len(valid),
+        'unsupported': len(texts) - len(valid),
+        'seconds': elapsed,
+        'articles_per_sec': len(texts) / elapsed if elapsed > 0 else 0.0,
+        'stage_ms_per_article': {stage: 1000 * seconds / len(texts) for stage, seconds in timer.seconds.items()},
+    }
+    if len(valid):
+        report.update({
+            'accuracy': float(accuracy_score(y, predictions)),
+            'f1_fake': float(f1_score(y, predictions, pos_label=0, zero_division=0)),
+            'f1_macro': float(f1_score(y, predictions, average='macro', zero_division=0)),
+            'brier': float(brier_score_loss(y, proba_real)),
+            'log_loss': float(log_loss(y, np.clip(proba_real, 1e-15, 1 - 1e-15), labels=[0, 1])),
+            'ece': expected_calibration_error(confidence, predictions == y),
+        })
+    if cascade_threshold:
+        report['early_exit_fraction'] = float(early_exit.mean()) if len(early_exit) else 0.0
+    report['predictions'] = predictions.tolist()
+    report['valid'] = valid.tolist()
+    return report
+
+
+def parse_bundle_spec(spec):
+    """DIR[:PRECISION[:CASCADE_THRESHOLD]] -> (models_dir, precision, cascade_threshold)"""
+    parts = spec.split(":")
+    models_dir = parts[0]
+    precision = parts[1] if len(parts) > 1 and parts[1] else 'float64'
+    cascade_threshold = float(parts[2]) if len(parts) > 2 and parts[2] else None
+    return models_dir, precision, cascade_threshold
+
+
+def compare(specs, texts, labels, chunk_size=256):
+    """Evaluate every bundle spec on the same corpus, each warmed up first so no side pays first-call costs"""
+    results = {}
+    for spec in specs:
+        models_dir, precision, cascade_threshold = parse_bundle_spec(spec)
+        bundle = compact_bundle(load_bundle(models_dir), precision)
+        warm_up(bundle)
+        results[spec] = evaluate(bundle, texts, labels, chunk_size, cascade_threshold)
+
+    reference = next(iter(results.values()))
+    for result in list(results.values())[1:]:
+        agree = dict(zip(reference['valid'], reference['predictions']))
+        shared = [agree[i] == p for i, p in zip(result['valid'], result['predictions']) if i in agree]
+        result['agreement_with_first'] = float(np.mean(shared)) if shared else None
+    return results
+
+
+def read_test_articles(path):
+    """Labeled articles from a test_articles.txt-style file; unlabeled sections are skipped"""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    texts, labels = [], []
+    parts = _ARTICLE_HEADER.split(content)
+    # split() yields: preamble, then (header label, Real/Fake or None, body) per article
+    for i in range(1, len(parts), 3):
+        kind, body = parts[i + 1], parts[i + 2].strip()
+        if kind and body:
+            texts.append(body)
+            labels.append(1 if kind == "Real" else 0)
+    return texts, labels
+
+
+METRICS = ('accuracy', 'f1_fake', 'f1_macro', 'brier', 'log_loss', 'ece', 'articles_per_sec', 'early_exit_fraction')
+
+
+def print_comparison(results):
+    specs = list(results)
+    width = max(14, *(len(spec) + 1 for spec in specs))
+    first = results[specs[0]]
+    print(f"\n Evaluation on {first['articles']} articles ({first['unsupported']} unsupported)")
+    header = f" {'metric':<20}" + "".join(f"{spec:>{width}}" for spec in specs)
+    if len(specs) > 1:
+        header += f"{'delta':>12}"
+    print(header)
+
+    def row(name, values):
+        line = f" {name:<20}" + "".join(f"{v:>{width}.4f}" if v is not None else f"{'-':>{width}}" for v in values)
+        if len(values) > 1 and values[0] is not None and values[-1] is not None:
+            line += f"{values[-1] - values[0]:>+12.4f}"
+        print(line)
+
+    for metric in METRICS:
+        values = [results[spec].get(metric) for spec in specs]
+        if any(v is not None for v in values):
+            row(metric, values)
+    stages = []
+    for result in results.values():
+        stages += [stage for stage in result['stage_ms_per_article'] if stage not in stages]
+    for stage in stages:
+        row(f"{stage} ms", [results[spec]['stage_ms_per_article'].get(stage) for spec in specs])
+    for spec in specs[1:]:
+        print(f" verdict agreement {spec} vs {specs[0]}: {results[spec]['agreement_with_first']:.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy, calibration and throughput of one or more model bundles")
+    parser.add_argument("--bundle", action="append", default=None,
+                        help="DIR[:PRECISION[:CASCADE_THRESHOLD]]; repeat to compare (default: models)")
+    parser.add_argument("--csv", default=None, help="Labeled CSV with 'text' and 'label' (1 = real, 0 = fake) columns")
+    parser.add_argument("--articles", default=None, help="test_articles.txt-style file with '(Known Real/Fake News)' headers")
+    parser.add_argument("--sample_size", type=int, default=10000, help="Rows per class when rebuilding the training held-out split")
+    parser.add_argument("--limit", type=int, default=None, help="Only evaluate the first N articles")
+    parser.add_argument("--chunk_size", type=int, default=256)
+    parser.add_argument("--json", default=None, help="Also write the full report to this JSON file")
+    args = parser.parse_args()
+
+    if args.csv:
+        df = pd.read_csv(args.csv)
+        texts, labels = df['text'].astype(str).tolist(), df['label'].astype(int).tolist()
+    elif args.articles:
+        texts, labels = read_test_articles(args.articles)
+    else:
+        texts, labels = load_heldout(args.sample_size)
+        if texts is None:
+            print(" No held-out data available; pass --csv or --articles")
+            sys.exit(1)
+    if args.limit:
+        texts, labels = texts[:args.limit], labels[:args.limit]
+
+    results = compare(args.bundle or ["models"], texts, labels, args.chunk_size)
+    print_comparison(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({spec: {k: v for k, v in result.items() if k not in ('predictions', 'valid')}
+                       for spec, result in results.items()}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
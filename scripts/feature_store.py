@@ -0,0 +1,248 @@
+"""
+Content-addressed feature store for incremental retraining.
+
+scripts/model_training.py cleans, vectorizes and stacks every article
+before it fits the SVM. With the store, each row is computed only once.
+Rows are stored in shards keyed by the article's content hash, inside a
+namespace keyed by the configuration that produced them:
+
+    features/<kind>-<config hash>/manifest.json        config and the content hashes in each shard
+    features/<kind>-<config hash>/shard-00000.joblib   rows for those hashes (CSR matrix, array or list)
+    features/vectorizers-<config hash>.joblib         fitted vectorizers, keyed by their parameters
+
+The vocabulary is frozen once fitted: when articles are added to data/, only
+the new rows are cleaned, scored and transformed with the stored vectorizers.
+The TF-IDF namespaces include the fingerprint of the fitted vectorizers, so
+refitting them (--refit_vectorizers or new parameters) starts fresh
+namespaces instead of mixing incompatible rows. The stored vectorizers keep
+the content hashes they were fitted on; model_training.py warns when the
+current test split contains some of them.
+
+Usage:
+    python scripts/feature_store.py demo --start 2000 --step 2000 --rounds 4
+    python scripts/feature_store.py info
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from scipy import sparse
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+
+def content_hash(text):
+    return hashlib.blake2b(str(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def config_digest(config):
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def _row_count(rows):
+    return rows.shape[0] if hasattr(rows, "shape") else len(rows)
+
+
+class FeatureStore:
+    """Sharded rows keyed by content hash, one namespace per producing configuration"""
+
+    def __init__(self, directory="features"):
+        self.directory = directory
+        self.stats = {}
+
+    def namespace(self, config):
+        return f"{config.get('kind', 'rows')}-{config_digest(config)}"
+
+    def _read_manifest(self, path, config):
+        try:
+            with open(os.path.join(path, "manifest.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'config': config, 'shards': []}
+
+    def _write_manifest(self, path, manifest):
+        os.makedirs(path, exist_ok=True)
+        manifest_path = os.path.join(path, "manifest.json")
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, default=str)
+        os.replace(tmp_path, manifest_path)
+
+    def rows(self, config, keys, items, compute):
+        """Rows for items in the order given, computing and storing only the keys not stored yet.
+
+        compute(items) must return one row per item as a CSR matrix, 2-D array or list.
+        """
+        name = self.namespace(config)
+        path = os.path.join(self.directory, name)
+        manifest = self._read_manifest(path, config)
+        location = {}
+        for s, shard in enumerate(manifest['shards']):
+            for r, key in enumerate(shard['keys']):
+                location[key] = (s, r)
+
+        missing, pending = [], set()
+        for i, key in enumerate(keys):
+            if key not in location and key not in pending:
+                missing.append(i)
+                pending.add(key)
+        if missing:
+            computed = compute([items[i] for i in missing])
+            shard_keys = [keys[i] for i in missing]
+            shard_file = f"shard-{len(manifest['shards']):05d}.joblib"
+            os.makedirs(path, exist_ok=True)
+            joblib.dump(computed, os.path.join(path, shard_file))
+            manifest['shards'].append({'file': shard_file, 'keys': shard_keys})
+            self._write_manifest(path, manifest)
+            for r, key in enumerate(shard_keys):
+                location[key] = (len(manifest['shards']) - 1, r)
+
+        self.stats[name] = {'rows': len(keys), 'computed': len(missing)}
+        if not keys:
+            return compute([])
+        return self._assemble(path, manifest, [location[key] for key in keys])
+
+    def _assemble(self, path, manifest, positions):
+        needed = sorted({s for s, _ in positions})
+        parts, offsets, total = [], {}, 0
+        for s in needed:
+            part = joblib.load(os.path.join(path, manifest['shards'][s]['file']))
+            offsets[s] = total
+            total += _row_count(part)
+            parts.append(part)
+        order = np.fromiter((offsets[s] + r for s, r in positions), dtype=np.int64, count=len(positions))
+        if sparse.issparse(parts[0]):
+            return sparse.vstack(parts, format='csr')[order]
+        if isinstance(parts[0], np.ndarray):
+            return np.concatenate(parts)[order]
+        combined = [row for part in parts for row in part]
+        return [combined[i] for i in order]
+
+    def vectorizers(self, config, fit, refit=False, fitted_on=()):
+        """Fitted vectorizers saved for config; fit() is only called when none are stored or refit is set.
+
+        fit() returns a dict of fitted vectorizers. The result gets a 'fingerprint' of the
+        fitted state, which the TF-IDF row namespaces include, and 'fitted_on', the content
+        hashes of the rows fit() used.
+        """
+        path = os.path.join(self.directory, f"vectorizers-{config_digest(config)}.joblib")
+        if os.path.exists(path) and not refit:
+            return joblib.load(path)
+        fitted = fit()
+        state = {name: (v.vocabulary_, v.idf_) for name, v in sorted(fitted.items())}
+        fitted['fingerprint'] = hashlib.sha256(pickle.dumps(state, protocol=4)).hexdigest()[:16]
+        fitted['fitted_on'] = frozenset(fitted_on)
+        os.makedirs(self.directory, exist_ok=True)
+        joblib.dump(fitted, path)
+        return fitted
+
+    def info(self):
+        """Row and shard counts per namespace"""
+        namespaces = {}
+        if not os.path.isdir(self.directory):
+            return namespaces
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if not os.path.isdir(path):
+                continue
+            manifest = self._read_manifest(path, {})
+            files = [os.path.join(path, shard['file']) for shard in manifest['shards']]
+            namespaces[name] = {
+                'shards': len(manifest['shards']),
+                'rows': sum(len(shard['keys']) for shard in manifest['shards']),
+                'bytes': sum(os.path.getsize(f) for f in files if os.path.exists(f)),
+            }
+        return namespaces
+
+
+_DEMO_REAL = ("government official report minister announced parliament economy growth policy data "
+              "survey researchers confirmed statement budget committee agency quarterly").split()
+_DEMO_FAKE = ("shocking secret miracle cure exposed hoax truth they hide click share viral "
+              "unbelievable banned insiders leaked").split()
+
+
+def synthetic_articles(n, seed=0):
+    """n labeled English articles; the first k of synthetic_articles(n) equal synthetic_articles(k)"""
+    texts, labels = [], []
+    for i in range(n):
+        rng = np.random.RandomState(seed * 1000003 + i)
+        label = i % 2
+        words = list(rng.choice(_DEMO_REAL if label else _DEMO_FAKE, size=rng.randint(80, 200)))
+        words += [f"w{rng.randint(5000)}" for _ in range(40)]
+        rng.shuffle(words)
+        texts.append(" ".join(words).capitalize() + ("." if label else "!!!"))
+        labels.append(label)
+    return texts, labels
+
+
+def demo(start=2000, step=2000, rounds=4, directory=None):
+    """Time building the training matrices from scratch vs through the store on a growing corpus"""
+    from scripts.model_training import training_features
+
+    directory = directory or tempfile.mkdtemp(prefix="feature-store-")
+    store = FeatureStore(directory)
+    report = []
+    try:
+        for round_number in range(rounds):
+            n = start + round_number * step
+            texts, labels = synthetic_articles(n)
+
+            started = time.perf_counter()
+            training_features(texts, labels)
+            scratch = time.perf_counter() - started
+
+            started = time.perf_counter()
+            training_features(texts, labels, store)
+            cached = time.perf_counter() - started
+            computed = max(stats['computed'] for stats in store.stats.values())
+            report.append({'articles': n, 'rows_transformed': computed,
+                           'scratch_seconds': scratch, 'store_seconds': cached})
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed feature store for incremental retraining")
+    parser.add_argument("--dir", default="features")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("info", help="Rows and shards stored per namespace")
+    bench = commands.add_parser("demo", help="Time saved on a growing synthetic dataset")
+    bench.add_argument("--start", type=int, default=2000, help="Articles in the first round")
+    bench.add_argument("--step", type=int, default=2000, help="Articles added per round")
+    bench.add_argument("--rounds", type=int, default=4)
+    bench.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        namespaces = FeatureStore(args.dir).info()
+        for name, row in namespaces.items():
+            print(f" {name:<40} {row['rows']:>9,} rows  {row['shards']:>4} shards  {row['bytes'] / 1e6:>9.1f} MB")
+        print(f" {len(namespaces)} namespaces in {args.dir}")
+        return
+
+    report = demo(args.start, args.step, args.rounds)
+    print(f"\n {'articles':>9} {'transformed':>12} {'scratch s':>10} {'store s':>9} {'saved':>7}")
+    for row in report:
+        saved = 1 - row['store_seconds'] / row['scratch_seconds']
+        print(f" {row['articles']:>9,} {row['rows_transformed']:>12,} {row['scratch_seconds']:>10.2f} "
+              f"{row['store_seconds']:>9.2f} {saved:>7.0%}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,471 @@
+"""
+Reviewer feedback and incremental model updates.
+
+Fact-checkers send the correct verdict for an article to POST /api/feedback
+(confirmations as well as corrections). Each one is appended as a JSON line
+to feedback/feedback.jsonl. The update job then folds the records it has
+not applied yet into the active model, without a full retrain:
+
+  1. The new articles go through the serving pipeline (detection,
+     translation, cleaning, the bundle's fitted vectorizers and scaler).
+  2. Every calibrated fold's linear SVM takes hinge-loss subgradient steps
+     on them, starting from its current weights and pulled back toward
+     them, so the model learns from the corrections without forgetting the
+     original training set. The word-only cascade model is updated the
+     same way.
+  3. Once at least --recalibrate_every new records have been applied since
+     the last calibration, the sigmoid calibrators are refit on the most
+     recent held-out articles. A stable --holdout_fraction of the reviewed
+     articles (chosen by content hash) never reaches step 2, so the
+     calibrators are fit on scores of articles the SVMs did not train on.
+  4. The result is published as a new bundle version. With --activate it
+     is also made current and running workers pick it up without a
+     restart; otherwise activate it after review with `bundles.py
+     activate`. `bundles.py rollback` undoes an activation.
+
+Each update starts from the version the previous update published, as
+long as that descends from the active one, so publish-only runs build on
+each other instead of dropping earlier corrections. Once another bundle
+(e.g. a full retrain) is activated, updates start from it.
+
+An update with no usable article publishes nothing.
+
+Vocabularies are not refit, so new terms only count after a full retrain
+with scripts/model_training.py.
+
+Usage:
+    python scripts/feedback.py status
+    python scripts/feedback.py update                        # publish only, e.g. hourly from cron
+    python scripts/feedback.py update --activate --translator identity --recalibrate
+    python scripts/feedback.py drift --csv labeled.csv       # incremental update vs full retrain
+"""
+
+import argparse
+import copy
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.utils import Bunch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from scripts.feature_store import content_hash
+from scripts.calibration import make_calibrated_svm
+from scripts.bundles import (BundleError, bundle_path, current_version, list_versions, load_version,
+                             publish_bundle)
+from scripts.inference import (MODEL_FILES, OPTIONAL_MODEL_FILES, build_features, build_word_features,
+                               google_translate, prepare_article)
+
+LABELS = {'fake': 0, 'real': 1}
+MIN_CALIBRATION_ARTICLES = 50
+HOLDOUT_FRACTION = 0.2
+
+
+class FeedbackStore:
+    """Append-only JSONL log of reviewed articles plus the update job's progress"""
+
+    def __init__(self, directory="feedback"):
+        self.directory = directory
+        self.path = os.path.join(directory, "feedback.jsonl")
+        self.state_path = os.path.join(directory, "state.json")
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        return cls(environ.get('SATYASCAN_FEEDBACK_DIR', 'feedback'))
+
+    def add(self, text, label, language='auto', model_version=None, predicted=None, reviewer=None):
+        """Record the correct label (1 = real, 0 = fake) for text; returns the record"""
+        record = {
+            'id': uuid.uuid4().hex,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'text': text,
+            'label': int(label),
+            'language': language,
+            'model_version': model_version,
+            'predicted': predicted,
+            'reviewer': reviewer,
+        }
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        os.makedirs(self.directory, exist_ok=True)
+        # One O_APPEND write per record, so concurrent gunicorn workers never interleave lines
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        return record
+
+    def records(self, start=0):
+        """Records from position start on, oldest first; a torn last line is skipped"""
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                if i < start:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+        return records
+
+    def state(self):
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'applied': 0, 'calibrated_at': 0, 'updates': []}
+
+    def save_state(self, state):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def status(self):
+        state = self.state()
+        total = len(self.records())
+        return {'records': total, 'applied': state['applied'], 'pending': total - state['applied'],
+                'last_update': state['updates'][-1] if state['updates'] else None}
+
+
+def parse_label(data):
+    """Label from a feedback request: 'label' of 'fake'/'real' (or 0/1), or an 'is_fake' boolean"""
+    if 'is_fake' in data and isinstance(data['is_fake'], bool):
+        return 0 if data['is_fake'] else 1
+    label = data.get('label')
+    if isinstance(label, str) and label.lower() in LABELS:
+        return LABELS[label.lower()]
+    if label in (0, 1) and not isinstance(label, bool):
+        return int(label)
+    raise ValueError("Provide 'label' ('fake' or 'real') or 'is_fake' (true/false)")
+
+
+def refine_linear(estimator, X, y, frozen_columns=0, epochs=20, learning_rate=0.5, max_shift=0.3):
+    """Copy of a fitted linear classifier nudged toward classifying X correctly.
+
+    Full-batch hinge-loss subgradient steps start at the current weights
+    and are pulled back toward them by anchor * ||w - w_old||^2 / 2, with
+    the anchor scaled so that a typical article's margin moves by at most
+    about max_shift. The last frozen_columns weights (the dense, always
+    positive scaled numeric features) are left alone: moving them would
+    shift every article's score the same way instead of learning from
+    the content of the corrections.
+    """
+    refined = copy.deepcopy(estimator)
+    n_free = X.shape[1] - frozen_columns
+    X_free = X[:, :n_free].tocsr()
+    w_old = estimator.coef_.ravel().astype(float)
+    w = w_old[:n_free].copy()
+    b = float(estimator.intercept_[0])
+    offset = X[:, n_free:] @ w_old[n_free:] if frozen_columns else 0.0
+    signs = np.where(np.asarray(y) == estimator.classes_[1], 1.0, -1.0)
+    anchor = max(float(X_free.multiply(X_free).sum(axis=1).mean()), 1e-12) / max_shift
+    step = learning_rate / anchor
+    for _ in range(epochs):
+        violated = signs * (X_free @ w + offset + b) < 1
+        if not violated.any():
+            break
+        w -= step * (anchor * (w - w_old[:n_free]) - X_free[violated].T @ signs[violated])
+    refined.coef_ = np.concatenate([w, w_old[n_free:]]).reshape(estimator.coef_.shape)
+    return refined
+
+
+def recalibrate(model, X, y):
+    """Refit every fold's sigmoid calibrator on (X, y); needs both classes"""
+    y = np.asarray(y)
+    for fold in model.calibrated_classifiers_:
+        scores = fold.estimator.decision_function(X).reshape(-1, 1)
+        platt = LogisticRegression(C=1e6).fit(scores, y == model.classes_[1])
+        fold.calibrators[0].a_ = -float(platt.coef_[0, 0])
+        fold.calibrators[0].b_ = -float(platt.intercept_[0])
+    return model
+
+
+def update_model(model, X, y, **refine_options):
+    """Copy of a CalibratedClassifierCV with every fold refined on (X, y)"""
+    updated = copy.copy(model)
+    updated.calibrated_classifiers_ = []
+    for fold in model.calibrated_classifiers_:
+        fold = copy.copy(fold)
+        fold.estimator = refine_linear(fold.estimator, X, y, **refine_options)
+        fold.calibrators = copy.deepcopy(fold.calibrators)
+        updated.calibrated_classifiers_.append(fold)
+    return updated
+
+
+def is_holdout(record, fraction=HOLDOUT_FRACTION):
+    """True for the stable share of records kept out of the SVM update for calibration"""
+    return int(content_hash(record['text'])[:8], 16) < fraction * 16 ** 8
+
+
+def _prepare(records, translate):
+    articles, labels = [], []
+    for record in records:
+        article = prepare_article(record['text'], record.get('language') or 'auto', translate)
+        if article.cleaned_text:
+            articles.append(article)
+            labels.append(record['label'])
+    return articles, np.array(labels, dtype=int)
+
+
+def base_version(models_dir, state):
+    """The version the last update published if it descends from the active one, else the active version"""
+    active = current_version(models_dir)
+    if not state['updates']:
+        return active
+    newest = state['updates'][-1]['version']
+    manifests = {manifest['version']: manifest for manifest in list_versions(models_dir)}
+    version = newest if newest in manifests else None
+    while version is not None:
+        if version == active:
+            return newest
+        version = manifests.get(version, {}).get('parent_version')
+    return active
+
+
+def apply_feedback(models_dir="models", store=None, translate=google_translate, recalibrate_every=200,
+                   force_recalibrate=False, calibration_window=2000, activate=False,
+                   holdout_fraction=HOLDOUT_FRACTION, **refine_options):
+    """Fold pending feedback into the active bundle and publish the result.
+
+    Returns None, and publishes nothing, when no pending record yields a
+    usable article for the update or the calibrators.
+    """
+    store = store or FeedbackStore()
+    state = store.state()
+    pending = store.records(state['applied'])
+    if not pending:
+        return None
+    timings = {}
+    started = time.perf_counter()
+    version = base_version(models_dir, state)
+    bundle = load_version(models_dir, version)
+    timings['load'] = time.perf_counter() - started
+
+    mark = time.perf_counter()
+    held_out = [record for record in pending if is_holdout(record, holdout_fraction)]
+    articles, labels = _prepare([record for record in pending if not is_holdout(record, holdout_fraction)],
+                                translate)
+    timings['featurize'] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    model, word_model = bundle.model, bundle.word_model
+    frozen_columns = len(bundle.metadata.num_feature_columns)
+    if len(articles):
+        model = update_model(model, build_features(bundle, articles), labels, frozen_columns=frozen_columns,
+                             **refine_options)
+        if word_model is not None:
+            word_model = update_model(word_model, build_word_features(bundle, articles), labels,
+                                      frozen_columns=frozen_columns, **refine_options)
+    timings['update'] = time.perf_counter() - mark
+
+    applied = state['applied'] + len(pending)
+    recalibrated = False
+    if force_recalibrate or applied - state['calibrated_at'] >= recalibrate_every:
+        mark = time.perf_counter()
+        first = max(applied - calibration_window, 0)
+        window = [record for record in store.records(first)[:applied - first] if is_holdout(record, holdout_fraction)]
+        recent, recent_labels = _prepare(window, translate)
+        if len(recent) >= MIN_CALIBRATION_ARTICLES and len(set(recent_labels)) == 2:
+            recalibrate(model, build_features(bundle, recent), recent_labels)
+            if word_model is not None:
+                recalibrate(word_model, build_word_features(bundle, recent), recent_labels)
+            recalibrated = True
+        timings['recalibrate'] = time.perf_counter() - mark
+
+    if not len(articles) and not recalibrated:
+        return None
+
+    mark = time.perf_counter()
+    manifest = _publish(models_dir, version, model, word_model, activate, {
+        'parent_version': version,
+        'feedback_applied': applied,
+        'feedback_articles': len(articles),
+        'recalibrated': recalibrated,
+    })
+    timings['publish'] = time.perf_counter() - mark
+    timings['total'] = time.perf_counter() - started
+
+    state['applied'] = applied
+    if recalibrated:
+        state['calibrated_at'] = applied
+    update = {'version': manifest['version'], 'parent_version': version, 'records': len(pending),
+              'articles': len(articles), 'held_out': len(held_out), 'recalibrated': recalibrated,
+              'activated': activate, 'seconds': timings,
+              'finished_at': datetime.now(timezone.utc).isoformat()}
+    state['updates'].append(update)
+    store.save_state(state)
+    return update
+
+
+def _publish(models_dir, parent_version, model, word_model, activate, extra):
+    """Publish parent_version's artifacts with the updated models swapped in"""
+    parent_path = bundle_path(models_dir, parent_version)
+    replaced = {MODEL_FILES['model']: model, OPTIONAL_MODEL_FILES['word_model']: word_model}
+    source = tempfile.mkdtemp(prefix=".feedback-", dir=models_dir)
+    try:
+        for filename in list(MODEL_FILES.values()) + list(OPTIONAL_MODEL_FILES.values()):
+            if replaced.get(filename) is not None:
+                joblib.dump(replaced[filename], os.path.join(source, filename))
+            elif os.path.exists(os.path.join(parent_path, filename)):
+                os.symlink(os.path.abspath(os.path.join(parent_path, filename)), os.path.join(source, filename))
+        return publish_bundle(source, models_dir, activate=activate, extra=extra)
+    finally:
+        shutil.rmtree(source, ignore_errors=True)
+
+
+def train_bundle(articles, labels):
+    """Fit vectorizers, scaler and calibrated SVMs the way model_training.py does, on prepared articles"""
+    from sklearn.preprocessing import StandardScaler
+    from scripts.model_training import NUM_FEATURE_COLUMNS, make_vectorizers
+
+    vectorizers = make_vectorizers()
+    cleaned = [article.cleaned_text for article in articles]
+    for vectorizer in vectorizers.values():
+        vectorizer.fit(cleaned)
+    scaler = StandardScaler(with_mean=False).fit(
+        np.array([[article.numeric[col] for col in NUM_FEATURE_COLUMNS] for article in articles], dtype=float))
+    bundle = Bunch(word_vectorizer=vectorizers['word'], char_vectorizer=vectorizers['char'], scaler=scaler,
+                   metadata=Bunch(num_feature_columns=NUM_FEATURE_COLUMNS), word_model=None)
+    bundle.model = make_calibrated_svm().fit(build_features(bundle, articles), labels)
+    return bundle
+
+
+def _scores(model, X, y):
+    proba = model.predict_proba(X)
+    predictions = model.classes_[np.argmax(proba, axis=1)]
+    real = proba[:, list(model.classes_).index(1)]
+    return predictions, {'accuracy': float(np.mean(predictions == y)), 'brier': float(np.mean((real - y) ** 2))}
+
+
+def drift_report(texts, labels, languages=None, feedback_fraction=0.2, test_fraction=0.2, seed=0,
+                 holdout_fraction=HOLDOUT_FRACTION, **refine_options):
+    """Train on a base split, then compare an incremental update with a full refit on base + feedback.
+
+    The vectorizers are fitted on the base split only and shared by both, so
+    the comparison isolates the model update. As in apply_feedback, the
+    incremental model is recalibrated on a held-out part of the feedback.
+    """
+    languages = languages or ['auto'] * len(texts)
+    records = [{'text': t, 'label': l, 'language': g} for t, l, g in zip(texts, labels, languages)]
+    articles, labels = _prepare(records, lambda text, source: text)
+    order = np.random.RandomState(seed).permutation(len(articles))
+    n_test, n_feedback = int(len(order) * test_fraction), int(len(order) * feedback_fraction)
+    test, feedback, base = order[:n_test], order[n_test:n_test + n_feedback], order[n_test + n_feedback:]
+
+    bundle = train_bundle([articles[i] for i in base], labels[base])
+    X = build_features(bundle, articles)
+
+    n_calibration = int(len(feedback) * holdout_fraction)
+    calibration, updates = feedback[:n_calibration], feedback[n_calibration:]
+    started = time.perf_counter()
+    incremental = update_model(bundle.model, X[updates], labels[updates],
+                               frozen_columns=len(bundle.metadata.num_feature_columns), **refine_options)
+    recalibrate(incremental, X[calibration], labels[calibration])
+    update_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    full = make_calibrated_svm().fit(X[np.concatenate([base, feedback])], labels[np.concatenate([base, feedback])])
+    retrain_seconds = time.perf_counter() - started
+
+    report = {'articles': {'base': len(base), 'feedback': len(feedback), 'test': len(test)},
+              'update_seconds': update_seconds, 'retrain_seconds': retrain_seconds, 'models': {}}
+    predictions = {}
+    for name, model in (('base', bundle.model), ('incremental', incremental), ('full_retrain', full)):
+        predictions[name], report['models'][name] = _scores(model, X[test], labels[test])
+    report['accuracy_drift'] = report['models']['incremental']['accuracy'] - report['models']['full_retrain']['accuracy']
+    report['agreement_with_full_retrain'] = float(np.mean(predictions['incremental'] == predictions['full_retrain']))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reviewer feedback and incremental model updates")
+    parser.add_argument("--models_dir", default="models")
+    parser.add_argument("--feedback_dir", default=os.environ.get('SATYASCAN_FEEDBACK_DIR', 'feedback'))
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Stored, applied and pending feedback")
+    update = commands.add_parser("update", help="Fold pending feedback into the active model and publish it")
+    update.add_argument("--translator", choices=["google", "identity"], default="google")
+    update.add_argument("--recalibrate", action="store_true", help="Refit the calibrators now")
+    update.add_argument("--recalibrate_every", type=int, default=200, help="Applied records between calibrations")
+    update.add_argument("--holdout_fraction", type=float, default=HOLDOUT_FRACTION,
+                        help="Share of reviewed articles kept out of the update and used to calibrate")
+    update.add_argument("--epochs", type=int, default=20)
+    update.add_argument("--activate", action="store_true",
+                        help="Make the published version current; by default it waits for `bundles.py activate`")
+    drift = commands.add_parser("drift", help="Accuracy of an incremental update vs a full retrain")
+    drift.add_argument("--csv", default=None,
+                       help="Labeled CSV with 'text', 'label' and optional 'language' columns; defaults to the held-out split")
+    drift.add_argument("--feedback_fraction", type=float, default=0.2)
+    drift.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    store = FeedbackStore(args.feedback_dir)
+    if args.command == "status":
+        print(json.dumps(store.status(), indent=2))
+        return
+
+    if args.command == "update":
+        translate = google_translate if args.translator == "google" else (lambda text, source: text)
+        try:
+            result = apply_feedback(args.models_dir, store, translate, args.recalibrate_every, args.recalibrate,
+                                    activate=args.activate, holdout_fraction=args.holdout_fraction,
+                                    epochs=args.epochs)
+        except BundleError as e:
+            print(f" {e}")
+            sys.exit(1)
+        if result is None:
+            print(" No usable pending feedback; nothing published")
+            return
+        seconds = result['seconds']
+        print(f" Published {result['version']} from {result['parent_version']} with {result['articles']} "
+              f"reviewed articles{' (recalibrated)' if result['recalibrated'] else ''} in {seconds['total']:.1f}s")
+        if not result['activated']:
+            print(f"   Not activated; review it, then run: python scripts/bundles.py activate {result['version']}")
+        print("   " + "  ".join(f"{stage} {value:.2f}s" for stage, value in seconds.items() if stage != 'total'))
+        return
+
+    if args.csv:
+        import pandas as pd
+        df = pd.read_csv(args.csv)
+        texts, labels = df['text'].astype(str).tolist(), df['label'].astype(int).tolist()
+        languages = df['language'].astype(str).tolist() if 'language' in df.columns else None
+    else:
+        from scripts.quantize import load_heldout
+        texts, labels = load_heldout()
+        languages = None
+        if texts is None:
+            print(" No held-out data available; pass --csv")
+            sys.exit(1)
+    report = drift_report(texts, labels, languages, args.feedback_fraction)
+    counts = report['articles']
+    print(f"\n {counts['base']} base, {counts['feedback']} feedback, {counts['test']} test articles")
+    for name, row in report['models'].items():
+        print(f" {name:<14} accuracy {row['accuracy']:.4f}  brier {row['brier']:.4f}")
+    print(f" incremental update {report['update_seconds']:.2f}s vs full refit {report['retrain_seconds']:.2f}s; "
+          f"accuracy drift {report['accuracy_drift']:+.4f}, agreement {report['agreement_with_full_retrain']:.4f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
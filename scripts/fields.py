@@ -0,0 +1,132 @@
+"""
+Response field selection for /api/analyze.
+
+Machine clients that only want the verdict send "fields": ["is_fake",
+"confidence"], or "fields": "slim". Stages whose only output is a field
+that was not requested are skipped:
+
+    top_features   the SVM coefficient explanation
+    sentiment      TextBlob polarity and subjectivity, unless the model uses them as features
+    translation    in native mode, the enrichment call to the translator
+
+The other fields cost nothing extra and are simply left out of the
+response. is_fake and confidence are always returned.
+
+Benchmark the per-request savings:
+    python scripts/fields.py --models_dir models --requests 200 --translate_ms 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+RESPONSE_FIELDS = ('is_fake', 'confidence', 'top_features', 'translation', 'sentiment', 'detected_language',
+                   'truncated', 'model_stage', 'degraded', 'degraded_reasons', 'model_version', 'near_duplicate')
+SLIM_FIELDS = frozenset(('is_fake', 'confidence'))
+SENTIMENT_COLUMNS = ('sentiment', 'subjectivity')
+
+
+def parse_fields(fields):
+    """None (every field) when fields is None, else the requested fields; raises ValueError on unknown names.
+
+    fields is a list of names, a comma-separated string, or "slim".
+    """
+    if fields is None:
+        return None
+    if fields == 'slim':
+        return SLIM_FIELDS
+    if isinstance(fields, str):
+        fields = [name.strip() for name in fields.split(',') if name.strip()]
+    if not isinstance(fields, (list, tuple)) or not all(isinstance(name, str) for name in fields):
+        raise ValueError("fields must be a list of field names, a comma-separated string or \"slim\"")
+    unknown = sorted(set(fields) - set(RESPONSE_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)} (choose from {', '.join(RESPONSE_FIELDS)})")
+    return SLIM_FIELDS | frozenset(fields)
+
+
+def wants(fields, name):
+    return fields is None or name in fields
+
+
+def uses_sentiment(num_feature_columns):
+    """Whether a model's numeric features include the TextBlob sentiment scores"""
+    return any(column in num_feature_columns for column in SENTIMENT_COLUMNS)
+
+
+def select_fields(result, fields):
+    """The response with only the requested fields"""
+    if fields is None:
+        return result
+    return {name: value for name, value in result.items() if name in fields}
+
+
+def benchmark(bundle, texts, language='auto', mode='translate', fields_options=(None, SLIM_FIELDS),
+              translate=None, rounds=3):
+    """Mean ms per article of analyze_article / analyze_native for each fields option"""
+    from scripts.inference import analyze_article
+    from scripts.native import analyze_native
+    from scripts.warmup import _stub_translate
+
+    translate = translate or _stub_translate
+    if mode == 'native':
+        def analyze(text, fields):
+            return analyze_native(bundle, text, language, translate=translate, fields=fields)
+    else:
+        def analyze(text, fields):
+            return analyze_article(bundle, text, language, translate=translate, fields=fields)
+
+    report = {}
+    for fields in fields_options:
+        analyze(texts[0], fields)
+        best = None
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for text in texts:
+                analyze(text, fields)
+            elapsed = (time.perf_counter() - started) / len(texts)
+            best = elapsed if best is None else min(best, elapsed)
+        report['all' if fields is None else ','.join(sorted(fields))] = 1000 * best
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request time saved by requesting only some /api/analyze fields")
+    parser.add_argument("--models_dir", default="models")
+    parser.add_argument("--requests", type=int, default=200, help="Articles scored per round")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per option; the fastest is reported")
+    parser.add_argument("--translate_ms", type=float, default=0,
+                        help="Latency of the offline translator per call, to stand in for the real provider")
+    args = parser.parse_args()
+
+    from scripts.bundles import ModelManager
+    from scripts.deadline import SlowTranslator
+    from scripts.warmup import SAMPLE_TEXTS
+
+    manager = ModelManager(args.models_dir)
+    if not manager.load():
+        print(f" No model bundle found in {args.models_dir}")
+        sys.exit(1)
+    bundle = manager.active
+
+    texts = list(SAMPLE_TEXTS.values())
+    texts = [texts[i % len(texts)] * (1 + i % 4) for i in range(args.requests)]
+    translate = SlowTranslator(args.translate_ms / 1000) if args.translate_ms else None
+    modes = ['translate'] + (['native'] if bundle.get('native_model') is not None else [])
+    print(f"\n {'mode':<10} {'all fields ms':>14} {'slim ms':>9} {'saved':>7}")
+    for mode in modes:
+        report = benchmark(bundle, texts, mode=mode, translate=translate, rounds=args.rounds)
+        full, slim = report['all'], report['confidence,is_fake']
+        print(f" {mode:<10} {full:>14.2f} {slim:>9.2f} {1 - slim / full:>7.0%}")
+    translator = f"{args.translate_ms:.0f} ms translator" if args.translate_ms else "stub translator"
+    print(f" ({args.requests} articles in {len(SAMPLE_TEXTS)} languages, {translator}, fastest of {args.rounds} rounds)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Memory footprint and load time of the model artifacts.
+
+For every artifact in a models directory this reports the file size, the
+unpickle time, the deep in-memory size, the process RSS growth while
+loading it, vocabulary sizes and nonzero weight counts. It also projects
+the total RSS of a gunicorn deployment where every worker loads its own
+copy (see gunicorn_config.py).
+
+Usage:
+    python scripts/footprint.py
+    python scripts/footprint.py --models_dir models/versions/<version> --workers 9 --json footprint.json
+    python scripts/footprint.py --baseline footprint_previous.json     # growth since the last retrain
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+import joblib
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from scripts.inference import MODEL_FILES, OPTIONAL_MODEL_FILES
+
+_SKIP_TYPES = (type, type(sys), type(len), type(lambda: None))
+
+
+def rss_bytes():
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == "darwin" else usage * 1024
+
+
+def deep_sizeof(obj):
+    """Bytes held by obj and everything it references (numpy buffers included), counting shared objects once"""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIP_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, np.ndarray):
+            if current.base is not None:
+                stack.append(current.base)
+            if current.dtype == object:
+                stack.extend(current.ravel())
+        elif isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif not isinstance(current, (str, bytes, int, float, complex, bool)):
+            if hasattr(current, "__dict__"):
+                stack.append(current.__dict__)
+            for slot in getattr(type(current), "__slots__", ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return total
+
+
+def _vectorizer_details(vectorizer):
+    details = {'vocabulary_size': len(vectorizer.vocabulary_),
+               'vocabulary_bytes': deep_sizeof(vectorizer.vocabulary_)}
+    stop_words = getattr(vectorizer, 'stop_words_', None)
+    if stop_words is not None:
+        # Terms dropped by min_df/max_df/max_features; only kept for introspection
+        details['stop_words_size'] = len(stop_words)
+        details['stop_words_bytes'] = deep_sizeof(stop_words)
+    return details
+
+
+def _linear_details(model):
+    folds = getattr(model, 'calibrated_classifiers_', None)
+    coefs = [fold.estimator.coef_ for fold in folds] if folds else [getattr(model, 'coef_', np.zeros((1, 0)))]
+    return {
+        'folds': len(coefs),
+        'n_features': int(coefs[0].shape[-1]),
+        'weights': int(sum(coef.size for coef in coefs)),
+        'nonzero_weights': int(sum(np.count_nonzero(coef) for coef in coefs)),
+        'weight_bytes': int(sum(coef.nbytes for coef in coefs)),
+    }
+
+
+def describe(name, artifact):
+    """Artifact-specific counts: vocabulary sizes, nonzero weights, feature names"""
+    if hasattr(artifact, 'vocabulary_'):
+        return _vectorizer_details(artifact)
+    if name in ('model', 'word_model'):
+        return _linear_details(artifact)
+    if name == 'native_model':
+        details = {'char_' + key: value for key, value in _vectorizer_details(artifact.char_vectorizer).items()}
+        details.update(_linear_details(artifact.model))
+        return details
+    if name == 'feature_names':
+        return {'names': len(artifact), 'char_names': sum(1 for f in artifact if str(f).startswith("<char:"))}
+    if name == 'scaler':
+        return {'n_features': int(artifact.n_features_in_)}
+    return {}
+
+
+def footprint(models_dir="models", workers=None):
+    """Load every artifact in models_dir one at a time and measure it"""
+    workers = workers or multiprocessing.cpu_count() * 2 + 1
+    gc.collect()
+    base_rss = rss_bytes()
+    artifacts = {}
+    loaded = []
+    files = dict(MODEL_FILES)
+    files.update(OPTIONAL_MODEL_FILES)
+    for name, filename in files.items():
+        path = os.path.join(models_dir, filename)
+        if not os.path.exists(path):
+            if name in MODEL_FILES:
+                artifacts[name] = {'file': filename, 'missing': True}
+            continue
+        gc.collect()
+        rss_before = rss_bytes()
+        started = time.perf_counter()
+        artifact = joblib.load(path)
+        load_seconds = time.perf_counter() - started
+        gc.collect()
+        loaded.append(artifact)
+        artifacts[name] = {
+            'file': filename,
+            'file_bytes': os.path.getsize(path),
+            'load_seconds': load_seconds,
+            'deep_bytes': deep_sizeof(artifact),
+            'rss_delta_bytes': rss_bytes() - rss_before,
+            **describe(name, artifact),
+        }
+
+    present = [a for a in artifacts.values() if not a.get('missing')]
+    models_rss = rss_bytes() - base_rss
+    worker_rss = base_rss + models_rss
+    return {
+        'models_dir': models_dir,
+        'artifacts': artifacts,
+        'total': {
+            'file_bytes': sum(a['file_bytes'] for a in present),
+            'load_seconds': sum(a['load_seconds'] for a in present),
+            'deep_bytes': sum(a['deep_bytes'] for a in present),
+            'rss_bytes': models_rss,
+        },
+        'projection': {
+            'workers': workers,
+            'interpreter_rss_bytes': base_rss,
+            'worker_rss_bytes': worker_rss,
+            # gunicorn master (no models) plus one full copy per worker
+            'total_rss_bytes': base_rss + workers * worker_rss,
+        },
+    }
+
+
+def _mb(value):
+    return value / 1e6
+
+
+def print_report(report, baseline=None):
+    print(f"\n Model footprint for {report['models_dir']}")
+    print(f" {'artifact':<16} {'file MB':>9} {'load s':>8} {'deep MB':>9} {'RSS MB':>8}  details")
+    for name, row in report['artifacts'].items():
+        if row.get('missing'):
+            print(f" {name:<16} missing ({row['file']})")
+            continue
+        details = ", ".join(f"{k}={v:,}" for k, v in row.items() if k not in (
+            'file', 'file_bytes', 'load_seconds', 'deep_bytes', 'rss_delta_bytes') and isinstance(v, int))
+        print(f" {name:<16} {_mb(row['file_bytes']):>9.1f} {row['load_seconds']:>8.2f} "
+              f"{_mb(row['deep_bytes']):>9.1f} {_mb(row['rss_delta_bytes']):>8.1f}  {details}")
+    total = report['total']
+    print(f" {'total':<16} {_mb(total['file_bytes']):>9.1f} {total['load_seconds']:>8.2f} "
+          f"{_mb(total['deep_bytes']):>9.1f} {_mb(total['rss_bytes']):>8.1f}")
+
+    projection = report['projection']
+    print(f"\n Projected RSS with {projection['workers']} gunicorn workers: "
+          f"{_mb(projection['total_rss_bytes']):,.0f} MB "
+          f"({_mb(projection['worker_rss_bytes']):,.0f} MB per worker, "
+          f"interpreter and libraries {_mb(projection['interpreter_rss_bytes']):,.0f} MB)")
+
+    if baseline:
+        print(f"\n Growth since baseline ({baseline['models_dir']})")
+        for key in ('file_bytes', 'deep_bytes', 'rss_bytes', 'load_seconds'):
+            old, new = baseline['total'][key], total[key]
+            change = (new - old) / old if old else 0.0
+            print(f"   {key:<13} {old:>14,.2f} -> {new:>14,.2f}  ({change:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory footprint and load time of the model artifacts")
+    parser.add_argument("--models_dir", default="models")
+    parser.add_argument("--workers", type=int, default=None, help="Gunicorn workers to project for (default: gunicorn_config.py's cpu_count * 2 + 1)")
+    parser.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    parser.add_argument("--baseline", default=None, help="Earlier --json report to compare against")
+    args = parser.parse_args()
+
+    report = footprint(args.models_dir, args.workers)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
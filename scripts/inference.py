@@ -0,0 +1,322 @@
+"""
+Batched inference pipeline shared by the command line tools.
+
+Articles are detected, translated and cleaned one at a time, but every
+vectorizer, the scaler and the calibrated model run once per chunk instead
+of once per article.
+"""
+
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import langdetect
+from textblob import TextBlob
+from sklearn.utils import Bunch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from scripts.utils import SUPPORTED_LANGUAGES, clean_text
+from scripts.char_ngrams import fast_char_vectorizer
+from scripts.limits import UNBOUNDED
+from scripts.translation import google_translate
+from scripts.fields import uses_sentiment, wants
+from scripts.assemble import hstack_csr
+
+MODEL_FILES = {
+    'model': "news_svm_calibrated.pkl",
+    'word_vectorizer': "tfidf_word.pkl",
+    'char_vectorizer': "tfidf_char.pkl",
+    'scaler': "num_scaler.pkl",
+    'feature_names': "feature_names.pkl",
+    'metadata': "model_metadata.pkl",
+}
+
+# Artifacts older model versions may not have; loaded as None when missing
+OPTIONAL_MODEL_FILES = {
+    'word_model': "news_svm_word.pkl",
+    'native_model': "news_svm_native.pkl",
+}
+
+
+class StageTimer:
+    """Accumulates wall time per pipeline stage; pass one as timer= to profile the stages"""
+
+    def __init__(self):
+        self.seconds = {}
+        self.start()
+
+    def start(self):
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + now - self._last
+        self._last = now
+
+
+def load_bundle(models_dir="models", fast_char=True):
+    """Load every trained artifact from models_dir into a Bunch.
+
+    With fast_char the char vectorizer is wrapped in FastCharVectorizer,
+    which produces identical rows without building n-gram string lists.
+    """
+    bundle = Bunch(**{
+        name: joblib.load(os.path.join(models_dir, filename))
+        for name, filename in MODEL_FILES.items()
+    })
+    for name, filename in OPTIONAL_MODEL_FILES.items():
+        path = os.path.join(models_dir, filename)
+        bundle[name] = joblib.load(path) if os.path.exists(path) else None
+    if fast_char:
+        bundle.char_vectorizer = fast_char_vectorizer(bundle.char_vectorizer)
+        if bundle.native_model is not None:
+            bundle.native_model.char_vectorizer = fast_char_vectorizer(bundle.native_model.char_vectorizer)
+    return bundle
+
+
+def extract_numeric_features(text, is_non_english, sentiment=True):
+    """Extract numeric features matching the trained model.
+
+    With sentiment=False the TextBlob pass is skipped and both scores are 0.
+    """
+    text = str(text)
+    length = len(text)
+    word_count = len(text.split())
+    avg_word_length = length / (word_count + 1)
+    capitals_ratio = sum(1 for c in text if c.isupper()) / (length + 1)
+    numbers_ratio = sum(c.isdigit() for c in text) / (length + 1)
+    polarity = subjectivity = 0.0
+    if sentiment:
+        blob = TextBlob(text)
+        polarity = blob.sentiment.polarity
+        subjectivity = blob.sentiment.subjectivity
+    exclamations = text.count('!')
+    questions = text.count('?')
+    quotes = text.count('"') + text.count("'")
+    return {
+        'length': length,
+        'word_count': word_count,
+        'avg_word_length': avg_word_length,
+        'capitals_ratio': capitals_ratio,
+        'numbers_ratio': numbers_ratio,
+        'sentiment': polarity,
+        'subjectivity': subjectivity,
+        'exclamations': exclamations,
+        'questions': questions,
+        'quotes': quotes,
+        'is_non_english': 1 if is_non_english else 0
+    }
+
+
+def detect_and_translate(text, language='auto', translate=google_translate, detection_text=None):
+    """Return (translated_text, detected_lang, is_non_english) for one article"""
+    detected_lang = 'en'
+    translated_text = text
+    is_non_english = False
+    try:
+        detected_lang = langdetect.detect(detection_text or text) if language == 'auto' else language
+        if detected_lang not in ['en', 'english']:
+            is_non_english = True
+            translated_text = translate(text, detected_lang)
+    except Exception:
+        translated_text = text
+    return translated_text, detected_lang, is_non_english
+
+
+def prepare_article(text, language='auto', translate=google_translate, policy=UNBOUNDED, timer=None,
+                    sentiment=True):
+    """Run the per-article stages: detection, translation, cleaning and numeric features.
+
+    Language is detected once; unlike preprocess_text, the translated text
+    is not detected again before cleaning. A language outside
+    SUPPORTED_LANGUAGES is cleaned when the translator returned a translation;
+    only when that fails is cleaned_text empty. The size policy bounds what the
+    detection, translation/feature and char n-gram stages see. sentiment=False
+    skips TextBlob for models without the sentiment features.
+    """
+    analysis_text = policy.analysis_text(text)
+    translated_text, detected_lang, is_non_english = detect_and_translate(
+        analysis_text, language, translate, detection_text=policy.detection_text(text)
+    )
+    if timer is not None:
+        timer.mark('detect_translate')
+    translated = is_non_english and bool(translated_text) and translated_text != analysis_text
+    supported = detected_lang in SUPPORTED_LANGUAGES or detected_lang == 'english' or translated
+    cleaned_text = clean_text(translated_text) if supported and translated_text else ""
+    if timer is not None:
+        timer.mark('clean')
+    numeric = extract_numeric_features(translated_text, is_non_english, sentiment)
+    if timer is not None:
+        timer.mark('numeric_features')
+    return Bunch(
+        text=translated_text,
+        cleaned_text=cleaned_text,
+        char_text=policy.ngram_text(cleaned_text),
+        detected_language=detected_lang,
+        is_non_english=is_non_english,
+        truncated=len(analysis_text) < len(text),
+        numeric=numeric,
+    )
+
+
+def _numeric_features(bundle, articles):
+    num_array = np.array([
+        [article.numeric[col] for col in bundle.metadata.num_feature_columns]
+        for article in articles
+    ], dtype=getattr(bundle.word_vectorizer, 'dtype', float))
+    return bundle.scaler.transform(num_array)
+
+
+def build_features(bundle, articles, timer=None):
+    """Vectorize a list of prepared articles into one combined CSR matrix"""
+    word_features = bundle.word_vectorizer.transform([article.cleaned_text for article in articles])
+    if timer is not None:
+        timer.mark('word_tfidf')
+    char_features = bundle.char_vectorizer.transform([article.char_text for article in articles])
+    if timer is not None:
+        timer.mark('char_tfidf')
+    num_scaled = _numeric_features(bundle, articles)
+    X = hstack_csr([word_features, char_features, num_scaled])
+    if timer is not None:
+        timer.mark('assemble')
+    return X
+
+
+def build_word_features(bundle, articles):
+    """Word TF-IDF and scaled numeric features only, the input of the cascade's word model"""
+    word_features = bundle.word_vectorizer.transform([article.cleaned_text for article in articles])
+    return hstack_csr([word_features, _numeric_features(bundle, articles)])
+
+
+def score_features(bundle, X):
+    """Return (predictions, probabilities) with a single predict_proba pass"""
+    probabilities = bundle.model.predict_proba(X)
+    predictions = bundle.model.classes_[np.argmax(probabilities, axis=1)]
+    return predictions, probabilities
+
+
+def score_articles(bundle, articles, cascade_threshold=None, timer=None, deadline=None):
+    """Return (predictions, probabilities, early_exit) for prepared articles.
+
+    With a cascade_threshold and a word model in the bundle, the cheap
+    word-only model scores every article first. Only articles whose
+    word-model confidence is below the threshold pay for char n-grams and
+    the full model; early_exit marks the rest. With a deadline that has
+    eaten into its scoring reserve, the word model answers for every article.
+    """
+    early_exit = np.zeros(len(articles), dtype=bool)
+    word_only = deadline is not None and deadline.reserve_spent() and bundle.get('word_model') is not None
+    if word_only:
+        deadline.degrade('word_model_only')
+    if not (cascade_threshold or word_only) or bundle.get('word_model') is None:
+        X = build_features(bundle, articles, timer)
+        predictions, probabilities = score_features(bundle, X)
+        if timer is not None:
+            timer.mark('score')
+        return predictions, probabilities, early_exit
+
+    probabilities = bundle.word_model.predict_proba(build_word_features(bundle, articles))
+    if timer is not None:
+        timer.mark('word_model')
+    early_exit = np.ones(len(articles), dtype=bool) if word_only else probabilities.max(axis=1) >= cascade_threshold
+    uncertain = np.flatnonzero(~early_exit)
+    if len(uncertain):
+        X = build_features(bundle, [articles[i] for i in uncertain], timer)
+        probabilities[uncertain] = bundle.model.predict_proba(X)
+        if timer is not None:
+            timer.mark('score')
+    predictions = bundle.model.classes_[np.argmax(probabilities, axis=1)]
+    return predictions, probabilities, early_exit
+
+
+def top_features(bundle, n=5):
+    """Best-effort (feature, weight) pairs with the largest absolute SVM coefficients"""
+    try:
+        if hasattr(bundle.model, 'fold_coef'):
+            # CompactLinearModel (SATYASCAN_PRECISION float32/int8)
+            coef = bundle.model.fold_coef(0)
+        else:
+            calibrated = bundle.model.calibrated_classifiers_[0]
+            estimator = getattr(calibrated, 'estimator', None) or getattr(calibrated, 'base_estimator', None)
+            coef = estimator.coef_[0]
+        top_indices = np.argsort(np.abs(coef))[-n:][::-1]
+        return [(bundle.feature_names[i], float(coef[i])) for i in top_indices]
+    except Exception:
+        pass
+    return []
+
+
+def analyze_article(bundle, text, language='auto', policy=UNBOUNDED, translate=google_translate, explain=True,
+                    cascade_threshold=None, deadline=None, fields=None):
+    """Full single-article analysis returning the /api/analyze response fields.
+
+    degraded_reasons lists what the deadline (scripts/deadline.py) made the pipeline skip.
+    With fields (scripts/fields.py), the explanation and sentiment are only
+    computed when requested or needed by the model. An article with no
+    cleaned text (an unsupported language that could not be translated) is
+    not scored, as in predict_batch: is_fake is None and model_stage is
+    'unsupported'.
+    """
+    sentiment = wants(fields, 'sentiment') or uses_sentiment(bundle.metadata.num_feature_columns)
+    article = prepare_article(text, language, translate, policy, sentiment=sentiment)
+    result = {
+        'is_fake': None,
+        'confidence': 0.0,
+        'top_features': [],
+        'translation': article.text if article.text != policy.analysis_text(text) else None,
+        'detected_language': article.detected_language,
+        'truncated': article.truncated,
+        'model_stage': 'unsupported',
+    }
+    if article.cleaned_text:
+        predictions, probabilities, early_exit = score_articles(bundle, [article], cascade_threshold,
+                                                                deadline=deadline)
+        prediction, proba = predictions[0], probabilities[0]
+        result.update({
+            'is_fake': bool(prediction == 0),
+            'confidence': float(proba[1] if prediction == 1 else proba[0]),
+            'top_features': top_features(bundle) if explain and wants(fields, 'top_features') else [],
+            'model_stage': 'word' if early_exit[0] else 'full',
+        })
+    result['degraded'] = bool(deadline is not None and deadline.degraded)
+    result['degraded_reasons'] = list(deadline.degraded) if deadline is not None else []
+    if wants(fields, 'sentiment'):
+        result['sentiment'] = {
+            'sentiment': float(article.numeric['sentiment']),
+            'subjectivity': float(article.numeric['subjectivity'])
+        }
+    return result
+
+
+def predict_batch(bundle, texts, language='auto', translate=google_translate, policy=UNBOUNDED,
+                  cascade_threshold=None):
+    """Classify a list of raw articles, returning one result dict per article"""
+    articles = [prepare_article(text, language, translate, policy) for text in texts]
+    results = [
+        {
+            'label': 'unsupported',
+            'is_fake': None,
+            'confidence': 0.0,
+            'detected_language': article.detected_language,
+        }
+        for article in articles
+    ]
+    valid = [i for i, article in enumerate(articles) if article.cleaned_text]
+    if not valid:
+        return results
+
+    predictions, probabilities, _ = score_articles(bundle, [articles[i] for i in valid], cascade_threshold)
+    for i, prediction, proba in zip(valid, predictions, probabilities):
+        confidence = proba[1] if prediction == 1 else proba[0]
+        results[i].update({
+            'label': 'real' if prediction == 1 else 'fake',
+            'is_fake': bool(prediction == 0),
+            'confidence': float(confidence),
+        })
+    return results
@@ -0,0 +1,148 @@
+"""
+Size policy that bounds the cost of analyzing very long articles.
+
+    SATYASCAN_MAX_REQUEST_BYTES  request bodies above this are rejected (413)
+    SATYASCAN_MAX_TEXT_CHARS     articles above this are rejected (413)
+    SATYASCAN_DETECT_CHARS       characters sampled for language detection
+    SATYASCAN_ANALYSIS_CHARS     characters translated, cleaned and featurized
+    SATYASCAN_NGRAM_CHARS        cleaned characters fed to char n-gram extraction
+    SATYASCAN_TRUNCATION         'head_tail' (default) or 'sample'
+
+Measure the accuracy and latency impact on labeled data:
+    python scripts/limits.py --csv heldout.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+TRUNCATION_MODES = ('head_tail', 'sample')
+SAMPLE_WINDOWS = 4
+
+
+def clip_text(text, limit, mode='head_tail'):
+    """Shorten text to about limit characters, keeping its head and tail or evenly spaced windows"""
+    if limit is None or len(text) <= limit:
+        return text
+    if mode == 'sample':
+        window = max(limit // SAMPLE_WINDOWS, 1)
+        step = (len(text) - window) / (SAMPLE_WINDOWS - 1)
+        return " ".join(text[int(i * step):int(i * step) + window] for i in range(SAMPLE_WINDOWS))
+    head = limit // 2
+    return text[:head] + " " + text[len(text) - (limit - head):]
+
+
+class SizePolicy:
+    """Caps on what each pipeline stage sees; None disables a cap"""
+
+    def __init__(self, max_request_bytes=None, max_text_chars=None, detect_chars=None,
+                 analysis_chars=None, ngram_chars=None, truncation='head_tail'):
+        if truncation not in TRUNCATION_MODES:
+            raise ValueError(f"Unknown truncation mode: {truncation}")
+        self.max_request_bytes = max_request_bytes
+        self.max_text_chars = max_text_chars
+        self.detect_chars = detect_chars
+        self.analysis_chars = analysis_chars
+        self.ngram_chars = ngram_chars
+        self.truncation = truncation
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        def limit(name, default):
+            value = environ.get(name, default)
+            return int(value) if value not in (None, '', '0') else None
+        return cls(
+            max_request_bytes=limit('SATYASCAN_MAX_REQUEST_BYTES', 1_000_000),
+            max_text_chars=limit('SATYASCAN_MAX_TEXT_CHARS', 200_000),
+            detect_chars=limit('SATYASCAN_DETECT_CHARS', 2_000),
+            analysis_chars=limit('SATYASCAN_ANALYSIS_CHARS', 20_000),
+            ngram_chars=limit('SATYASCAN_NGRAM_CHARS', 10_000),
+            truncation=environ.get('SATYASCAN_TRUNCATION', 'head_tail'),
+        )
+
+    def too_large(self, text):
+        return self.max_text_chars is not None and len(text) > self.max_text_chars
+
+    def detection_text(self, text):
+        return clip_text(text, self.detect_chars, self.truncation)
+
+    def analysis_text(self, text):
+        return clip_text(text, self.analysis_chars, self.truncation)
+
+    def ngram_text(self, cleaned_text):
+        return clip_text(cleaned_text, self.ngram_chars, self.truncation)
+
+
+UNBOUNDED = SizePolicy()
+
+
+def _identity_translate(text, source):
+    return text
+
+
+def measure(bundle, texts, labels, policy, translate=_identity_translate):
+    """Score labeled texts with and without policy; report accuracy, agreement and latency"""
+    from scripts.inference import analyze_article
+
+    rows = {}
+    for name, mode_policy in (('unbounded', UNBOUNDED), ('bounded', policy)):
+        verdicts, latencies = [], []
+        for text in texts:
+            started = time.perf_counter()
+            result = analyze_article(bundle, text, policy=mode_policy, translate=translate, explain=False)
+            latencies.append(time.perf_counter() - started)
+            verdicts.append(0 if result['is_fake'] else 1)
+        rows[name] = (np.array(verdicts), np.array(latencies))
+
+    labels = np.asarray(labels)
+    lengths = np.array([len(text) for text in texts])
+    clipped = lengths > (policy.analysis_chars or np.inf)
+    report = {
+        'articles': len(texts),
+        'clipped_articles': int(clipped.sum()),
+        'agreement': float(np.mean(rows['unbounded'][0] == rows['bounded'][0])),
+    }
+    for name, (verdicts, latencies) in rows.items():
+        report[name] = {
+            'accuracy': float(np.mean(verdicts == labels)),
+            'accuracy_on_clipped': float(np.mean(verdicts[clipped] == labels[clipped])) if clipped.any() else None,
+            'p50_ms': 1000 * float(np.percentile(latencies, 50)),
+            'p99_ms': 1000 * float(np.percentile(latencies, 99)),
+            'max_ms': 1000 * float(latencies.max()),
+        }
+    return report
+
+
+def main():
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.append(os.path.dirname(current_dir))
+    from scripts.inference import load_bundle
+
+    parser = argparse.ArgumentParser(description="Accuracy and latency impact of the size policy")
+    parser.add_argument("--models_dir", default="models")
+    parser.add_argument("--csv", required=True, help="Labeled CSV with 'text' and 'label' (1 = real, 0 = fake) columns")
+    parser.add_argument("--limit", type=int, default=None, help="Only score the first N rows")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    if args.limit:
+        df = df.head(args.limit)
+    policy = SizePolicy.from_env()
+    report = measure(load_bundle(args.models_dir), df['text'].astype(str).tolist(), df['label'].tolist(), policy)
+
+    print(f"\n Size policy impact on {report['articles']} articles "
+          f"({report['clipped_articles']} longer than {policy.analysis_chars} chars)")
+    print(f" Verdict agreement bounded vs unbounded: {report['agreement']:.4f}")
+    for name in ('unbounded', 'bounded'):
+        row = report[name]
+        clipped = f"{row['accuracy_on_clipped']:.4f}" if row['accuracy_on_clipped'] is not None else "n/a"
+        print(f" {name:<10} accuracy {row['accuracy']:.4f}  on clipped {clipped}  "
+              f"p50 {row['p50_ms']:.1f} ms  p99 {row['p99_ms']:.1f} ms  max {row['max_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Local load generator for the SatyaScan web API.
+
+Sends concurrent POST /api/analyze requests for a fixed duration and
+reports throughput, latency percentiles, status codes and which model
+versions answered, so a hot reload can be checked for dropped requests.
+
+Usage:
+    python scripts/loadgen.py --url http://localhost:5000 --concurrency 8 --duration 30
+    python scripts/loadgen.py --articles test_articles.txt --json load_report.json
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+import numpy as np
+
+DEFAULT_ARTICLES = [
+    "The finance minister announced a new policy on Tuesday after the cabinet meeting.",
+    "SHOCKING: This one weird trick will make you rich overnight! Click here now!",
+    "नई दिल्ली में आज एक नई मेट्रो लाइन का उद्घाटन किया गया।",
+]
+
+
+def _post(url, payload, timeout):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode("utf-8"), headers={'Content-Type': 'application/json'}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as e:
+        return e.code, {}
+    except Exception:
+        return None, {}
+
+
+def run_load(url, articles, concurrency=4, duration=10.0, timeout=35.0, language='auto'):
+    """Drive the analyze endpoint from `concurrency` threads for `duration` seconds"""
+    endpoint = url.rstrip("/") + "/api/analyze"
+    deadline = time.perf_counter() + duration
+    lock = threading.Lock()
+    latencies, statuses, versions = [], Counter(), Counter()
+    timeline = []
+
+    def worker(offset):
+        i = offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status, body = _post(endpoint, {'text': articles[i % len(articles)], 'language': language}, timeout)
+            finished = time.perf_counter()
+            with lock:
+                latencies.append(finished - started)
+                statuses[status if status is not None else 'connection_error'] += 1
+                version = body.get('model_version')
+                if version is not None:
+                    versions[version] += 1
+                    if not timeline or timeline[-1][1] != version:
+                        timeline.append((round(finished - (deadline - duration), 3), version))
+            i += concurrency
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    total = sum(statuses.values())
+    return {
+        'requests': total,
+        'requests_per_sec': total / elapsed,
+        'errors': total - statuses.get(200, 0),
+        'status_codes': {str(k): v for k, v in statuses.items()},
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'max_ms': float(latencies.max()),
+        'model_versions': dict(versions),
+        'version_timeline': timeline,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the /api/analyze endpoint")
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--articles", default=None, help="Text file with one article per line")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--language", default="auto")
+    parser.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    articles = DEFAULT_ARTICLES
+    if args.articles:
+        with open(args.articles, "r", encoding="utf-8") as f:
+            articles = [line.strip() for line in f if line.strip()]
+
+    report = run_load(args.url, articles, args.concurrency, args.duration, language=args.language)
+    print(f" {report['requests']} requests in {args.duration:.0f}s ({report['requests_per_sec']:.1f} req/s), "
+          f"{report['errors']} errors")
+    print(f" Latency p50 {report['p50_ms']:.1f} ms, p95 {report['p95_ms']:.1f} ms, "
+          f"p99 {report['p99_ms']:.1f} ms, max {report['max_ms']:.1f} ms")
+    print(f" Status codes: {report['status_codes']}")
+    print(f" Model versions: {report['model_versions']}")
+    for at, version in report['version_timeline']:
+        print(f"   {at:>8.2f}s  {version}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
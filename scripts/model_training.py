@@ -2,14 +2,14 @@ import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.svm import LinearSVC
-from sklearn.calibration import CalibratedClassifierCV
 from sklearn.metrics import confusion_matrix, classification_report
 from sklearn.preprocessing import StandardScaler
 from sklearn.utils import Bunch
 import joblib
+import argparse
 import os
 import sys
+import time
 from tqdm import tqdm
 import nltk
 from textblob import TextBlob
@@ -28,6 +28,9 @@ project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
 from scripts.utils import preprocess_text
+from scripts.bundles import publish_bundle
+from scripts.feature_store import FeatureStore, content_hash
+from scripts.calibration import CALIBRATIONS, make_calibrated_svm
 
 def load_data(sample_size=10000):
     required_files = {
@@ -40,10 +43,14 @@ def load_data(sample_size=10000):
             return None, None
     try:
         print(" Loading true news articles...")
-        true_df = pd.read_csv("data/True.csv").sample(n=sample_size, random_state=42)
+        true_df = pd.read_csv("data/True.csv")
+        if sample_size:
+            true_df = true_df.sample(n=min(sample_size, len(true_df)), random_state=42)
         print(f" Loaded {len(true_df)} true news articles")
         print(" Loading fake news articles...")
-        fake_df = pd.read_csv("data/Fake.csv").sample(n=sample_size, random_state=42)
+        fake_df = pd.read_csv("data/Fake.csv")
+        if sample_size:
+            fake_df = fake_df.sample(n=min(sample_size, len(fake_df)), random_state=42)
         print(f" Loaded {len(fake_df)} fake news articles")
         return true_df, fake_df
     except Exception as e:
@@ -77,45 +84,15 @@ def extract_numeric_features(text, is_non_english):
         'is_non_english': 1 if is_non_english else 0
     }
 
-def main():
-    try:
-        nltk.download('punkt')
-    except:
-        pass
-
-    true_df, fake_df = load_data(sample_size=10000)
-    if true_df is None or fake_df is None:
-        print(" Failed to load required data files")
-        sys.exit(1)
+NUM_FEATURE_COLUMNS = ['length', 'word_count', 'avg_word_length', 'capitals_ratio',
+                       'numbers_ratio', 'sentiment', 'subjectivity', 'exclamations',
+                       'questions', 'quotes', 'is_non_english']
 
-    true_df['label'] = 1
-    fake_df['label'] = 0
+# Bump when preprocess_text or extract_numeric_features change, so stored rows are recomputed
+FEATURE_VERSION = 1
 
-    df = pd.concat([true_df, fake_df]).sample(frac=1, random_state=42).reset_index(drop=True)
-
-    print(" Preprocessing text...")
-    cleaned_texts = []
-    for text in tqdm(df['text'], desc="Cleaning text"):
-        cleaned_text, _ = preprocess_text(text)
-        cleaned_texts.append(cleaned_text)
-    df['clean_text'] = cleaned_texts
-    print(" Text preprocessing complete")
 
-    print(" Extracting features...")
-    # Training data is English; set is_non_english=0 to mirror inference flag
-    num_features_list = []
-    for text in tqdm(df['text'], desc="Numeric features"):
-        num_features_list.append(extract_numeric_features(text, is_non_english=False))
-    df_num = pd.DataFrame(num_features_list)
-
-    X_text = df['clean_text']
-    num_feature_columns = ['length', 'word_count', 'avg_word_length', 'capitals_ratio',
-                           'numbers_ratio', 'sentiment', 'subjectivity', 'exclamations',
-                           'questions', 'quotes', 'is_non_english']
-    X_num = df_num[num_feature_columns]
-    y = df['label']
-
-    print(" Creating vectorizers...")
+def make_vectorizers():
     word_vectorizer = TfidfVectorizer(
         max_features=20000,
         ngram_range=(1, 2),
@@ -129,29 +106,132 @@ def main():
         min_df=2,
         max_df=1.0
     )
+    return {'word': word_vectorizer, 'char': char_vectorizer}
 
-    X_train_text, X_test_text, X_train_num, X_test_num, y_train, y_test = train_test_split(
-        X_text, X_num, y, test_size=0.2, random_state=42, stratify=y
-    )
+
+def clean_rows(texts):
+    return [preprocess_text(text)[0] for text in tqdm(texts, desc="Cleaning text")]
+
+
+def numeric_rows(texts):
+    # Training data is English; set is_non_english=0 to mirror inference flag
+    rows = [extract_numeric_features(text, is_non_english=False) for text in tqdm(texts, desc="Numeric features")]
+    return np.array([[row[col] for col in NUM_FEATURE_COLUMNS] for row in rows], dtype=float).reshape(-1, len(NUM_FEATURE_COLUMNS))
+
+
+def _rows(store, config, keys, items, compute):
+    if store is None:
+        return compute(items)
+    return store.rows(config, keys, items, compute)
+
+
+def training_features(texts, labels, store=None, refit_vectorizers=False):
+    """Clean, vectorize and split texts into train/test feature blocks.
+
+    With a FeatureStore, cleaned text, numeric features and TF-IDF rows are
+    looked up by content hash and only unseen articles are transformed. The
+    stored vectorizers keep their vocabulary until refit_vectorizers is set.
+    """
+    texts = [str(text) for text in texts]
+    y = np.asarray(labels)
+    keys = [content_hash(text) for text in texts] if store is not None else None
+
+    print(" Preprocessing text...")
+    cleaned = _rows(store, {'kind': 'clean', 'version': FEATURE_VERSION}, keys, texts, clean_rows)
+    print(" Extracting features...")
+    X_num = _rows(store, {'kind': 'numeric', 'version': FEATURE_VERSION, 'columns': NUM_FEATURE_COLUMNS},
+                  keys, texts, numeric_rows)
+
+    train_idx, test_idx = train_test_split(np.arange(len(texts)), test_size=0.2, random_state=42, stratify=y)
+    train_text = [cleaned[i] for i in train_idx]
 
     print(" Vectorizing text (word & char)...")
-    X_train_word = word_vectorizer.fit_transform(X_train_text)
-    X_test_word = word_vectorizer.transform(X_test_text)
-    X_train_char = char_vectorizer.fit_transform(X_train_text)
-    X_test_char = char_vectorizer.transform(X_test_text)
+    if store is None:
+        vectorizers = make_vectorizers()
+        X_train_word = vectorizers['word'].fit_transform(train_text)
+        X_test_word = vectorizers['word'].transform([cleaned[i] for i in test_idx])
+        X_train_char = vectorizers['char'].fit_transform(train_text)
+        X_test_char = vectorizers['char'].transform([cleaned[i] for i in test_idx])
+    else:
+        def fit():
+            fitted = make_vectorizers()
+            for vectorizer in fitted.values():
+                vectorizer.fit(train_text)
+            return fitted
+
+        unfitted = make_vectorizers()
+        config = {name: v.get_params() for name, v in unfitted.items()}
+        vectorizers = store.vectorizers(config, fit, refit_vectorizers, [keys[i] for i in train_idx])
+        leaked = len(vectorizers.get('fitted_on', frozenset()).intersection(keys[i] for i in test_idx))
+        if leaked:
+            print(f" Warning: {leaked} test articles were in the split the stored vocabulary was fitted on; "
+                  "pass --refit_vectorizers for a clean held-out score")
+        blocks = {}
+        for name in ('word', 'char'):
+            config = {'kind': f'{name}_tfidf', 'vectorizers': vectorizers['fingerprint']}
+            blocks[name] = _rows(store, config, keys, cleaned, vectorizers[name].transform)
+        X_train_word, X_test_word = blocks['word'][train_idx], blocks['word'][test_idx]
+        X_train_char, X_test_char = blocks['char'][train_idx], blocks['char'][test_idx]
 
     print(" Scaling numeric features...")
     scaler = StandardScaler(with_mean=False)
-    X_train_num_scaled = scaler.fit_transform(X_train_num.astype(float))
-    X_test_num_scaled = scaler.transform(X_test_num.astype(float))
+    X_train_num_scaled = scaler.fit_transform(X_num[train_idx])
+    X_test_num_scaled = scaler.transform(X_num[test_idx])
+
+    return Bunch(word_vectorizer=vectorizers['word'], char_vectorizer=vectorizers['char'], scaler=scaler,
+                 X_train_word=X_train_word, X_test_word=X_test_word,
+                 X_train_char=X_train_char, X_test_char=X_test_char,
+                 X_train_num_scaled=X_train_num_scaled, X_test_num_scaled=X_test_num_scaled,
+                 y_train=y[train_idx], y_test=y[test_idx])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the calibrated SVM and publish a model bundle")
+    parser.add_argument("--sample_size", type=int, default=10000, help="Rows per class from data/ (0 = all rows)")
+    parser.add_argument("--feature_store", default="features",
+                        help="Directory of cached feature rows; only articles not seen before are transformed")
+    parser.add_argument("--no_feature_store", action="store_true", help="Recompute every feature from scratch")
+    parser.add_argument("--refit_vectorizers", action="store_true",
+                        help="Refit the stored TF-IDF vocabularies on the current train split")
+    parser.add_argument("--calibration", choices=CALIBRATIONS, default="ensemble",
+                        help="'single' keeps one SVM and one sigmoid instead of one per fold (a third of the scoring cost)")
+    args = parser.parse_args()
+
+    try:
+        nltk.download('punkt')
+    except:
+        pass
+
+    true_df, fake_df = load_data(sample_size=args.sample_size or None)
+    if true_df is None or fake_df is None:
+        print(" Failed to load required data files")
+        sys.exit(1)
+
+    true_df['label'] = 1
+    fake_df['label'] = 0
+
+    df = pd.concat([true_df, fake_df]).sample(frac=1, random_state=42).reset_index(drop=True)
+
+    store = None if args.no_feature_store else FeatureStore(args.feature_store)
+    started = time.perf_counter()
+    features = training_features(df['text'], df['label'], store, args.refit_vectorizers)
+    print(f" Features ready in {time.perf_counter() - started:.1f}s")
+    if store is not None:
+        for name, stats in store.stats.items():
+            print(f"   {name}: {stats['computed']} of {stats['rows']} rows transformed, rest from {args.feature_store}/")
+
+    word_vectorizer, char_vectorizer, scaler = features.word_vectorizer, features.char_vectorizer, features.scaler
+    X_train_word, X_test_word = features.X_train_word, features.X_test_word
+    X_train_num_scaled, X_test_num_scaled = features.X_train_num_scaled, features.X_test_num_scaled
+    y_train, y_test = features.y_train, features.y_test
+    num_feature_columns = NUM_FEATURE_COLUMNS
 
     print(" Combining features (sparse)...")
-    X_train_combined = sparse.hstack([X_train_word, X_train_char, X_train_num_scaled]).tocsr()
-    X_test_combined = sparse.hstack([X_test_word, X_test_char, X_test_num_scaled]).tocsr()
+    X_train_combined = sparse.hstack([X_train_word, features.X_train_char, X_train_num_scaled]).tocsr()
+    X_test_combined = sparse.hstack([X_test_word, features.X_test_char, X_test_num_scaled]).tocsr()
 
-    print(" Training calibrated Linear SVM...")
-    base_svm = LinearSVC(C=1.0, class_weight='balanced', max_iter=5000)
-    model = CalibratedClassifierCV(estimator=base_svm, method='sigmoid', cv=3)
+    print(f" Training calibrated Linear SVM ({args.calibration} calibration)...")
+    model = make_calibrated_svm(args.calibration)
     model.fit(X_train_combined, y_train)
 
     print(" Evaluating model...")
@@ -163,12 +243,23 @@ def main():
     print("\nClassification Report:")
     print(class_report)
 
+    # Cheap first stage of the serving cascade: word TF-IDF and numeric features, no char n-grams
+    print(" Training word-only calibrated Linear SVM (cascade first stage)...")
+    X_train_word_only = sparse.hstack([X_train_word, X_train_num_scaled]).tocsr()
+    X_test_word_only = sparse.hstack([X_test_word, X_test_num_scaled]).tocsr()
+    word_model = make_calibrated_svm(args.calibration)
+    word_model.fit(X_train_word_only, y_train)
+    word_pred = word_model.predict(X_test_word_only)
+    print("\nWord-only Classification Report:")
+    print(classification_report(y_test, word_pred))
+
     feature_names_word = list(word_vectorizer.get_feature_names_out())
     feature_names_char = [f"<char:{f}>" for f in char_vectorizer.get_feature_names_out()]
     combined_feature_names = feature_names_word + feature_names_char + num_feature_columns
 
     print(" Saving artifacts...")
     joblib.dump(model, "models/news_svm_calibrated.pkl")
+    joblib.dump(word_model, "models/news_svm_word.pkl")
     joblib.dump(word_vectorizer, "models/tfidf_word.pkl")
     joblib.dump(char_vectorizer, "models/tfidf_char.pkl")
     joblib.dump(scaler, "models/num_scaler.pkl")
@@ -176,14 +267,19 @@ def main():
 
     metadata = Bunch(
         model_type='CalibratedLinearSVC',
+        calibration=args.calibration,
         num_feature_columns=num_feature_columns,
         word_vocab_size=len(feature_names_word),
         char_vocab_size=len(feature_names_char),
         confusion_matrix=conf_matrix,
-        classification_report=class_report
+        classification_report=class_report,
+        word_model_accuracy=float(np.mean(word_pred == y_test))
     )
     joblib.dump(metadata, "models/model_metadata.pkl")
     print(" All files saved successfully!")
 
+    manifest = publish_bundle("models", "models")
+    print(f" Published model version {manifest['version']}")
+
 if __name__ == "__main__":
     main()
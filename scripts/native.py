@@ -0,0 +1,245 @@
+"""
+Translation-free native multilingual scoring.
+
+The native model scores articles in their original language. It uses char
+3-5-gram TF-IDF over the original text, which works for every script, plus
+the numeric features. GoogleTranslator is never called on the scoring path,
+so verdicts are deterministic and do not wait for a network round trip.
+Translation is only an optional enrichment of the response.
+
+The model is one artifact, models/news_svm_native.pkl, holding the
+vectorizer, scaler and calibrated SVM. It is loaded with the other bundle
+files and published with them when present.
+
+Usage:
+    python scripts/native.py train --csv corpus.csv          # columns: text, label (1 = real, 0 = fake), [language]
+    python scripts/native.py compare --csv heldout.csv       # native vs translate-then-classify
+    python scripts/native.py compare --csv heldout.csv --translator identity   # fully offline
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import joblib
+import langdetect
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import StandardScaler
+from sklearn.utils import Bunch
+from textblob import TextBlob
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from scripts.inference import (OPTIONAL_MODEL_FILES, analyze_article, extract_numeric_features, google_translate,
+                               load_bundle)
+from scripts.limits import UNBOUNDED
+from scripts.fields import uses_sentiment, wants
+from scripts.assemble import hstack_csr
+
+NATIVE_MODEL_FILE = OPTIONAL_MODEL_FILES['native_model']
+
+
+def detect_language(text, language='auto'):
+    """Return the detected (or given) language, 'en' when detection fails"""
+    if language != 'auto':
+        return language
+    try:
+        return langdetect.detect(text)
+    except Exception:
+        return 'en'
+
+
+def _numeric(native, text, is_non_english):
+    features = extract_numeric_features(text, is_non_english, uses_sentiment(native.num_feature_columns))
+    return [features[col] for col in native.num_feature_columns]
+
+
+def native_features(native, texts, is_non_english):
+    """Char TF-IDF over the original texts combined with their scaled numeric features"""
+    num_array = np.array([_numeric(native, text, flag) for text, flag in zip(texts, is_non_english)], dtype=float)
+    char_features = native.char_vectorizer.transform(texts)
+    return hstack_csr([char_features, native.scaler.transform(num_array)])
+
+
+def train_native_model(texts, labels, languages=None, max_features=300000):
+    """Fit the native model on original-language texts; languages are detected when not given"""
+    # calibration imports evaluate -> warmup -> native, so import the shared pieces here
+    from scripts.calibration import make_calibrated_svm
+    from scripts.model_training import NUM_FEATURE_COLUMNS
+
+    if languages is None:
+        languages = [detect_language(text) for text in texts]
+    is_non_english = [language not in ('en', 'english') for language in languages]
+    char_vectorizer = TfidfVectorizer(analyzer='char', ngram_range=(3, 5), min_df=2, max_df=1.0,
+                                      max_features=max_features, sublinear_tf=True)
+    scaler = StandardScaler(with_mean=False)
+    native = Bunch(char_vectorizer=char_vectorizer, scaler=scaler, num_feature_columns=NUM_FEATURE_COLUMNS)
+
+    num_array = np.array([_numeric(native, text, flag) for text, flag in zip(texts, is_non_english)], dtype=float)
+    X = sparse.hstack([char_vectorizer.fit_transform(texts), scaler.fit_transform(num_array)]).tocsr()
+    native.model = make_calibrated_svm().fit(X, labels)
+    native.languages = sorted(set(languages))
+    return native
+
+
+def analyze_native(bundle, text, language='auto', policy=UNBOUNDED, translate=None, deadline=None, fields=None):
+    """Score text in its original language with bundle.native_model.
+
+    Returns the /api/analyze response fields. translate(text, source) is
+    only called, as an enrichment, when given, the article is not English
+    and the translation field is wanted. Sentiment is only computed when wanted.
+    """
+    native = bundle.native_model
+    analysis_text = policy.analysis_text(text)
+    detected_lang = detect_language(policy.detection_text(text), language)
+    is_non_english = detected_lang not in ('en', 'english')
+
+    X = native_features(native, [policy.ngram_text(analysis_text)], [is_non_english])
+    proba = native.model.predict_proba(X)[0]
+    prediction = native.model.classes_[np.argmax(proba)]
+
+    translation = None
+    if translate is not None and is_non_english and wants(fields, 'translation'):
+        try:
+            translation = translate(analysis_text, detected_lang)
+        except Exception:
+            translation = None
+    result = {
+        'is_fake': bool(prediction == 0),
+        'confidence': float(proba[np.argmax(proba)]),
+        'top_features': [],
+        'translation': translation,
+        'detected_language': detected_lang,
+        'truncated': len(analysis_text) < len(text),
+        'model_stage': 'native',
+        'degraded': bool(deadline is not None and deadline.degraded),
+        'degraded_reasons': list(deadline.degraded) if deadline is not None else [],
+    }
+    if wants(fields, 'sentiment'):
+        blob = TextBlob(translation or analysis_text)
+        result['sentiment'] = {
+            'sentiment': float(blob.sentiment.polarity),
+            'subjectivity': float(blob.sentiment.subjectivity)
+        }
+    return result
+
+
+def _identity_translate(text, source):
+    return text
+
+
+def compare_paths(bundle, texts, labels, languages=None, translate=google_translate):
+    """Accuracy and per-article latency of native scoring vs translate-then-classify"""
+    labels = np.asarray(labels)
+    rows = {}
+    for name in ('native', 'translate'):
+        verdicts, latencies = [], []
+        for i, text in enumerate(texts):
+            language = languages[i] if languages is not None else 'auto'
+            started = time.perf_counter()
+            if name == 'native':
+                result = analyze_native(bundle, text, language)
+            else:
+                result = analyze_article(bundle, text, language, translate=translate, explain=False)
+            latencies.append(time.perf_counter() - started)
+            verdicts.append(0 if result['is_fake'] else 1)
+        rows[name] = (np.array(verdicts), np.array(latencies))
+
+    report = {'articles': len(texts), 'paths': {}, 'languages': {}}
+    for name, (verdicts, latencies) in rows.items():
+        report['paths'][name] = {
+            'accuracy': float(np.mean(verdicts == labels)),
+            'mean_ms': 1000 * float(latencies.mean()),
+            'p50_ms': 1000 * float(np.percentile(latencies, 50)),
+            'p95_ms': 1000 * float(np.percentile(latencies, 95)),
+            'max_ms': 1000 * float(latencies.max()),
+        }
+    report['agreement'] = float(np.mean(rows['native'][0] == rows['translate'][0]))
+    if languages is not None:
+        languages = np.asarray(languages)
+        for language in sorted(set(languages)):
+            mask = languages == language
+            report['languages'][language] = {
+                'articles': int(mask.sum()),
+                **{f'{name}_accuracy': float(np.mean(rows[name][0][mask] == labels[mask])) for name in rows},
+            }
+    return report
+
+
+def _read_corpus(csv_path):
+    df = pd.read_csv(csv_path)
+    languages = df['language'].astype(str).tolist() if 'language' in df.columns else None
+    return df['text'].astype(str).tolist(), df['label'].astype(int).tolist(), languages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Translation-free native multilingual model")
+    parser.add_argument("--models_dir", default="models")
+    commands = parser.add_subparsers(dest="command", required=True)
+    train = commands.add_parser("train", help="Train news_svm_native.pkl on a local labeled corpus")
+    train.add_argument("--csv", default=None, help="CSV with 'text', 'label' and optional 'language' columns; defaults to data/True.csv + data/Fake.csv")
+    train.add_argument("--sample_size", type=int, default=10000, help="Rows per class when reading data/")
+    train.add_argument("--max_features", type=int, default=300000)
+    compare = commands.add_parser("compare", help="Native vs translate-then-classify on labeled data")
+    compare.add_argument("--csv", required=True, help="CSV with 'text', 'label' and optional 'language' columns")
+    compare.add_argument("--limit", type=int, default=None, help="Only score the first N rows")
+    compare.add_argument("--translator", choices=["google", "identity"], default="google",
+                         help="'identity' skips translation on the translate path too, for offline runs")
+    compare.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        if args.csv:
+            texts, labels, languages = _read_corpus(args.csv)
+        else:
+            from scripts.model_training import load_data
+            true_df, fake_df = load_data(sample_size=args.sample_size)
+            if true_df is None or fake_df is None:
+                sys.exit(1)
+            texts = true_df['text'].astype(str).tolist() + fake_df['text'].astype(str).tolist()
+            labels = [1] * len(true_df) + [0] * len(fake_df)
+            languages = None
+        print(f" Training native model on {len(texts)} articles...")
+        started = time.perf_counter()
+        native = train_native_model(texts, labels, languages, args.max_features)
+        path = os.path.join(args.models_dir, NATIVE_MODEL_FILE)
+        joblib.dump(native, path)
+        print(f" Saved {path} ({len(native.char_vectorizer.vocabulary_)} char n-grams, languages "
+              f"{', '.join(native.languages)}) in {time.perf_counter() - started:.1f}s")
+        print(f" Publish it with: python scripts/bundles.py --models_dir {args.models_dir} publish --source {args.models_dir}")
+        return
+
+    texts, labels, languages = _read_corpus(args.csv)
+    if args.limit:
+        texts, labels = texts[:args.limit], labels[:args.limit]
+        languages = languages[:args.limit] if languages is not None else None
+    bundle = load_bundle(args.models_dir)
+    if bundle.native_model is None:
+        print(f" No {NATIVE_MODEL_FILE} in {args.models_dir}; run: python scripts/native.py train")
+        sys.exit(1)
+    translate = google_translate if args.translator == "google" else _identity_translate
+    report = compare_paths(bundle, texts, labels, languages, translate)
+
+    print(f"\n Native vs translate-then-classify on {report['articles']} articles "
+          f"(verdict agreement {report['agreement']:.4f})")
+    for name, row in report['paths'].items():
+        print(f" {name:<10} accuracy {row['accuracy']:.4f}  mean {row['mean_ms']:.1f} ms  "
+              f"p50 {row['p50_ms']:.1f} ms  p95 {row['p95_ms']:.1f} ms  max {row['max_ms']:.1f} ms")
+    for language, row in report['languages'].items():
+        print(f"   {language:<4} {row['articles']:>6} articles  native {row['native_accuracy']:.4f}  "
+              f"translate {row['translate_accuracy']:.4f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
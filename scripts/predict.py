@@ -1,20 +1,39 @@
-import joblib
-from utils import preprocess_text
 import numpy as np
 import argparse
+import csv
+import json
+import os
+import shutil
 import sys
-from deep_translator import GoogleTranslator
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 import langdetect
 from textblob import TextBlob
-from scipy import sparse
 
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
 
-model = joblib.load("models/news_svm_calibrated.pkl")
-word_vectorizer = joblib.load("models/tfidf_word.pkl")
-char_vectorizer = joblib.load("models/tfidf_char.pkl")
-scaler = joblib.load("models/num_scaler.pkl")
-feature_names = joblib.load("models/feature_names.pkl")
-metadata = joblib.load("models/model_metadata.pkl")
+from scripts.utils import preprocess_text
+from scripts.inference import load_bundle, predict_batch
+from scripts.translation import google_translate
+from scripts.quantize import PRECISIONS, compact_bundle
+from scripts.assemble import hstack_csr
+from scripts.shared_model import attach_bundle, export_bundle
+
+MODELS_DIR = "models"
+_models = {}
+_models_dir = MODELS_DIR
+
+def load_models(models_dir=None):
+    """Load the model bundle from models_dir once per process; nothing is loaded at import"""
+    models_dir = models_dir or _models_dir
+    if models_dir not in _models:
+        _models[models_dir] = load_bundle(models_dir)
+    return _models[models_dir]
 
 def _extract_numeric_features(raw_text: str, is_non_english: bool) -> dict:
     text = str(raw_text)
@@ -44,6 +63,7 @@ def _extract_numeric_features(raw_text: str, is_non_english: bool) -> dict:
     }
 
 def predict_news(text):
+    bundle = load_models()
     detected_lang = 'en'
     translated_text = text
     is_non_english = False
@@ -51,8 +71,7 @@ def predict_news(text):
         detected_lang = langdetect.detect(text)
         if detected_lang not in ['en', 'english']:
             is_non_english = True
-            translator = GoogleTranslator(source=detected_lang, target='en')
-            translated_text = translator.translate(text)
+            translated_text = google_translate(text, detected_lang)
     except Exception:
         detected_lang = 'unknown'
         translated_text = text
@@ -63,29 +82,209 @@ def predict_news(text):
 
  
     num_features = _extract_numeric_features(translated_text, is_non_english)
-    num_array = np.array([[num_features[col] for col in metadata.num_feature_columns]])
+    num_array = np.array([[num_features[col] for col in bundle.metadata.num_feature_columns]])
 
    
-    word_features = word_vectorizer.transform([processed_text])
-    char_features = char_vectorizer.transform([processed_text])
+    word_features = bundle.word_vectorizer.transform([processed_text])
+    char_features = bundle.char_vectorizer.transform([processed_text])
 
    
-    num_scaled = scaler.transform(num_array)
+    num_scaled = bundle.scaler.transform(num_array)
 
     
-    X_combined = sparse.hstack([word_features, char_features, num_scaled]).tocsr()
+    X_combined = hstack_csr([word_features, char_features, num_scaled])
 
-    prediction = model.predict(X_combined)[0]
-    probabilities = model.predict_proba(X_combined)[0]
+    prediction = bundle.model.predict(X_combined)[0]
+    probabilities = bundle.model.predict_proba(X_combined)[0]
     confidence = probabilities[1] if prediction == 1 else probabilities[0]
 
     result = " Real News" if prediction == 1 else " Fake News"
     return result, detected_lang, round(float(confidence) * 100, 2)
 
-def main():
+OUTPUT_FIELDS = ['index', 'label', 'is_fake', 'confidence', 'detected_language']
+
+_bundles = {}
+_shared_bundle = None
+
+def _init_worker(models_dir, shared_dir=None):
+    """Pool initializer: load from the parent's models_dir, or attach to the memory-mapped store"""
+    global _models_dir, _shared_bundle
+    _models_dir = models_dir
+    if shared_dir:
+        _shared_bundle = attach_bundle(shared_dir)
+
+def _loaded_bundle(precision='float64'):
+    if _shared_bundle is not None:
+        return _shared_bundle
+    key = (_models_dir, precision)
+    if key not in _bundles:
+        _bundles[key] = compact_bundle(load_models(), precision)
+    return _bundles[key]
+
+def _score_chunk(chunk):
+    """Score one (start_index, texts, precision, cascade_threshold) chunk; runs in pool workers as well"""
+    start, texts, precision, cascade_threshold = chunk
+    records = predict_batch(_loaded_bundle(precision), texts, cascade_threshold=cascade_threshold)
+    for offset, record in enumerate(records):
+        record['index'] = start + offset
+        record['confidence'] = round(record['confidence'], 6)
+    return records
+
+def _iter_chunks(stream, chunk_size, offset, precision='float64', cascade_threshold=None):
+    """Yield (start_index, texts, precision, cascade_threshold) from non-empty lines, skipping the first offset articles"""
+    articles = (line.strip() for line in stream)
+    articles = islice((text for text in articles if text), offset, None)
+    start = offset
+    while True:
+        texts = list(islice(articles, chunk_size))
+        if not texts:
+            return
+        yield start, texts, precision, cascade_threshold
+        start += len(texts)
+
+def _parse_index(line, fmt):
+    try:
+        if fmt == "jsonl":
+            return int(json.loads(line)['index'])
+        return int(next(csv.reader([line]))[0])
+    except (ValueError, KeyError, IndexError, StopIteration):
+        return None
+
+def _resume_offset(path, fmt):
+    """Return the index after the last intact record in path, truncating anything torn after it"""
+    if not os.path.exists(path):
+        return 0
+    with open(path, "r+", encoding="utf-8", newline="") as f:
+        lines = f.read().splitlines(keepends=True)
+        header = lines[:1] if fmt == "csv" else []
+        kept, last = [], None
+        for line in lines[len(header):]:
+            index = _parse_index(line, fmt) if line.endswith("\n") else None
+            if index is None:
+                break
+            kept.append(line)
+            last = index
+        f.seek(0)
+        f.truncate()
+        f.write("".join(header + kept))
+    return 0 if last is None else last + 1
+
+class _RecordWriter:
+    def __init__(self, stream, fmt, write_header):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == "csv":
+            self.writer = csv.DictWriter(stream, fieldnames=OUTPUT_FIELDS)
+            if write_header:
+                self.writer.writeheader()
+
+    def write(self, records):
+        for record in records:
+            if self.fmt == "csv":
+                self.writer.writerow(record)
+            else:
+                self.stream.write(json.dumps({k: record[k] for k in OUTPUT_FIELDS}, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+def _scored_chunks(chunks, workers, shared_dir=None):
+    """Score chunks in order, keeping at most 2 * workers chunks in flight"""
+    if workers <= 1:
+        for chunk in chunks:
+            yield _score_chunk(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(_models_dir, shared_dir)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_score_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def run_batch(args):
+    """Stream articles from a file or stdin and write one record per article"""
+    global _models_dir
+    _models_dir = args.models_dir
+    offset = args.offset
+    output_exists = args.output is not None and os.path.exists(args.output) and os.path.getsize(args.output) > 0
+    if args.resume:
+        if args.output is None:
+            print(" --resume requires --output", file=sys.stderr)
+            sys.exit(1)
+        offset = max(offset, _resume_offset(args.output, args.format))
+        mode = "a"
+    else:
+        mode = "w"
+        output_exists = False
+
+    try:
+        source = sys.stdin if args.input_file == "-" else open(args.input_file, "r", encoding="utf-8")
+    except Exception as e:
+        print(f" Failed to read input file: {e}", file=sys.stderr)
+        sys.exit(1)
+    sink = sys.stdout if args.output is None else open(args.output, mode, encoding="utf-8", newline="")
+    writer = _RecordWriter(sink, args.format, write_header=not output_exists)
+
+    if offset:
+        print(f" Resuming from article {offset}", file=sys.stderr)
+    shared_dir = None
+    if args.shared_model and args.workers > 1:
+        shared_dir = tempfile.mkdtemp(prefix="satyascan-shared-")
+        export_bundle(load_models(), shared_dir, args.precision)
+        print(f" Workers share the memory-mapped model in {shared_dir}", file=sys.stderr)
+    processed = 0
+    started = time.perf_counter()
+    try:
+        chunks = _iter_chunks(source, args.chunk_size, offset, args.precision, args.cascade_threshold)
+        for records in _scored_chunks(chunks, args.workers, shared_dir):
+            writer.write(records)
+            processed += len(records)
+            elapsed = time.perf_counter() - started
+            print(f" {processed} articles ({processed / elapsed:.1f} articles/sec), next offset {offset + processed}",
+                  file=sys.stderr)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted. Resume with --offset {offset + processed}", file=sys.stderr)
+        sys.exit(130)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+        if shared_dir is not None:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - started
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    print(f" Classified {processed} articles in {elapsed:.2f}s ({rate:.1f} articles/sec)", file=sys.stderr)
+
+def build_parser():
     parser = argparse.ArgumentParser(description="Fake news classifier (CLI)")
-    parser.add_argument("--input_file", type=str, default=None, help="Path to a text file with one article per line")
+    parser.add_argument("--input_file", type=str, default=None, help="Path to a text file with one article per line ('-' reads stdin in batch mode)")
+    parser.add_argument("--batch", action="store_true", help="Stream the input in chunks and write machine-readable records")
+    parser.add_argument("--output", type=str, default=None, help="Batch output file (default: stdout)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="Batch output format")
+    parser.add_argument("--chunk_size", type=int, default=256, help="Articles vectorized and scored together")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for batch scoring")
+    parser.add_argument("--offset", type=int, default=0, help="Skip this many articles before scoring")
+    parser.add_argument("--resume", action="store_true", help="Continue after the last record already in --output")
+    parser.add_argument("--precision", choices=PRECISIONS, default="float64", help="Feature and weight precision for batch scoring")
+    parser.add_argument("--cascade_threshold", type=float, default=None, help="Skip the full model when the word-only model is at least this confident")
+    parser.add_argument("--shared_model", action="store_true", help="Workers attach to one memory-mapped copy of the model instead of loading their own")
+    parser.add_argument("--models_dir", default=MODELS_DIR, help="Directory with the trained model artifacts")
+    return parser
+
+def main():
+    parser = build_parser()
     args = parser.parse_args()
+    global _models_dir
+    _models_dir = args.models_dir
+
+    if args.batch:
+        if not args.input_file:
+            parser.error("--batch requires --input_file (use '-' for stdin)")
+        run_batch(args)
+        return
 
     if args.input_file:
         try:
@@ -0,0 +1,181 @@
+"""
+Sampled cProfile profiling of /api/analyze requests.
+
+Off unless SATYASCAN_PROFILE_RATE is set; then that fraction of requests
+runs under cProfile and leaves two files in SATYASCAN_PROFILE_DIR:
+
+    <time>-<pid>-<n>.prof    pstats dump
+    <time>-<pid>-<n>.json    request metadata (text length, language, mode,
+                             model version, status, wall time)
+
+Only the newest SATYASCAN_PROFILE_KEEP profiles (default 200) are kept.
+With profiling off, the request path does a single `is None` check.
+
+    SATYASCAN_PROFILE_RATE   fraction of requests to profile, e.g. 0.01 (default 0 = off)
+    SATYASCAN_PROFILE_DIR    where profiles are written (default profiles/)
+    SATYASCAN_PROFILE_KEEP   profiles kept before the oldest are deleted (default 200)
+
+List and aggregate them with GET /api/admin/profiles or:
+    python scripts/profiling.py list
+    python scripts/profiling.py aggregate --top 30 --sort tottime
+"""
+
+import argparse
+import cProfile
+import glob
+import itertools
+import json
+import os
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+
+class RequestProfiler:
+    """Profiles a random sample of requests into a rotating directory"""
+
+    def __init__(self, rate, directory="profiles", keep=200):
+        self.rate = rate
+        self.directory = directory
+        self.keep = keep
+        self.profiled = 0
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        rate = float(environ.get('SATYASCAN_PROFILE_RATE', 0) or 0)
+        if rate <= 0:
+            return None
+        return cls(min(rate, 1.0), environ.get('SATYASCAN_PROFILE_DIR', 'profiles'),
+                   int(environ.get('SATYASCAN_PROFILE_KEEP', 200)))
+
+    def sample(self):
+        return random.random() < self.rate
+
+    @contextmanager
+    def profile(self, metadata):
+        """Profile the block and write it out with metadata, which the block may extend"""
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            metadata['wall_ms'] = 1000 * (time.perf_counter() - started)
+            try:
+                self._write(profiler, metadata)
+            except OSError as e:
+                print(f"Could not write profile: {e}")
+
+    def _write(self, profiler, metadata):
+        os.makedirs(self.directory, exist_ok=True)
+        now = datetime.now(timezone.utc)
+        name = f"{now.strftime('%Y%m%d-%H%M%S-%f')}-{os.getpid()}-{next(self._counter)}"
+        path = os.path.join(self.directory, name)
+        profiler.dump_stats(path + ".prof")
+        with open(path + ".json", "w") as f:
+            json.dump(dict(metadata, profile=name, created_at=now.isoformat(), pid=os.getpid()), f)
+        with self._lock:
+            self.profiled += 1
+            self._rotate()
+
+    def _rotate(self):
+        dumps = sorted(glob.glob(os.path.join(self.directory, "*.prof")))
+        for path in dumps[:max(len(dumps) - self.keep, 0)]:
+            for stale in (path, path[:-len(".prof")] + ".json"):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+
+    def status(self):
+        return {'rate': self.rate, 'directory': self.directory, 'keep': self.keep, 'profiled': self.profiled}
+
+
+def list_profiles(directory="profiles"):
+    """Metadata of every stored profile, oldest first"""
+    profiles = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        if os.path.exists(path[:-len(".json")] + ".prof"):
+            try:
+                with open(path) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return profiles
+
+
+def aggregate(directory="profiles", top=25, sort='cumulative', names=None):
+    """Merge stored profiles and return the top functions with per-request averages"""
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {sort}")
+    names = names or [profile['profile'] for profile in list_profiles(directory)]
+    paths = [os.path.join(directory, name + ".prof") for name in names]
+    paths = [path for path in paths if os.path.exists(path)]
+    if not paths:
+        return {'profiles': 0, 'functions': []}
+
+    stats = pstats.Stats(*paths)
+    column = {'cumulative': 3, 'tottime': 2, 'ncalls': 1}[sort]
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][column], reverse=True)[:top]
+    functions = []
+    for (filename, line, function), (_, ncalls, tottime, cumtime, _) in rows:
+        functions.append({
+            'function': f"{os.path.basename(filename)}:{line}({function})",
+            'ncalls': ncalls,
+            'tottime_ms': 1000 * tottime / len(paths),
+            'cumtime_ms': 1000 * cumtime / len(paths),
+        })
+    return {'profiles': len(paths), 'sort': sort, 'functions': functions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List and aggregate sampled request profiles")
+    parser.add_argument("--dir", default=os.environ.get('SATYASCAN_PROFILE_DIR', 'profiles'))
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="Show stored profiles and their request metadata")
+    summary = commands.add_parser("aggregate", help="Merge profiles and print the most expensive functions")
+    summary.add_argument("--top", type=int, default=25)
+    summary.add_argument("--sort", choices=SORT_KEYS, default="cumulative")
+    summary.add_argument("--language", default=None, help="Only requests with this detected/requested language")
+    summary.add_argument("--min_length", type=int, default=0, help="Only requests with at least this many characters")
+    args = parser.parse_args()
+
+    profiles = list_profiles(args.dir)
+    if args.command == "list":
+        for profile in profiles:
+            print(f" {profile['profile']}  {profile.get('wall_ms', 0):>8.1f} ms  status {profile.get('status')}  "
+                  f"{profile.get('text_length')} chars  language {profile.get('language')}  "
+                  f"mode {profile.get('mode')}  version {profile.get('model_version')}")
+        print(f" {len(profiles)} profiles in {args.dir}")
+        return
+
+    selected = [
+        profile['profile'] for profile in profiles
+        if (args.language is None or args.language in (profile.get('language'), profile.get('detected_language')))
+        and (profile.get('text_length') or 0) >= args.min_length
+    ]
+    if not selected:
+        print(f" No matching profiles in {args.dir}")
+        return
+    report = aggregate(args.dir, args.top, args.sort, selected)
+    print(f"\n {report['profiles']} profiles, per-request averages sorted by {args.sort}")
+    print(f" {'cum ms':>9} {'own ms':>9} {'calls':>9}  function")
+    for row in report['functions']:
+        print(f" {row['cumtime_ms']:>9.2f} {row['tottime_ms']:>9.2f} {row['ncalls']:>9}  {row['function']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Reduced-precision inference for the calibrated linear SVM.
+
+The vectorizers emit float32 CSR matrices and the coefficients of every
+calibrated fold are stored either as float32 or as int8 with one float32
+scale per block of features. Scoring runs directly on those compact arrays.
+
+Usage:
+    python scripts/quantize.py --precision float32 int8
+    python scripts/quantize.py --csv heldout.csv --json report.json
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from scripts.inference import load_bundle, prepare_article, build_features, score_features
+from scripts.char_ngrams import FastCharVectorizer
+
+PRECISIONS = ('float64', 'float32', 'int8')
+DEFAULT_BLOCK_SIZE = 4096
+
+
+def tfidf_weight(X, idf=None, norm='l2', sublinear_tf=False):
+    """TfidfTransformer.transform on a raw count matrix, in place where possible"""
+    if sublinear_tf:
+        np.log(X.data, X.data)
+        X.data += 1
+    if idf is not None:
+        X.data *= idf[X.indices]
+    if norm is not None:
+        X = normalize(X, norm=norm, copy=False)
+    return X
+
+
+class Float32TfidfVectorizer:
+    """Inference-only view of a fitted TfidfVectorizer that emits float32 rows"""
+
+    dtype = np.float32
+
+    def __init__(self, vectorizer):
+        if isinstance(vectorizer, FastCharVectorizer):
+            fast = vectorizer
+            self.counts = lambda raw_documents: fast.counts(raw_documents, np.float32)
+            vectorizer = fast.vectorizer
+        else:
+            counter = copy.copy(vectorizer)
+            counter.dtype = np.float32
+            self.counts = lambda raw_documents: CountVectorizer.transform(counter, raw_documents)
+        tfidf = vectorizer._tfidf
+        self.idf = vectorizer.idf_.astype(np.float32) if tfidf.use_idf else None
+        self.norm = tfidf.norm
+        self.sublinear_tf = tfidf.sublinear_tf
+        self.vocabulary_ = vectorizer.vocabulary_
+
+    def transform(self, raw_documents):
+        return tfidf_weight(self.counts(raw_documents), self.idf, self.norm, self.sublinear_tf)
+
+
+class CompactLinearModel:
+    """Drop-in replacement for a binary sigmoid CalibratedClassifierCV over LinearSVC.
+
+    Every fold keeps its coefficients, intercept and sigmoid (a, b); fold
+    probabilities are averaged exactly like CalibratedClassifierCV does.
+    """
+
+    def __init__(self, model, precision='float32', block_size=DEFAULT_BLOCK_SIZE):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision}")
+        if len(model.classes_) != 2 or model.method != 'sigmoid':
+            raise ValueError("Only binary sigmoid-calibrated models can be compacted")
+
+        folds = model.calibrated_classifiers_
+        coef = np.vstack([fold.estimator.coef_.ravel() for fold in folds])
+        self.classes_ = model.classes_
+        self.precision = precision
+        self.block_size = block_size
+        self.n_features = coef.shape[1]
+        self.intercepts = np.array([fold.estimator.intercept_[0] for fold in folds])
+        self.a = np.array([fold.calibrators[0].a_ for fold in folds])
+        self.b = np.array([fold.calibrators[0].b_ for fold in folds])
+
+        if precision == 'int8':
+            n_blocks = -(-self.n_features // block_size)
+            padded = np.zeros((coef.shape[0], n_blocks * block_size))
+            padded[:, :self.n_features] = coef
+            blocks = padded.reshape(coef.shape[0], n_blocks, block_size)
+            scales = np.abs(blocks).max(axis=2) / 127.0
+            scales[scales == 0] = 1.0
+            quantized = np.round(blocks / scales[:, :, None]).clip(-127, 127)
+            self.coef = quantized.reshape(coef.shape[0], -1)[:, :self.n_features].astype(np.int8)
+            self.scales = scales.astype(np.float32)
+        else:
+            self.coef = coef.astype(precision)
+            self.scales = None
+
+    @property
+    def nbytes(self):
+        scales = 0 if self.scales is None else self.scales.nbytes
+        return self.coef.nbytes + scales + self.intercepts.nbytes + self.a.nbytes + self.b.nbytes
+
+    def fold_coef(self, fold=0):
+        """Return the float coefficients of one calibrated fold, dequantizing int8 blocks"""
+        coef = self.coef[fold].astype(np.float32)
+        if self.scales is not None:
+            coef *= np.repeat(self.scales[fold], self.block_size)[:self.n_features]
+        return coef
+
+    def decision_function(self, X):
+        """Return the (n_folds, n_samples) decision values"""
+        X = X.tocsr()
+        if self.scales is None:
+            return np.vstack([X @ coef for coef in self.coef]) + self.intercepts[:, None]
+
+        rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+        blocks = X.indices // self.block_size
+        decisions = np.empty((len(self.coef), X.shape[0]))
+        for fold, (coef, scales) in enumerate(zip(self.coef, self.scales)):
+            weights = coef[X.indices].astype(np.float32) * scales[blocks]
+            decisions[fold] = np.bincount(rows, weights=X.data * weights, minlength=X.shape[0])
+        return decisions + self.intercepts[:, None]
+
+    def predict_proba(self, X):
+        decisions = self.decision_function(X)
+        positive = expit(-(self.a[:, None] * decisions + self.b[:, None])).mean(axis=0)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def compact_bundle(bundle, precision='float32', block_size=DEFAULT_BLOCK_SIZE):
+    """Return a copy of bundle whose vectorizers and model run in reduced precision"""
+    if precision == 'float64':
+        return bundle
+    compact = copy.copy(bundle)
+    compact.word_vectorizer = Float32TfidfVectorizer(bundle.word_vectorizer)
+    compact.char_vectorizer = Float32TfidfVectorizer(bundle.char_vectorizer)
+    compact.model = CompactLinearModel(bundle.model, precision, block_size)
+    if bundle.get('word_model') is not None:
+        compact.word_model = CompactLinearModel(bundle.word_model, precision, block_size)
+    return compact
+
+
+def _model_nbytes(model):
+    if isinstance(model, CompactLinearModel):
+        return model.nbytes
+    return sum(
+        fold.estimator.coef_.nbytes + fold.estimator.intercept_.nbytes
+        for fold in model.calibrated_classifiers_
+    )
+
+
+def _matrix_nbytes(X):
+    return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+
+
+def parity_report(bundle, texts, labels, precisions=PRECISIONS, block_size=DEFAULT_BLOCK_SIZE, batch_size=256):
+    """Compare reduced-precision scoring against the float64 pipeline on labeled texts"""
+    articles = [prepare_article(text, language='en') for text in texts]
+    keep = [i for i, article in enumerate(articles) if article.cleaned_text]
+    articles = [articles[i] for i in keep]
+    labels = np.asarray(labels)[keep]
+
+    report = {'articles': len(articles), 'block_size': block_size, 'modes': {}}
+    reference = None
+    for precision in precisions:
+        mode_bundle = compact_bundle(bundle, precision, block_size)
+        feature_seconds = score_seconds = 0.0
+        feature_bytes = 0
+        predictions, probabilities = [], []
+        for start in range(0, len(articles), batch_size):
+            chunk = articles[start:start + batch_size]
+            t0 = time.perf_counter()
+            X = build_features(mode_bundle, chunk)
+            t1 = time.perf_counter()
+            chunk_predictions, chunk_probabilities = score_features(mode_bundle, X)
+            t2 = time.perf_counter()
+            feature_seconds += t1 - t0
+            score_seconds += t2 - t1
+            feature_bytes += _matrix_nbytes(X)
+            predictions.append(chunk_predictions)
+            probabilities.append(chunk_probabilities[:, 1])
+        predictions = np.concatenate(predictions)
+        probabilities = np.concatenate(probabilities)
+        if reference is None:
+            reference = (predictions, probabilities)
+
+        report['modes'][precision] = {
+            'accuracy': float(np.mean(predictions == labels)),
+            'agreement_with_float64': float(np.mean(predictions == reference[0])),
+            'max_abs_proba_diff': float(np.max(np.abs(probabilities - reference[1]))),
+            'weight_bytes': int(_model_nbytes(mode_bundle.model)),
+            'feature_bytes': int(feature_bytes),
+            'feature_ms_per_article': 1000 * feature_seconds / len(articles),
+            'score_ms_per_article': 1000 * score_seconds / len(articles),
+        }
+    return report
+
+
+def load_heldout(sample_size=10000):
+    """Rebuild the held-out split used by model_training.py from data/True.csv and data/Fake.csv"""
+    from sklearn.model_selection import train_test_split
+    from scripts.model_training import load_data
+
+    true_df, fake_df = load_data(sample_size=sample_size)
+    if true_df is None or fake_df is None:
+        return None, None
+    true_df['label'] = 1
+    fake_df['label'] = 0
+    df = pd.concat([true_df, fake_df]).sample(frac=1, random_state=42).reset_index(drop=True)
+    _, test_df = train_test_split(df, test_size=0.2, random_state=42, stratify=df['label'])
+    return test_df['text'].astype(str).tolist(), test_df['label'].tolist()
+
+
+def print_report(report):
+    print(f"\n Reduced-precision parity on {report['articles']} held-out articles")
+    print(f" {'mode':<8} {'accuracy':>9} {'agree':>8} {'max|dp|':>9} {'weights MB':>11} "
+          f"{'features MB':>12} {'feat ms':>8} {'score ms':>9}")
+    for precision, row in report['modes'].items():
+        print(f" {precision:<8} {row['accuracy']:>9.4f} {row['agreement_with_float64']:>8.4f} "
+              f"{row['max_abs_proba_diff']:>9.2e} {row['weight_bytes'] / 1e6:>11.2f} "
+              f"{row['feature_bytes'] / 1e6:>12.2f} {row['feature_ms_per_article']:>8.3f} "
+              f"{row['score_ms_per_article']:>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy parity and cost of reduced-precision inference")
+    parser.add_argument("--models_dir", default="models")
+    parser.add_argument("--csv", default=None, help="Labeled CSV with 'text' and 'label' (1 = real, 0 = fake) columns; defaults to the training held-out split")
+    parser.add_argument("--sample_size", type=int, default=10000, help="Rows per class when rebuilding the held-out split")
+    parser.add_argument("--precision", nargs="+", choices=PRECISIONS, default=list(PRECISIONS))
+    parser.add_argument("--block_size", type=int, default=DEFAULT_BLOCK_SIZE)
+    parser.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    if args.csv:
+        df = pd.read_csv(args.csv)
+        texts, labels = df['text'].astype(str).tolist(), df['label'].tolist()
+    else:
+        texts, labels = load_heldout(args.sample_size)
+        if texts is None:
+            print(" No held-out data available; pass --csv")
+            sys.exit(1)
+
+    precisions = ['float64'] + [p for p in args.precision if p != 'float64']
+    report = parity_report(load_bundle(args.models_dir), texts, labels, precisions, args.block_size)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
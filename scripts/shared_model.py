@@ -0,0 +1,337 @@
+"""
+Memory-mapped model store for multi-process batch scoring.
+
+With `predict.py --batch --workers N`, every worker process unpickles its
+own vectorizers and calibrated model. Most of that memory is the Python
+dicts of the word and char vocabularies, which cannot be shared. The
+rest is the idf and coefficient arrays. export_bundle writes a bundle
+once into a directory of .npy arrays:
+
+    word.terms / word.columns     sorted vocabulary terms and their feature columns
+    char.alphabet / .keys / .columns
+                                  the FastCharVectorizer lookup tables
+                                  (char.terms / char.columns when it cannot be used)
+    word.idf, char.idf            idf weights
+    model.*, word_model.*         coefficients, intercepts and sigmoid (a, b) of every calibrated fold
+    small.joblib                  analyzer parameters, scaler and metadata (a few KB)
+
+attach_bundle memory-maps those arrays read-only. The scoring objects
+need no per-process copy: the terms are looked up with searchsorted, and
+the models are CompactLinearModel over the mapped coefficients. All
+workers therefore share one copy in the page cache. Rows and scores
+match the pickled bundle to float rounding. feature_names is not
+exported, so top_features is empty.
+
+Batch scoring uses it with --shared_model:
+    python scripts/predict.py --batch --input_file articles.txt --workers 8 --shared_model
+
+Usage:
+    python scripts/shared_model.py export --models_dir models --out /dev/shm/satyascan
+    python scripts/shared_model.py report --models_dir models --workers 1 2 4 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.utils import Bunch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from scripts.char_ngrams import FastCharVectorizer
+from scripts.quantize import PRECISIONS, CompactLinearModel, tfidf_weight
+
+STORE_FORMAT = 1
+_LINEAR_ARRAYS = ('coef', 'scales', 'intercepts', 'a', 'b', 'classes_')
+
+
+def _save(directory, name, array):
+    path = os.path.join(directory, f"{name}.npy")
+    np.save(f"{path}.tmp.npy", np.ascontiguousarray(array))
+    os.replace(f"{path}.tmp.npy", path)
+
+
+def _load(directory, name):
+    return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+
+
+def _terms(vocabulary):
+    terms = np.array(sorted(vocabulary))
+    columns = np.array([vocabulary[term] for term in terms.tolist()], dtype=np.int32)
+    return terms, columns
+
+
+class SharedTfidfVectorizer:
+    """transform() of a fitted TfidfVectorizer whose vocabulary is a sorted term array"""
+
+    def __init__(self, params, terms, columns, idf, n_features, dtype=np.float64):
+        self._analyzer = TfidfVectorizer(**params).build_analyzer()
+        self.norm = params['norm']
+        self.sublinear_tf = params['sublinear_tf']
+        self.terms = terms
+        self.columns = columns
+        self.idf = idf
+        self.n_features = n_features
+        self.dtype = dtype
+
+    def _document_columns(self, document):
+        tokens = self._analyzer(document)
+        if not tokens:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        tokens = np.array(tokens)
+        slots = np.searchsorted(self.terms, tokens)
+        slots[slots == len(self.terms)] = 0
+        hits = self.terms[slots] == tokens
+        return np.unique(self.columns[slots[hits]], return_counts=True)
+
+    def counts(self, raw_documents, dtype=None):
+        if isinstance(raw_documents, str):
+            raise ValueError("Iterable over raw text documents expected, string object received.")
+        indptr, indices, values = [0], [], []
+        for document in raw_documents:
+            columns, counts = self._document_columns(document)
+            indices.append(columns)
+            values.append(counts)
+            indptr.append(indptr[-1] + len(columns))
+        indices = np.concatenate(indices).astype(np.int32) if indices else np.empty(0, dtype=np.int32)
+        values = np.concatenate(values) if values else np.empty(0)
+        return sparse.csr_matrix((values.astype(dtype or self.dtype), indices, np.array(indptr, dtype=np.int32)),
+                                 shape=(len(indptr) - 1, self.n_features))
+
+    def transform(self, raw_documents):
+        return tfidf_weight(self.counts(raw_documents), self.idf, self.norm, self.sublinear_tf)
+
+
+class SharedCharVectorizer(FastCharVectorizer):
+    """FastCharVectorizer over memory-mapped lookup tables instead of a fitted vectorizer"""
+
+    def __init__(self, params, alphabet, keys, columns, idf, n_features, dtype=np.float64):
+        self.preprocess = TfidfVectorizer(**params).build_preprocessor()
+        self.min_n, self.max_n = params['ngram_range']
+        self.norm = params['norm']
+        self.sublinear_tf = params['sublinear_tf']
+        self.alphabet = alphabet
+        self.base = len(alphabet) + 1
+        self.keys = keys
+        self.columns = columns
+        self.idf = idf
+        self.n_features = n_features
+        self.dtype = dtype
+
+    def transform(self, raw_documents):
+        return tfidf_weight(self.counts(raw_documents), self.idf, self.norm, self.sublinear_tf)
+
+
+def _export_vectorizer(directory, name, vectorizer, dtype):
+    """Write the lookup tables of a fitted (possibly FastChar-wrapped) TfidfVectorizer; returns its manifest entry"""
+    fast = vectorizer if isinstance(vectorizer, FastCharVectorizer) else None
+    vectorizer = fast.vectorizer if fast is not None else vectorizer
+    if fast is None and FastCharVectorizer.supports(vectorizer):
+        fast = FastCharVectorizer(vectorizer)
+    tfidf = vectorizer._tfidf
+    if tfidf.use_idf:
+        _save(directory, f"{name}.idf", vectorizer.idf_.astype(dtype))
+    if fast is not None:
+        kind = 'fast_char'
+        _save(directory, f"{name}.alphabet", fast.alphabet)
+        _save(directory, f"{name}.keys", fast.keys)
+        _save(directory, f"{name}.columns", fast.columns.astype(np.int32))
+    else:
+        kind = 'terms'
+        terms, columns = _terms(vectorizer.vocabulary_)
+        _save(directory, f"{name}.terms", terms)
+        _save(directory, f"{name}.columns", columns)
+    params = vectorizer.get_params()
+    params.update(norm=tfidf.norm, sublinear_tf=tfidf.sublinear_tf)
+    return {'kind': kind, 'n_features': len(vectorizer.vocabulary_), 'use_idf': bool(tfidf.use_idf)}, params
+
+
+def _attach_vectorizer(directory, name, entry, params, dtype):
+    idf = _load(directory, f"{name}.idf") if entry['use_idf'] else None
+    if entry['kind'] == 'fast_char':
+        return SharedCharVectorizer(params, _load(directory, f"{name}.alphabet"), _load(directory, f"{name}.keys"),
+                                    _load(directory, f"{name}.columns"), idf, entry['n_features'], dtype)
+    return SharedTfidfVectorizer(params, _load(directory, f"{name}.terms"), _load(directory, f"{name}.columns"),
+                                 idf, entry['n_features'], dtype)
+
+
+def _export_linear(directory, name, model, precision):
+    compact = model if isinstance(model, CompactLinearModel) else CompactLinearModel(model, precision)
+    for array in _LINEAR_ARRAYS:
+        value = getattr(compact, array)
+        if value is not None:
+            _save(directory, f"{name}.{array}", value)
+    return {'n_features': compact.n_features, 'block_size': compact.block_size, 'precision': compact.precision,
+            'quantized': compact.scales is not None}
+
+
+def _attach_linear(directory, name, entry):
+    model = CompactLinearModel.__new__(CompactLinearModel)
+    for array in _LINEAR_ARRAYS:
+        setattr(model, array, None if array == 'scales' and not entry['quantized'] else _load(directory, f"{name}.{array}"))
+    model.n_features = entry['n_features']
+    model.block_size = entry['block_size']
+    model.precision = entry['precision']
+    return model
+
+
+def export_bundle(bundle, directory, precision='float64'):
+    """Write bundle's arrays under directory for attach_bundle; returns the manifest"""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision}")
+    os.makedirs(directory, exist_ok=True)
+    dtype = np.float64 if precision == 'float64' else np.float32
+    word, word_params = _export_vectorizer(directory, 'word', bundle.word_vectorizer, dtype)
+    char, char_params = _export_vectorizer(directory, 'char', bundle.char_vectorizer, dtype)
+    manifest = {
+        'format': STORE_FORMAT,
+        'precision': precision,
+        'version': bundle.get('version'),
+        'word': word,
+        'char': char,
+        'model': _export_linear(directory, 'model', bundle.model, precision),
+        'word_model': (_export_linear(directory, 'word_model', bundle.word_model, precision)
+                       if bundle.get('word_model') is not None else None),
+    }
+    joblib.dump({'word_params': word_params, 'char_params': char_params,
+                 'scaler': bundle.scaler, 'metadata': bundle.metadata},
+                os.path.join(directory, "small.joblib"))
+    with open(os.path.join(directory, "manifest.json.tmp"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(os.path.join(directory, "manifest.json.tmp"), os.path.join(directory, "manifest.json"))
+    return manifest
+
+
+def attach_bundle(directory):
+    """A scoring bundle over the read-only memory-mapped arrays of an exported store"""
+    with open(os.path.join(directory, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest['format'] != STORE_FORMAT:
+        raise ValueError(f"Unsupported shared model format {manifest['format']} in {directory}")
+    small = joblib.load(os.path.join(directory, "small.joblib"))
+    dtype = np.float64 if manifest['precision'] == 'float64' else np.float32
+    return Bunch(
+        word_vectorizer=_attach_vectorizer(directory, 'word', manifest['word'], small['word_params'], dtype),
+        char_vectorizer=_attach_vectorizer(directory, 'char', manifest['char'], small['char_params'], dtype),
+        model=_attach_linear(directory, 'model', manifest['model']),
+        word_model=(_attach_linear(directory, 'word_model', manifest['word_model'])
+                    if manifest['word_model'] is not None else None),
+        scaler=small['scaler'],
+        metadata=small['metadata'],
+        feature_names=None,
+        version=manifest['version'],
+    )
+
+
+def memory_bytes():
+    """(RSS, PSS) of this process; PSS splits shared pages between the processes mapping them"""
+    from scripts.footprint import rss_bytes
+
+    pss = None
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    pss = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+    return rss_bytes(), pss
+
+
+def _measure_worker(mode, source, precision, texts, barrier, results):
+    from scripts.inference import load_bundle, predict_batch
+    from scripts.quantize import compact_bundle
+    from scripts.warmup import _stub_translate
+
+    if mode == 'shared':
+        bundle = attach_bundle(source)
+    else:
+        bundle = compact_bundle(load_bundle(source), precision)
+    predict_batch(bundle, texts, translate=_stub_translate)
+    # Measure while every worker holds its bundle
+    barrier.wait()
+    results.put(memory_bytes())
+    barrier.wait()
+
+
+def rss_report(models_dir, worker_counts=(1, 2, 4, 8), precision='float64', texts=None):
+    """Total RSS and PSS of N scoring processes, loading the bundle independently vs attaching the shared store"""
+    from scripts.inference import load_bundle
+    from scripts.warmup import SAMPLE_TEXTS
+
+    texts = texts or list(SAMPLE_TEXTS.values())
+    directory = tempfile.mkdtemp(prefix="satyascan-shared-")
+    context = multiprocessing.get_context("spawn")
+    report = []
+    try:
+        export_bundle(load_bundle(models_dir), directory, precision)
+        store_bytes = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        for workers in worker_counts:
+            row = {'workers': workers}
+            for mode, source in (('independent', models_dir), ('shared', directory)):
+                barrier = context.Barrier(workers)
+                results = context.Queue()
+                processes = [context.Process(target=_measure_worker,
+                                             args=(mode, source, precision, texts, barrier, results))
+                             for _ in range(workers)]
+                for process in processes:
+                    process.start()
+                measured = [results.get(timeout=600) for _ in processes]
+                for process in processes:
+                    process.join()
+                row[f'{mode}_rss'] = sum(rss for rss, _ in measured)
+                pss = [value for _, value in measured]
+                row[f'{mode}_pss'] = sum(pss) if None not in pss else None
+            report.append(row)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {'store_bytes': store_bytes, 'precision': precision, 'rows': report}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped model store shared by batch scoring workers")
+    parser.add_argument("--models_dir", default="models")
+    parser.add_argument("--precision", choices=PRECISIONS, default="float64")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Write the store for the current model version")
+    export.add_argument("--out", required=True)
+    report = commands.add_parser("report", help="Total RSS of N workers, independent loading vs the shared store")
+    report.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    report.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    from scripts.inference import load_bundle
+
+    if args.command == "export":
+        manifest = export_bundle(load_bundle(args.models_dir), args.out, args.precision)
+        size = sum(os.path.getsize(os.path.join(args.out, name)) for name in os.listdir(args.out))
+        print(f" Exported {args.models_dir} ({manifest['precision']}) to {args.out}: {size / 1e6:.1f} MB")
+        return
+
+    result = rss_report(args.models_dir, args.workers, args.precision)
+    print(f"\n Shared store: {result['store_bytes'] / 1e6:.1f} MB ({result['precision']})")
+    print(f" {'workers':>7} {'independent RSS MB':>19} {'shared RSS MB':>14} {'independent PSS MB':>19} {'shared PSS MB':>14}")
+    for row in result['rows']:
+        pss = (f"{row['independent_pss'] / 1e6:>19.1f} {row['shared_pss'] / 1e6:>14.1f}"
+               if row['shared_pss'] is not None else f"{'n/a':>19} {'n/a':>14}")
+        print(f" {row['workers']:>7} {row['independent_rss'] / 1e6:>19.1f} {row['shared_rss'] / 1e6:>14.1f} {pss}")
+    print(" RSS counts shared pages in every process; PSS divides them between the processes that map them.")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+import sys
+
+import pytest
+from sklearn.utils import Bunch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.admission import AdmissionController, Rejected, TokenBucket, needs_translation
+from scripts.conftest import toy_articles
+
+
+def test_pools_reject_when_full_and_count():
+    controller = AdmissionController(translate_slots=1, local_slots=2)
+    with controller.admit('translate', 'a'):
+        with pytest.raises(Rejected) as rejected:
+            with controller.admit('translate', 'b'):
+                pass
+        assert rejected.value.reason == 'translate_pool_full' and rejected.value.retry_after >= 1
+        # The local pool is separate, so English requests still get through
+        with controller.admit('local', 'b'):
+            assert controller.stats()['in_flight'] == 2
+
+    stats = controller.stats()
+    assert stats['in_flight'] == 0 and stats['rejected'] == 1
+    assert stats['pools']['translate']['admitted'] == 1 and stats['pools']['local']['admitted'] == 1
+
+
+def test_token_bucket_refills_per_client():
+    bucket = TokenBucket(rate=1.0, burst=2)
+    assert bucket.take('a', now=0.0) == 0 and bucket.take('a', now=0.0) == 0
+    assert bucket.take('a', now=0.0) == pytest.approx(1.0)
+    assert bucket.take('b', now=0.0) == 0
+    assert bucket.take('a', now=1.5) == 0
+    assert bucket.stats()['limited'] == 1
+
+    controller = AdmissionController.from_env({'SATYASCAN_RATE_LIMIT': '0.5', 'SATYASCAN_RATE_BURST': '1'})
+    with controller.admit('local', 'a'):
+        pass
+    with pytest.raises(Rejected) as rejected:
+        with controller.admit('local', 'a'):
+            pass
+    assert rejected.value.reason == 'rate_limited' and rejected.value.retry_after == 2
+
+
+def test_needs_translation():
+    assert not needs_translation("Officials confirmed the report on Monday.")
+    assert needs_translation("सरकार ने आज नई नीति की घोषणा की")
+    assert needs_translation("anything", language='hi')
+    assert not needs_translation("सरकार ने आज", mode='native')
+    assert needs_translation("सरकार ने आज", mode='native', enrich=True)
+
+
+def test_analyze_returns_429_when_translate_pool_is_full(toy_bundle, monkeypatch):
+    import app as webapp
+
+    controller = AdmissionController(translate_slots=1, local_slots=1)
+    monkeypatch.setattr(webapp.model_manager, "active", Bunch(**toy_bundle, version="toy", warmup={}))
+    monkeypatch.setattr(webapp, "duplicate_index", None)
+    monkeypatch.setattr(webapp, "request_profiler", None)
+    monkeypatch.setattr(webapp, "admission", controller)
+    client = webapp.app.test_client()
+
+    assert controller.pools['translate'].acquire()
+    response = client.post('/api/analyze', json={'text': "सरकार ने आज नई नीति की घोषणा की"})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+    assert response.get_json()['reason'] == 'translate_pool_full'
+
+    text = toy_articles(n=1)[0][0]
+    assert client.post('/api/analyze', json={'text': text}).status_code == 200
+
+    admission = client.get('/api/health').get_json()['admission']
+    assert admission['in_flight'] == 1 and admission['rejected'] == 1
@@ -0,0 +1,92 @@
+import os
+import sys
+
+import joblib
+import pytest
+from sklearn.utils import Bunch
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+pytest.importorskip("flask")
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as server
+from scripts.bundles import current_version, publish_bundle
+from scripts.inference import MODEL_FILES
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, toy_bundle):
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    for name, filename in MODEL_FILES.items():
+        joblib.dump(toy_bundle[name], models_dir / filename)
+    publish_bundle(str(models_dir), str(models_dir), version="v1")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('SATYASCAN_ADMIN_TOKEN', raising=False)
+    return server.app.test_client()
+
+
+def test_admin_endpoints_are_closed_without_a_token(client, monkeypatch):
+    assert client.post('/api/admin/reload', json={}).status_code == 403
+    assert client.post('/api/admin/rollback').status_code == 403
+
+    monkeypatch.setenv('SATYASCAN_ADMIN_TOKEN', 's3cret')
+    assert client.post('/api/admin/reload', json={}, headers={'X-Admin-Token': 'wrong'}).status_code == 403
+    assert client.post('/api/admin/reload', json={}).status_code == 403
+
+
+def test_reload_rejects_unpublished_versions(client, monkeypatch):
+    monkeypatch.setenv('SATYASCAN_ADMIN_TOKEN', 's3cret')
+    headers = {'X-Admin-Token': 's3cret'}
+    for version in ("../../x", "legacy", "v2"):
+        response = client.post('/api/admin/reload', json={'version': version}, headers=headers)
+        assert response.status_code == 400
+    assert current_version("models") == "v1"
+
+
+def test_feedback_requires_the_reviewer_token(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "feedback_store", server.FeedbackStore(str(tmp_path / "feedback")))
+    monkeypatch.delenv('SATYASCAN_FEEDBACK_TOKEN', raising=False)
+    body = {'text': "Officials confirmed the report.", 'label': 'real'}
+    assert client.post('/api/feedback', json=body).status_code == 403
+
+    monkeypatch.setenv('SATYASCAN_FEEDBACK_TOKEN', 'desk')
+    assert client.post('/api/feedback', json=body, headers={'X-Feedback-Token': 'nope'}).status_code == 403
+    assert client.post('/api/feedback', json=body, headers={'X-Feedback-Token': 'desk'}).status_code == 201
+    assert server.feedback_store.status()['records'] == 1
+
+
+def test_rate_limit_keys_on_the_proxy_resolved_address(client, monkeypatch, toy_bundle):
+    monkeypatch.setattr(server.model_manager, "active", Bunch(**toy_bundle, version="toy"))
+    monkeypatch.setattr(server, "duplicate_index", None)
+    monkeypatch.setattr(server.app, "wsgi_app", ProxyFix(server.app.wsgi_app, x_for=1))
+    monkeypatch.setattr(server, "admission", server.AdmissionController(rate=0.001, burst=1))
+    monkeypatch.delenv('SATYASCAN_CLIENT_TOKEN', raising=False)
+
+    def status(forwarded, **headers):
+        response = client.post('/api/analyze', json={'text': "Officials confirmed the report.", 'language': 'en'},
+                               headers={'X-Forwarded-For': forwarded, **headers})
+        return response.status_code
+
+    assert status("10.0.0.1") == 200
+    assert status("10.0.0.1") == 429
+    # Neither a spoofed hop before the proxy nor an unauthenticated client id changes the key
+    assert status("10.9.9.9, 10.0.0.1") == 429
+    assert status("10.0.0.1", **{'X-Client-Id': "fresh"}) == 429
+    assert status("10.0.0.2") == 200
+
+    monkeypatch.setenv('SATYASCAN_CLIENT_TOKEN', 'gateway')
+    assert status("10.0.0.1", **{'X-Client-Id': "fresh", 'X-Client-Token': 'gateway'}) == 200
+    assert status("10.0.0.1", **{'X-Client-Id': "fresh", 'X-Client-Token': 'gateway'}) == 429
+
+
+def test_untranslatable_article_gets_422(client, monkeypatch, toy_bundle):
+    monkeypatch.setattr(server.model_manager, "active", Bunch(**toy_bundle, version="toy"))
+    monkeypatch.setattr(server, "duplicate_index", None)
+    monkeypatch.setattr(server, "google_translate", lambda text, source: text)
+    monkeypatch.setattr(server, "request_budget", 0)
+    text = "Le ministre des finances a annoncé mardi une nouvelle politique économique pour le pays."
+    response = client.post('/api/analyze', json={'text': text, 'language': 'fr'})
+    assert response.status_code == 422
+    assert response.get_json()['model_stage'] == 'unsupported'
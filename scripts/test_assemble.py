@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+from scipy import sparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.assemble import hstack_csr
+from scripts.conftest import fake_translate, toy_articles
+from scripts.inference import _numeric_features, prepare_article
+
+
+def _assert_identical(expected, actual):
+    assert expected.shape == actual.shape and expected.dtype == actual.dtype
+    assert np.array_equal(expected.indptr, actual.indptr)
+    assert np.array_equal(expected.indices, actual.indices)
+    assert np.array_equal(expected.data, actual.data)
+
+
+def test_matches_hstack_on_random_blocks():
+    rng = np.random.RandomState(0)
+    for n_rows in (1, 7):
+        word = sparse.random(n_rows, 50, density=0.2, format='csr', random_state=rng)
+        char = sparse.random(n_rows, 80, density=0.1, format='csr', random_state=rng, dtype=np.float32)
+        # Empty rows, zeros in the dense block and unsorted column indices
+        word.data[word.indptr[0]:word.indptr[1]] = 0
+        word.eliminate_zeros()
+        char.indices = char.indices.copy()
+        for row in range(n_rows):
+            start, end = char.indptr[row], char.indptr[row + 1]
+            char.indices[start:end] = char.indices[start:end][::-1]
+            char.data[start:end] = char.data[start:end][::-1]
+        dense = rng.randn(n_rows, 11) * (rng.rand(n_rows, 11) > 0.3)
+        blocks = [word, char, dense]
+        _assert_identical(sparse.hstack(blocks).tocsr(), hstack_csr(blocks))
+
+
+def test_matches_hstack_on_bundle_features(toy_bundle):
+    texts, _ = toy_articles(n=12, seed=5)
+    articles = [prepare_article(text, 'en', fake_translate) for text in texts + [""]]
+    for batch in (articles[:1], articles):
+        blocks = [
+            toy_bundle.word_vectorizer.transform([article.cleaned_text for article in batch]),
+            toy_bundle.char_vectorizer.transform([article.char_text for article in batch]),
+            _numeric_features(toy_bundle, batch),
+        ]
+        _assert_identical(sparse.hstack(blocks).tocsr(), hstack_csr(blocks))
@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+
+import joblib
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.bulk import (JobError, _identity_translate, job_status, merge_job, plan_job, run_shard,
+                          shard_paths)
+from scripts.conftest import toy_articles
+from scripts.inference import MODEL_FILES, OPTIONAL_MODEL_FILES, load_bundle, predict_batch
+
+BULK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bulk.py")
+
+
+@pytest.fixture
+def archive(tmp_path, toy_bundle):
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    for name, filename in {**MODEL_FILES, **OPTIONAL_MODEL_FILES}.items():
+        if toy_bundle.get(name) is not None:
+            joblib.dump(toy_bundle[name], models_dir / filename)
+    texts, _ = toy_articles(n=45, seed=11)
+    texts[7] = "नई दिल्ली में आज एक नई मेट्रो लाइन का उद्घाटन किया गया।"
+    lines = []
+    for i, text in enumerate(texts):
+        lines.append(text)
+        if i % 10 == 3:
+            lines.append("   ")
+    path = tmp_path / "archive.txt"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    expected = predict_batch(load_bundle(str(models_dir)), texts, translate=_identity_translate)
+    return str(path), str(models_dir), expected
+
+
+def _assert_merged(output, expected):
+    with open(output, encoding="utf-8") as f:
+        merged = [json.loads(line) for line in f]
+    assert [record['index'] for record in merged] == list(range(len(expected)))
+    assert [record['is_fake'] for record in merged] == [record['is_fake'] for record in expected]
+    assert [record['confidence'] for record in merged] == [round(record['confidence'], 6) for record in expected]
+
+
+def test_shard_processes_merge_to_single_run(archive, tmp_path):
+    path, models_dir, expected = archive
+    job = str(tmp_path / "job")
+    plan = plan_job(path, 3, job)
+    assert plan['shards'][0]['start'] == 0 and plan['shards'][-1]['end'] == os.path.getsize(path)
+    processes = [subprocess.Popen([sys.executable, BULK, "run", "--job", job, "--shard", str(shard),
+                                   "--models_dir", models_dir, "--chunk_size", "4", "--translator", "identity"])
+                 for shard in range(3)]
+    assert all(process.wait(timeout=120) == 0 for process in processes)
+    assert all(row['done'] for row in job_status(job))
+    output = str(tmp_path / "scores.jsonl")
+    assert merge_job(job, output) == len(expected)
+    _assert_merged(output, expected)
+
+
+def test_crashed_shard_resumes_after_last_checkpoint(archive, tmp_path):
+    path, models_dir, expected = archive
+    job = str(tmp_path / "job")
+    plan_job(path, 2, job)
+    bundle = load_bundle(models_dir)
+    options = dict(chunk_size=4, translate=_identity_translate)
+
+    checkpoint = run_shard(job, 0, bundle, max_chunks=2, **options)
+    assert checkpoint['articles'] == 8 and not checkpoint['done']
+    with pytest.raises(JobError):
+        merge_job(job, str(tmp_path / "early.jsonl"))
+    # A crash mid-write leaves a torn record after the checkpoint
+    output, _ = shard_paths(job, 0)
+    with open(output, "ab") as f:
+        f.write(b'{"offset": 99999, "label": "torn')
+
+    for shard in (0, 1):
+        assert run_shard(job, shard, bundle, **options)['done']
+    merged = str(tmp_path / "scores.jsonl")
+    merge_job(job, merged)
+    _assert_merged(merged, expected)
@@ -0,0 +1,123 @@
+import gc
+import os
+import sys
+import threading
+import weakref
+
+import joblib
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.bundles import (BundleError, ModelManager, LEGACY_VERSION, activate_version, current_version,
+                             publish_bundle, rollback, verify_bundle)
+from scripts.conftest import fake_translate
+from scripts.inference import MODEL_FILES, analyze_article
+
+
+def _dump(bundle, directory):
+    os.makedirs(directory, exist_ok=True)
+    for name, filename in MODEL_FILES.items():
+        joblib.dump(bundle[name], os.path.join(directory, filename))
+
+
+def test_publish_verify_and_rollback(toy_bundle, tmp_path):
+    models_dir = str(tmp_path)
+    _dump(toy_bundle, models_dir)
+    assert current_version(models_dir) == LEGACY_VERSION
+
+    publish_bundle(models_dir, models_dir, version="v1")
+    publish_bundle(models_dir, models_dir, version="v2", activate=False)
+    assert current_version(models_dir) == "v1"
+
+    activate_version(models_dir, "v2")
+    assert current_version(models_dir) == "v2"
+    assert rollback(models_dir) == "v1"
+    assert current_version(models_dir) == "v1"
+
+    with open(os.path.join(models_dir, "versions", "v2", MODEL_FILES['scaler']), "ab") as f:
+        f.write(b"corrupt")
+    with pytest.raises(BundleError):
+        verify_bundle(models_dir, "v2")
+    with pytest.raises(BundleError):
+        activate_version(models_dir, "v2")
+    assert current_version(models_dir) == "v1"
+
+
+def test_manager_swaps_without_failing_inflight_requests(toy_bundle, tmp_path):
+    models_dir = str(tmp_path)
+    _dump(toy_bundle, models_dir)
+    publish_bundle(models_dir, models_dir, version="v1")
+    publish_bundle(models_dir, models_dir, version="v2", activate=False)
+
+    manager = ModelManager(models_dir)
+    assert manager.load()
+    assert manager.version == "v1"
+
+    errors, seen = [], set()
+    stop = threading.Event()
+
+    def client():
+        while not stop.is_set():
+            bundle = manager.active
+            try:
+                analyze_article(bundle, "Officials confirmed the report.", 'en', translate=fake_translate)
+                seen.add(bundle.version)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=client) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    activate_version(models_dir, "v2")
+    manager.check()
+    assert manager.version == "v2"
+    assert manager.rollback()
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert manager.version == "v1"
+    assert manager.status()['previous_version'] == "v2"
+    assert seen <= {"v1", "v2"}
+
+
+
+def test_swap_releases_the_old_bundle(toy_bundle, tmp_path):
+    models_dir = str(tmp_path)
+    _dump(toy_bundle, models_dir)
+    publish_bundle(models_dir, models_dir, version="v1")
+    publish_bundle(models_dir, models_dir, version="v2", activate=False)
+    manager = ModelManager(models_dir, warm=None)
+
+    manager.reload_async().join()
+    assert manager.ready and manager.version == "v1"
+    old = weakref.ref(manager.active)
+    activate_version(models_dir, "v2")
+    manager.check()
+    gc.collect()
+    assert old() is None
+    assert manager.status()['previous_version'] == "v1"
+
+def test_ready_only_after_warmup(toy_bundle, tmp_path, monkeypatch):
+    import app as webapp
+
+    models_dir = str(tmp_path)
+    _dump(toy_bundle, models_dir)
+    publish_bundle(models_dir, models_dir, version="v1")
+    manager = ModelManager(models_dir)
+    monkeypatch.setattr(webapp, "model_manager", manager)
+    client = webapp.app.test_client()
+
+    response = client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.get_json()['ready'] is False
+
+    assert manager.load()
+    response = client.get("/api/ready")
+    assert response.status_code == 200
+    warmup = response.get_json()['warmup']
+    assert warmup['languages'] == 13
+    assert warmup['seconds'] > 0
+    assert client.get("/api/health").get_json()['warmup'] == warmup
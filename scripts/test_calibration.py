@@ -0,0 +1,50 @@
+import os
+import sys
+
+import numpy as np
+from scipy import sparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.calibration import calibration_metrics, compare_calibrations, make_calibrated_svm
+from scripts.evaluate import expected_calibration_error
+from scripts.conftest import NUM_FEATURE_COLUMNS, toy_articles, train_toy_bundle
+from scripts.inference import extract_numeric_features
+from scripts.quantize import CompactLinearModel
+from scripts.utils import clean_text
+
+
+def _features(bundle, texts):
+    cleaned = [clean_text(text) for text in texts]
+    num = np.array([[extract_numeric_features(text, False)[col] for col in NUM_FEATURE_COLUMNS] for text in texts])
+    return sparse.hstack([bundle.word_vectorizer.transform(cleaned), bundle.char_vectorizer.transform(cleaned),
+                          bundle.scaler.transform(num)]).tocsr()
+
+
+def test_single_calibration_keeps_one_svm_and_compacts(toy_bundle):
+    texts, labels = toy_articles(n=120, seed=4)
+    X = _features(toy_bundle, texts)
+    model = make_calibrated_svm('single').fit(X, labels)
+    assert len(model.calibrated_classifiers_) == 1
+    compact = CompactLinearModel(model, 'float64')
+    assert compact.coef.shape == (1, X.shape[1])
+    assert np.allclose(compact.predict_proba(X), model.predict_proba(X))
+
+
+def test_compare_calibrations_reports_both_modes():
+    texts, labels = toy_articles(n=160, seed=6)
+    bundle = train_toy_bundle(texts[:120], labels[:120])
+    X = _features(bundle, texts)
+    report = compare_calibrations(X[:120], labels[:120], X[120:], labels[120:], repeat=1)
+    assert report['ensemble']['svms'] == 3 and report['single']['svms'] == 1
+    assert report['single']['model_bytes'] < report['ensemble']['model_bytes']
+    for row in report.values():
+        assert row['accuracy'] > 0.9 and 0 <= row['ece'] <= 1
+
+
+def test_ece_matches_evaluate_report(toy_bundle):
+    texts, labels = toy_articles(n=40, seed=12)
+    X = _features(toy_bundle, texts)
+    metrics, predicted = calibration_metrics(toy_bundle.model, X, labels)
+    confidence = toy_bundle.model.predict_proba(X).max(axis=1)
+    assert metrics['ece'] == expected_calibration_error(confidence, predicted == np.array(labels))
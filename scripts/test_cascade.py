@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.cascade import cascade_report
+from scripts.conftest import fake_translate, toy_articles
+from scripts.inference import analyze_article, prepare_article, score_articles
+
+
+def test_cascade_only_runs_full_model_when_uncertain(toy_bundle):
+    texts, _ = toy_articles(n=20, seed=3)
+    articles = [prepare_article(text, 'en', fake_translate) for text in texts]
+
+    full_predictions, full_probabilities, early = score_articles(toy_bundle, articles)
+    assert not early.any()
+
+    predictions, probabilities, early = score_articles(toy_bundle, articles, cascade_threshold=1.01)
+    assert not early.any()
+    np.testing.assert_allclose(probabilities, full_probabilities)
+
+    predictions, probabilities, early = score_articles(toy_bundle, articles, cascade_threshold=0.5)
+    assert early.all()
+    assert (probabilities.max(axis=1) >= 0.5).all()
+
+    result = analyze_article(toy_bundle, texts[0], 'en', translate=fake_translate, cascade_threshold=0.5)
+    assert result['model_stage'] == 'word'
+    assert analyze_article(toy_bundle, texts[0], 'en', translate=fake_translate)['model_stage'] == 'full'
+
+
+def test_cascade_report(toy_bundle):
+    texts, labels = toy_articles(n=40, seed=4)
+    report = cascade_report(toy_bundle, texts, labels, thresholds=(0.5, 1.01))
+    assert report['thresholds']['0.5']['early_exit_fraction'] == 1.0
+    assert report['thresholds']['1.01']['early_exit_fraction'] == 0.0
+    assert report['thresholds']['1.01']['accuracy_delta'] == 0.0
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.char_ngrams import FastCharVectorizer, benchmark
+
+TRAIN = [
+    "govern offici report minist announc parliament",
+    "shock secret miracl cure expos hoax truth",
+    "économie   croissance   données\tenquête",
+    "नई दिल्ली मेट्रो लाइन उद्घाटन",
+    "Mixed CASE text with   runs of\n\nwhitespace",
+]
+
+UNSEEN = [
+    "",
+    "ab",
+    "govern",
+    "Shock!! secret minist report ΩΩΩ unseen chars 😀 expos",
+    "नई मेट्रो   parliament\t\tcure",
+    "x" * 5000,
+    " ".join(TRAIN) * 20,
+]
+
+
+def _assert_identical(expected, actual):
+    assert actual.shape == expected.shape
+    assert actual.dtype == expected.dtype
+    assert np.array_equal(actual.indptr, expected.indptr)
+    assert np.array_equal(actual.indices, expected.indices)
+    assert np.array_equal(actual.data, expected.data)
+
+
+def test_matches_char_vectorizer_transform():
+    for ngram_range in [(3, 5), (2, 4), (1, 3)]:
+        vectorizer = TfidfVectorizer(analyzer='char', ngram_range=ngram_range).fit(TRAIN)
+        fast = FastCharVectorizer(vectorizer)
+        _assert_identical(vectorizer.transform(UNSEEN), fast.transform(UNSEEN))
+        _assert_identical(vectorizer.transform(TRAIN), fast.transform(TRAIN))
+
+
+def test_benchmark_reports_identical_rows():
+    vectorizer = TfidfVectorizer(analyzer='char', ngram_range=(3, 5), min_df=1).fit(TRAIN)
+    rows = benchmark(vectorizer, [50, 500, 5000], repeat=2)
+    assert [row['length'] for row in rows] == [50, 500, 5000]
+    assert all(row['identical'] for row in rows)
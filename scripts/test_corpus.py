@@ -0,0 +1,56 @@
+import os
+import sys
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.corpus import CSV_FIELDS, LANGUAGES, iter_articles, parse_language_mix, write_corpus
+
+SCRIPT_NAMES = {'hi': 'DEVANAGARI', 'mr': 'DEVANAGARI', 'ta': 'TAMIL', 'te': 'TELUGU', 'bn': 'BENGALI',
+                'as': 'BENGALI', 'gu': 'GUJARATI', 'kn': 'KANNADA', 'ml': 'MALAYALAM', 'pa': 'GURMUKHI',
+                'or': 'ORIYA', 'ur': 'ARABIC', 'en': 'LATIN'}
+
+
+def test_same_seed_same_rows_and_prefix_stable():
+    options = dict(languages='all', duplicate_rate=0.2, median_words=60, vocabulary=2000)
+    first = [row['text'] for row in iter_articles(40, seed=3, **options)]
+    again = [row['text'] for row in iter_articles(60, seed=3, **options)]
+    other = [row['text'] for row in iter_articles(40, seed=4, **options)]
+    assert first == again[:40]
+    assert first != other
+
+
+def test_rows_use_their_language_script_and_reposts_point_back():
+    rows = list(iter_articles(300, languages='all', duplicate_rate=0.1, median_words=40, vocabulary=2000))
+    assert {row['language'] for row in rows} == set(LANGUAGES)
+    for row in rows:
+        letters = [char for char in row['text'] if char.isalpha() and ord(char) > 127]
+        if row['language'] == 'en':
+            assert not letters
+        else:
+            names = {unicodedata.name(char).split()[0] for char in letters}
+            assert names == {SCRIPT_NAMES[row['language']]}
+    reposts = [row for row in rows if row['duplicate_of'] >= 0]
+    assert 10 < len(reposts) < 60
+    for row in reposts:
+        source = rows[row['duplicate_of']]
+        assert source['duplicate_of'] == -1 and source['language'] == row['language']
+
+
+def test_writes_load_data_schema(tmp_path):
+    summary = write_corpus(str(tmp_path), 50, labeled=str(tmp_path / "all.csv"), articles=str(tmp_path / "a.txt"),
+                           median_words=30, vocabulary=1000)
+    true_df, fake_df = pd.read_csv(tmp_path / "True.csv"), pd.read_csv(tmp_path / "Fake.csv")
+    assert list(true_df.columns) == CSV_FIELDS and list(fake_df.columns) == CSV_FIELDS
+    assert len(true_df) == summary['real'] and len(fake_df) == summary['fake'] and len(true_df) + len(fake_df) == 50
+    assert pd.read_csv(tmp_path / "all.csv")['label'].sum() == summary['real']
+    assert len((tmp_path / "a.txt").read_text(encoding="utf-8").splitlines()) == 50
+
+
+def test_parse_language_mix():
+    mix = parse_language_mix("en=0.5,hi=0.2")
+    assert np.isclose(sum(mix.values()), 1) and np.isclose(mix['en'], 0.5) and np.isclose(mix['ta'], 0.3 / 11)
+    assert parse_language_mix("en") == {'en': 1.0}
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.conftest import fake_translate, toy_articles
+from scripts.deadline import CircuitBreaker, Deadline, SlowTranslator, TranslationGuard, TranslationSkipped
+from scripts.inference import analyze_article
+
+HINDI = "नई दिल्ली में आज एक नई मेट्रो लाइन का उद्घाटन किया गया।"
+
+
+def test_breaker_opens_and_lets_one_trial_through():
+    breaker = CircuitBreaker(failures=2, reset_after=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.allow()
+    assert breaker.stats()['trips'] == 1
+
+
+def test_slow_translator_is_bounded_and_flagged(toy_bundle):
+    guard = TranslationGuard(SlowTranslator(2.0), CircuitBreaker(failures=2, reset_after=60), min_seconds=0.05)
+    reasons, latencies = [], []
+    for _ in range(4):
+        deadline = Deadline(0.3, reserve=0.1)
+        started = time.perf_counter()
+        result = analyze_article(toy_bundle, HINDI, 'hi', translate=guard.bind(deadline), deadline=deadline)
+        latencies.append(time.perf_counter() - started)
+        assert result['degraded'] and result['translation'] is None
+        reasons.append(result['degraded_reasons'][0])
+
+    assert max(latencies) < 1.0
+    assert reasons == ['translator_timeout', 'translator_timeout', 'translator_unavailable', 'translator_unavailable']
+
+    guard = TranslationGuard(fake_translate, min_seconds=0.05)
+    deadline = Deadline(0.01)
+    with pytest.raises(TranslationSkipped):
+        guard(HINDI, 'hi', deadline)
+    assert deadline.degraded == ['deadline']
+
+
+def test_exhausted_budget_uses_word_model(toy_bundle):
+    text = toy_articles(n=1)[0][0]
+    result = analyze_article(toy_bundle, text, 'en', translate=fake_translate, deadline=Deadline(0.0))
+    assert result['model_stage'] == 'word'
+    assert result['degraded_reasons'] == ['word_model_only']
+
+    result = analyze_article(toy_bundle, text, 'en', translate=fake_translate, deadline=Deadline(5.0))
+    assert result['model_stage'] == 'full' and not result['degraded']
+
+
+def test_translator_timeout_still_scores_with_the_full_model(toy_bundle):
+    guard = TranslationGuard(SlowTranslator(2.0), min_seconds=0.05)
+    deadline = Deadline(0.5, reserve=0.2)
+    result = analyze_article(toy_bundle, HINDI, 'hi', translate=guard.bind(deadline), deadline=deadline)
+    assert result['degraded_reasons'] == ['translator_timeout']
+    assert result['model_stage'] == 'full'
@@ -0,0 +1,33 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.dedup import NearDuplicateIndex, benchmark, perturb, synthetic_corpus
+
+
+def test_perturbed_reposts_hit_and_fresh_articles_miss():
+    report = benchmark(n_articles=300, n_duplicates=300)
+    assert report['repost_hit_rate'] >= 0.95
+    assert report['repost_correct_rate'] == report['repost_hit_rate']
+    assert report['fresh_false_hit_rate'] == 0.0
+
+
+def test_key_mismatch_and_lru_eviction():
+    originals, _, _ = synthetic_corpus(5, 0)
+    index = NearDuplicateIndex(threshold=0.7, max_entries=3)
+    for i, text in enumerate(originals):
+        index.add(text, {'article': i}, key="v1")
+
+    repost = perturb(originals[4], np.random.RandomState(0))
+    result, similarity, _ = index.lookup(repost, key="v1")
+    assert result == {'article': 4} and similarity >= 0.7
+    assert index.lookup(repost, key="v2")[0] is None
+
+    assert len(index) == 3
+    assert index.lookup(originals[0], key="v1")[0] is None
+    stats = index.stats()
+    assert stats['evictions'] == 2 and stats['hits'] == 1 and stats['lookups'] == 3
+    assert sum(len(bucket) for bucket in index._buckets[0].values()) == 3
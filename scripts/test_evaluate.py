@@ -0,0 +1,42 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.conftest import toy_articles
+from scripts.evaluate import evaluate, expected_calibration_error, parse_bundle_spec, read_test_articles
+from scripts.quantize import compact_bundle
+
+
+def test_evaluate_reports_quality_and_stage_timings(toy_bundle):
+    texts, labels = toy_articles(n=30, seed=5)
+    report = evaluate(toy_bundle, texts + [""], labels + [1], chunk_size=8, cascade_threshold=0.9)
+
+    assert report['articles'] == 31 and report['scored'] == 30 and report['unsupported'] == 1
+    assert report['accuracy'] >= 0.9
+    assert 0 <= report['ece'] <= 1 and 0 <= report['brier'] <= 1
+    assert report['articles_per_sec'] > 0
+    assert 0 <= report['early_exit_fraction'] <= 1
+    assert 'word_model' in report['stage_ms_per_article']
+
+    compact = evaluate(compact_bundle(toy_bundle, 'float32'), texts, labels)
+    assert abs(compact['accuracy'] - report['accuracy']) < 0.05
+    assert 'early_exit_fraction' not in compact
+    for stage in ('detect_translate', 'clean', 'word_tfidf', 'char_tfidf', 'assemble', 'score'):
+        assert stage in compact['stage_ms_per_article']
+
+
+def test_helpers(tmp_path):
+    assert parse_bundle_spec("models") == ("models", "float64", None)
+    assert parse_bundle_spec("models/versions/v2:int8:0.95") == ("models/versions/v2", "int8", 0.95)
+    assert parse_bundle_spec("models::0.9") == ("models", "float64", 0.9)
+
+    assert expected_calibration_error(np.array([0.9, 0.9]), np.array([True, False])) == np.float64(0.4)
+
+    path = tmp_path / "articles.txt"
+    path.write_text("=== Test Article 1 (Known Real News) ===Real body.\n\n"
+                    "=== Test Article 2 (Known Fake News) ===Fake body.\n\n"
+                    "=== Test Article 3 (Mixed Signals) ===\nUnlabeled body.\n", encoding="utf-8")
+    assert read_test_articles(str(path)) == (["Real body.", "Fake body."], [1, 0])
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scripts.model_training as model_training
+from scripts.conftest import toy_articles
+from scripts.feature_store import FeatureStore, content_hash
+from scripts.utils import clean_text
+
+
+def test_rows_only_computes_unseen_keys(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    calls = []
+
+    def compute(items):
+        calls.append(list(items))
+        return np.array([[len(item), item.count("a")] for item in items], dtype=float).reshape(-1, 2)
+
+    items = ["alpha", "beta", "alpha", "gamma"]
+    keys = [content_hash(item) for item in items]
+    first = store.rows({'kind': 'demo'}, keys, items, compute)
+    assert calls == [["alpha", "beta", "gamma"]]
+
+    grown = items + ["delta"]
+    second = store.rows({'kind': 'demo'}, keys + [content_hash("delta")], grown, compute)
+    assert calls[-1] == ["delta"]
+    np.testing.assert_array_equal(second[:4], first)
+    np.testing.assert_array_equal(second[4], [5, 1])
+
+    store.rows({'kind': 'demo', 'version': 2}, keys, items, compute)
+    assert len(calls[-1]) == 3
+    assert sorted(row['rows'] for row in store.info().values()) == [3, 4]
+
+
+def test_training_features_from_store_match_scratch(tmp_path, monkeypatch, capsys):
+    # No language detection or translation in tests
+    monkeypatch.setattr(model_training, "preprocess_text", lambda text: (clean_text(text), 'en'))
+    texts, labels = toy_articles(n=60, seed=6)
+    scratch = model_training.training_features(texts, labels)
+
+    store = FeatureStore(str(tmp_path))
+    cached = model_training.training_features(texts, labels, store)
+    for block in ('X_train_word', 'X_test_word', 'X_train_char', 'X_test_char'):
+        np.testing.assert_allclose(cached[block].toarray(), scratch[block].toarray())
+    np.testing.assert_allclose(cached.X_train_num_scaled, scratch.X_train_num_scaled)
+
+    again = model_training.training_features(texts, labels, store)
+    assert all(stats['computed'] == 0 for stats in store.stats.values())
+    assert again.word_vectorizer.vocabulary_ == cached.word_vectorizer.vocabulary_
+
+    # New articles are transformed with the stored vocabulary; only their rows are computed
+    more_texts, more_labels = toy_articles(n=80, seed=6)
+    store.stats.clear()
+    grown = model_training.training_features(texts + more_texts[60:], labels + more_labels[60:], store)
+    assert grown.word_vectorizer.vocabulary_ == cached.word_vectorizer.vocabulary_
+    computed = {name.split('-')[0]: stats['computed'] for name, stats in store.stats.items()}
+    assert computed == {'clean': 20, 'numeric': 20, 'word_tfidf': 20, 'char_tfidf': 20}
+    assert "--refit_vectorizers" in capsys.readouterr().out
+
+    refit = model_training.training_features(texts + more_texts[60:], labels + more_labels[60:], store,
+                                             refit_vectorizers=True)
+    fresh = model_training.training_features(texts + more_texts[60:], labels + more_labels[60:])
+    assert refit.word_vectorizer.vocabulary_ == fresh.word_vectorizer.vocabulary_
+    np.testing.assert_allclose(refit.X_test_char.toarray(), fresh.X_test_char.toarray())
@@ -0,0 +1,109 @@
+import os
+import sys
+
+import joblib
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.bundles import (activate_version, current_version, list_versions, load_version, publish_bundle,
+                             read_manifest)
+from scripts.conftest import fake_translate, toy_articles
+from scripts.feedback import (MIN_CALIBRATION_ARTICLES, FeedbackStore, apply_feedback, is_holdout, parse_label,
+                             refine_linear, update_model)
+from scripts.inference import MODEL_FILES, OPTIONAL_MODEL_FILES, build_features, prepare_article
+
+
+def test_store_and_labels(tmp_path):
+    store = FeedbackStore(str(tmp_path))
+    store.add("first article", 0, reviewer="desk")
+    store.add("second article", 1)
+    assert [r['text'] for r in store.records(1)] == ["second article"]
+    assert store.status()['pending'] == 2
+
+    assert parse_label({'label': 'Fake'}) == 0
+    assert parse_label({'is_fake': False}) == 1
+    assert parse_label({'label': 1}) == 1
+    with pytest.raises(ValueError):
+        parse_label({'label': 'maybe'})
+
+
+def test_refine_linear_learns_corrections_and_keeps_numeric_weights(toy_bundle):
+    texts, labels = toy_articles(n=20, seed=8)
+    articles = [prepare_article(text, 'en', fake_translate) for text in texts]
+    X = build_features(toy_bundle, articles)
+    estimator = toy_bundle.model.calibrated_classifiers_[0].estimator
+    flipped = 1 - np.array(labels)
+
+    refined = refine_linear(estimator, X, flipped, frozen_columns=11, max_shift=5.0, epochs=50)
+    before = estimator.decision_function(X) * np.where(flipped == 1, 1, -1)
+    after = refined.decision_function(X) * np.where(flipped == 1, 1, -1)
+    assert (after > before).all()
+    np.testing.assert_array_equal(refined.coef_[0, -11:], estimator.coef_[0, -11:])
+    assert estimator.coef_ is not refined.coef_
+
+
+def test_apply_feedback_publishes_a_new_version(toy_bundle, tmp_path):
+    models_dir = str(tmp_path / "models")
+    os.makedirs(models_dir)
+    for name, filename in list(MODEL_FILES.items()) + [('word_model', OPTIONAL_MODEL_FILES['word_model'])]:
+        joblib.dump(toy_bundle[name], os.path.join(models_dir, filename))
+    publish_bundle(models_dir, models_dir, version="v1")
+
+    store = FeedbackStore(str(tmp_path / "feedback"))
+    assert apply_feedback(models_dir, store, fake_translate) is None
+    for text in ("!!!", "???"):
+        store.add(text, 0, language='en')
+    assert apply_feedback(models_dir, store, fake_translate, force_recalibrate=True) is None
+    assert [m['version'] for m in list_versions(models_dir)] == ["v1"] and store.status()['pending'] == 2
+
+    texts, labels = toy_articles(n=300, seed=9)
+    for text, label in zip(texts, labels):
+        store.add(text, label, language='en')
+    held_out = [text for text in texts if is_holdout({'text': text})]
+    assert MIN_CALIBRATION_ARTICLES <= len(held_out) < len(texts)
+
+    update = apply_feedback(models_dir, store, fake_translate, recalibrate_every=50)
+    assert update['articles'] == len(texts) - len(held_out) and update['recalibrated']
+    assert update['held_out'] == len(held_out) and not update['activated']
+    assert current_version(models_dir) == "v1"
+    assert read_manifest(models_dir, update['version'])['parent_version'] == "v1"
+    assert store.status()['pending'] == 0
+    assert apply_feedback(models_dir, store, fake_translate) is None
+
+    bundle = load_version(models_dir, update['version'])
+    X = build_features(bundle, [prepare_article(text, 'en', fake_translate) for text in texts])
+    assert np.mean(bundle.model.predict(X) == np.array(labels)) >= 0.9
+    assert bundle.word_model is not None
+
+    store.add(texts[0], 1 - labels[0], language='en')
+    activated = apply_feedback(models_dir, store, fake_translate, activate=True, holdout_fraction=0)
+    assert current_version(models_dir) == activated['version']
+    assert activated['parent_version'] == update['version']
+
+
+def test_publish_only_updates_build_on_each_other(toy_bundle, tmp_path):
+    models_dir = str(tmp_path / "models")
+    os.makedirs(models_dir)
+    for name, filename in MODEL_FILES.items():
+        joblib.dump(toy_bundle[name], os.path.join(models_dir, filename))
+    publish_bundle(models_dir, models_dir, version="v1")
+
+    store = FeedbackStore(str(tmp_path / "feedback"))
+    texts, labels = toy_articles(n=40, seed=10)
+    batches = [(texts[:20], 1 - np.array(labels[:20])), (texts[20:], 1 - np.array(labels[20:]))]
+    updates, expected = [], toy_bundle.model
+    for batch_texts, batch_labels in batches:
+        for text, label in zip(batch_texts, batch_labels):
+            store.add(text, int(label), language='en')
+        updates.append(apply_feedback(models_dir, store, fake_translate, holdout_fraction=0))
+        X = build_features(toy_bundle, [prepare_article(text, 'en', fake_translate) for text in batch_texts])
+        expected = update_model(expected, X, batch_labels, frozen_columns=11)
+    assert current_version(models_dir) == "v1"
+    assert read_manifest(models_dir, updates[1]['version'])['parent_version'] == updates[0]['version']
+
+    activate_version(models_dir, updates[1]['version'])
+    bundle = load_version(models_dir)
+    for fold, expected_fold in zip(bundle.model.calibrated_classifiers_, expected.calibrated_classifiers_):
+        np.testing.assert_allclose(fold.estimator.coef_, expected_fold.estimator.coef_)
@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pytest
+from sklearn.utils import Bunch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts import inference
+from scripts.conftest import fake_translate, toy_articles
+from scripts.fields import SLIM_FIELDS, parse_fields
+from scripts.native import analyze_native, train_native_model
+
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields('slim') == SLIM_FIELDS
+    assert parse_fields('sentiment, model_stage') == {'is_fake', 'confidence', 'sentiment', 'model_stage'}
+    with pytest.raises(ValueError):
+        parse_fields(['is_fake', 'explanation'])
+    with pytest.raises(ValueError):
+        parse_fields(5)
+
+
+def test_slim_fields_skip_explanation_and_enrichment(toy_bundle, monkeypatch):
+    def explain(bundle, n=5):
+        raise AssertionError("top_features computed for a slim request")
+
+    monkeypatch.setattr(inference, "top_features", explain)
+    text = toy_articles(n=1)[0][0]
+    result = inference.analyze_article(toy_bundle, text, 'en', translate=fake_translate, fields=SLIM_FIELDS)
+    assert 'sentiment' not in result and result['top_features'] == []
+    assert inference.extract_numeric_features(text, False, sentiment=False)['subjectivity'] == 0.0
+
+    calls = []
+
+    def translate(text, source):
+        calls.append(source)
+        return text
+
+    bundle = Bunch(**toy_bundle)
+    bundle.native_model = train_native_model(*toy_articles(n=60, seed=3))
+    hindi = "सरकार मंत्री रिपोर्ट संसद अर्थव्यवस्था नीति"
+    slim = analyze_native(bundle, hindi, 'hi', translate=translate, fields=SLIM_FIELDS)
+    full = analyze_native(bundle, hindi, 'hi', translate=translate)
+    assert calls == ['hi'] and 'sentiment' not in slim and 'sentiment' in full
+    assert slim['confidence'] == full['confidence']
+
+
+def test_analyze_returns_only_requested_fields(toy_bundle, monkeypatch):
+    import app as webapp
+
+    monkeypatch.setattr(webapp.model_manager, "active", Bunch(**toy_bundle, version="toy"))
+    monkeypatch.setattr(webapp, "duplicate_index", None)
+    monkeypatch.setattr(webapp, "request_profiler", None)
+    client = webapp.app.test_client()
+    text = toy_articles(n=1)[0][0]
+
+    body = client.post('/api/analyze', json={'text': text, 'language': 'en', 'fields': 'slim'}).get_json()
+    assert set(body) == {'is_fake', 'confidence'}
+    body = client.post('/api/analyze', json={'text': text, 'fields': ['model_version']}).get_json()
+    assert set(body) == {'is_fake', 'confidence', 'model_version'}
+    assert client.post('/api/analyze', json={'text': text, 'fields': ['nope']}).status_code == 400
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import joblib
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.footprint import deep_sizeof, footprint
+from scripts.inference import MODEL_FILES, OPTIONAL_MODEL_FILES
+
+
+def test_deep_sizeof_counts_buffers_and_shared_objects_once():
+    array = np.zeros(100000)
+    assert deep_sizeof(array) >= array.nbytes
+    assert deep_sizeof([array, array]) < 2 * array.nbytes
+    assert deep_sizeof({'a': array[:10]}) >= array.nbytes
+
+
+def test_footprint_reports_every_artifact(toy_bundle, tmp_path):
+    for name, filename in {**MODEL_FILES, **OPTIONAL_MODEL_FILES}.items():
+        if toy_bundle.get(name) is not None:
+            joblib.dump(toy_bundle[name], os.path.join(tmp_path, filename))
+
+    report = footprint(str(tmp_path), workers=4)
+    artifacts = report['artifacts']
+    assert set(artifacts) == set(MODEL_FILES) | {'word_model'}
+    assert artifacts['char_vectorizer']['vocabulary_size'] == len(toy_bundle.char_vectorizer.vocabulary_)
+    assert artifacts['feature_names']['names'] == len(toy_bundle.feature_names)
+    assert artifacts['model']['folds'] == 3
+    assert 0 < artifacts['model']['nonzero_weights'] <= artifacts['model']['weights']
+    assert all(row['file_bytes'] > 0 and row['deep_bytes'] > 0 for row in artifacts.values())
+    projection = report['projection']
+    assert projection['total_rss_bytes'] == projection['interpreter_rss_bytes'] + 4 * projection['worker_rss_bytes']
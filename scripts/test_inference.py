@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.conftest import toy_articles
+from scripts.inference import analyze_article, predict_batch, prepare_article
+
+FRENCH = "Le ministre des finances a annoncé mardi une nouvelle politique économique pour le pays."
+
+
+def test_translated_article_outside_supported_languages_is_cleaned():
+    english = toy_articles(n=1)[0][0]
+    article = prepare_article(FRENCH, 'fr', lambda text, source: english)
+    assert article.detected_language == 'fr' and article.is_non_english
+    assert article.cleaned_text and article.text == english
+
+    def unavailable(text, source):
+        raise ConnectionError("translator down")
+
+    assert prepare_article(FRENCH, 'fr', unavailable).cleaned_text == ""
+
+
+def test_untranslatable_article_is_not_scored(toy_bundle):
+    def unavailable(text, source):
+        raise ConnectionError("translator down")
+
+    result = analyze_article(toy_bundle, FRENCH, 'fr', translate=unavailable)
+    assert result['model_stage'] == 'unsupported' and result['is_fake'] is None
+    assert result['confidence'] == 0.0 and result['top_features'] == []
+    assert predict_batch(toy_bundle, [FRENCH], 'fr', translate=unavailable)[0]['label'] == 'unsupported'
@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.conftest import fake_translate
+from scripts.inference import analyze_article
+from scripts.limits import SizePolicy, clip_text
+
+# Worst-case analysis time allowed for the largest accepted article
+LATENCY_BUDGET_SECONDS = 2.0
+
+
+def test_clip_text_keeps_head_and_tail():
+    text = "a" * 50 + "b" * 50
+    assert clip_text(text, None) == text
+    assert clip_text(text, 200) == text
+    clipped = clip_text(text, 20)
+    assert clipped == "a" * 10 + " " + "b" * 10
+
+
+def test_clip_text_sampled_windows():
+    text = "".join(str(i % 10) for i in range(1000))
+    clipped = clip_text(text, 40, mode='sample')
+    windows = clipped.split(" ")
+    assert len(windows) == 4
+    assert windows[0] == text[:10]
+    assert windows[-1] == text[-10:]
+
+
+def test_policy_from_env():
+    policy = SizePolicy.from_env({'SATYASCAN_MAX_TEXT_CHARS': '500', 'SATYASCAN_NGRAM_CHARS': '0',
+                                  'SATYASCAN_TRUNCATION': 'sample'})
+    assert policy.too_large("x" * 501)
+    assert not policy.too_large("x" * 500)
+    assert policy.ngram_chars is None
+    assert policy.truncation == 'sample'
+
+
+def test_worst_case_latency_stays_within_budget(toy_bundle):
+    policy = SizePolicy.from_env({})
+    sentence = "Shocking secret report confirmed by the minister, share before they hide it! "
+    worst_english = (sentence * (policy.max_text_chars // len(sentence) + 1))[:policy.max_text_chars]
+    worst_hindi = ("नई दिल्ली में आज एक नई मेट्रो लाइन का उद्घाटन किया गया। " * 5000)[:policy.max_text_chars]
+
+    for text, language in [(worst_english, 'auto'), (worst_hindi, 'auto'), (worst_hindi, 'hi')]:
+        assert not policy.too_large(text)
+        started = time.perf_counter()
+        result = analyze_article(toy_bundle, text, language, policy=policy, translate=fake_translate)
+        elapsed = time.perf_counter() - started
+        assert result['truncated']
+        assert elapsed < LATENCY_BUDGET_SECONDS, f"{language}: {elapsed:.2f}s"
+
+
+def test_api_rejects_oversized_text(toy_bundle):
+    import app as webapp
+
+    client = webapp.app.test_client()
+    too_long = "x" * (webapp.size_policy.max_text_chars + 1)
+    response = client.post('/api/analyze', json={'text': too_long})
+    assert response.status_code == 413
+
+    body = b'{"text": "' + b"x" * webapp.size_policy.max_request_bytes + b'"}'
+    response = client.post('/api/analyze', data=body, content_type='application/json')
+    assert response.status_code == 413
+    assert 'error' in response.get_json()
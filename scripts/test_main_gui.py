@@ -0,0 +1,89 @@
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+import joblib
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtCore = pytest.importorskip("PyQt6.QtCore")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from scripts.conftest import toy_articles
+from scripts.inference import MODEL_FILES
+
+# app.py at the project root shadows the app/ directory, so load the GUI module by path
+_spec = importlib.util.spec_from_file_location("main_gui", os.path.join(ROOT, "app", "main_gui.py"))
+main_gui = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(main_gui)
+ModelService = main_gui.ModelService
+
+DIRECT = QtCore.Qt.ConnectionType.DirectConnection
+
+
+@pytest.fixture
+def service(tmp_path, toy_bundle):
+    for name, filename in MODEL_FILES.items():
+        joblib.dump(toy_bundle[name], tmp_path / filename)
+    texts, _ = toy_articles(n=400, seed=2)
+    (tmp_path / "articles.txt").write_text("\n".join(texts) + "\n", encoding="utf-8")
+
+    service = ModelService(str(tmp_path))
+    service.FILE_CHUNK_SIZE = 4
+    events = []
+    for name in ('ready', 'job_started', 'job_finished', 'job_progress', 'file_finished', 'job_failed',
+                 'job_cancelled'):
+        getattr(service, name).connect(lambda *args, name=name: events.append((name,) + args), DIRECT)
+    ready = threading.Event()
+    service.ready.connect(ready.set, DIRECT)
+    service.start()
+    assert ready.wait(60)
+    yield service, events, str(tmp_path / "articles.txt")
+    if service.isRunning():
+        service.stop()
+
+
+def _wait_for(condition, timeout=60):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_jobs_run_in_order_and_queued_cancel_is_skipped(service):
+    service, events, path = service
+    first = service.submit_text("Officials confirmed the statement about economic growth.")
+    skipped = service.submit_text("Shocking secret they hide!")
+    service.cancel(skipped)
+    last = service.submit_text("The minister announced a new policy.")
+    _wait_for(lambda: any(event[:2] == ('job_finished', last) for event in events))
+    finished = [event[1] for event in events if event[0] == 'job_finished']
+    assert finished == [first, last]
+    assert ('job_cancelled', skipped) in events
+
+
+def test_file_job_reports_progress_and_stops_on_cancel(service):
+    service, events, path = service
+    job = service.submit_file(path)
+    service.job_progress.connect(lambda job_id, done, total: done >= 8 and service.cancel(job_id), DIRECT)
+    _wait_for(lambda: ('job_cancelled', job) in events)
+    progress = [event[2:] for event in events if event[0] == 'job_progress']
+    assert progress[0] == (0, 400) and progress[-1][0] < 400
+    assert not any(event[0] == 'file_finished' for event in events)
+
+
+def test_stop_cancels_a_running_file_job(service):
+    service, events, path = service
+    started = threading.Event()
+    service.job_progress.connect(lambda job_id, done, total: done > 0 and started.set(), DIRECT)
+    service.submit_file(path)
+    assert started.wait(60)
+    began = time.monotonic()
+    service.stop()
+    assert time.monotonic() - began < 5
+    assert not service.isRunning()
+    assert not any(event[0] == 'file_finished' for event in events)
@@ -0,0 +1,85 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.utils import Bunch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.conftest import fake_translate, toy_articles
+from scripts.native import analyze_native, compare_paths, train_native_model
+from scripts.warmup import warm_up
+
+REAL_HI = "सरकार मंत्री रिपोर्ट संसद अर्थव्यवस्था नीति सर्वेक्षण आंकड़े पुष्टि बयान घोषणा".split()
+FAKE_HI = "चौंकाने वाला रहस्य चमत्कार इलाज खुलासा झूठ सच्चाई छिपाया वायरल शेयर प्रतिबंधित".split()
+
+
+def _hindi_articles(n, seed):
+    rng = np.random.RandomState(seed)
+    texts, labels = [], []
+    for i in range(n):
+        label = i % 2
+        words = list(rng.choice(REAL_HI if label else FAKE_HI, size=rng.randint(20, 60)))
+        texts.append(" ".join(words) + ("।" if label else "!!!"))
+        labels.append(label)
+    return texts, labels
+
+
+def _corpus(n, seed):
+    en_texts, en_labels = toy_articles(n, seed)
+    hi_texts, hi_labels = _hindi_articles(n, seed)
+    return en_texts + hi_texts, en_labels + hi_labels, ['en'] * n + ['hi'] * n
+
+
+@pytest.fixture(scope="module")
+def native_bundle(toy_bundle):
+    bundle = Bunch(**toy_bundle)
+    bundle.native_model = train_native_model(*_corpus(100, 0))
+    return bundle
+
+
+def test_native_mode_never_translates(native_bundle):
+    def unavailable(text, source):
+        raise AssertionError("translator called")
+
+    texts, labels, languages = _corpus(20, 5)
+    for text, label, language in zip(texts, labels, languages):
+        result = analyze_native(native_bundle, text, language)
+        assert result['is_fake'] == (label == 0)
+        assert result['translation'] is None and result['model_stage'] == 'native'
+
+    enriched = analyze_native(native_bundle, texts[-1], 'hi', translate=fake_translate)
+    assert enriched['translation'].startswith("translated ")
+
+
+def test_compare_paths_reports_both(native_bundle):
+    texts, labels, languages = _corpus(10, 7)
+    report = compare_paths(native_bundle, texts, labels, languages, translate=fake_translate)
+    assert report['paths']['native']['accuracy'] == 1.0
+    assert set(report['paths']) == {'native', 'translate'}
+    assert report['languages']['hi']['articles'] == 10
+
+
+class _CountingModel:
+    def __init__(self, model):
+        self.model, self.classes_, self.calls = model, model.classes_, 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return self.model.predict_proba(X)
+
+
+def test_warm_up_runs_the_configured_mode_and_word_model(native_bundle):
+    bundle = Bunch(**native_bundle)
+    bundle.word_model = _CountingModel(native_bundle.word_model)
+    bundle.native_model = Bunch(**native_bundle.native_model)
+    bundle.native_model.model = _CountingModel(native_bundle.native_model.model)
+
+    stats = warm_up(bundle, rounds=1)
+    assert stats['paths'] == ['translate', 'word']
+    assert bundle.word_model.calls == stats['languages'] and bundle.native_model.model.calls == 0
+
+    stats = warm_up(bundle, rounds=1, mode='native', cascade_threshold=0.9)
+    assert stats['paths'] == ['translate', 'word', 'native']
+    assert bundle.native_model.model.calls == stats['languages']
@@ -0,0 +1,92 @@
+import csv
+import json
+import os
+import sys
+
+import joblib
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts import predict
+from scripts.conftest import toy_articles
+from scripts.inference import MODEL_FILES, OPTIONAL_MODEL_FILES
+
+
+@pytest.fixture
+def batch(tmp_path, toy_bundle):
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    for name, filename in {**MODEL_FILES, **OPTIONAL_MODEL_FILES}.items():
+        if toy_bundle.get(name) is not None:
+            joblib.dump(toy_bundle[name], models_dir / filename)
+    texts, _ = toy_articles(n=14, seed=21)
+    lines = []
+    for i, text in enumerate(texts):
+        lines.append(text)
+        if i % 4 == 1:
+            lines.append("")
+    source = tmp_path / "articles.txt"
+    source.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def run(*extra):
+        args = predict.build_parser().parse_args(
+            ["--batch", "--input_file", str(source), "--models_dir", str(models_dir), "--chunk_size", "3", *extra])
+        predict.run_batch(args)
+
+    return run, texts, tmp_path
+
+
+def _jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_torn_jsonl_record_is_truncated_on_resume(batch):
+    run, texts, tmp_path = batch
+    output = str(tmp_path / "scores.jsonl")
+    run("--output", output)
+    complete = _jsonl(output)
+    assert [record['index'] for record in complete] == list(range(len(texts)))
+
+    with open(output, "rb") as f:
+        data = f.read()
+    cut = data.rstrip(b"\n").rfind(b"\n") + 1
+    with open(output, "wb") as f:
+        f.write(data[:cut + 10])
+    run("--output", output, "--resume")
+    assert _jsonl(output) == complete
+
+
+def test_csv_resume_keeps_one_header(batch):
+    run, texts, tmp_path = batch
+    output = str(tmp_path / "scores.csv")
+    run("--output", output, "--format", "csv")
+    with open(output, encoding="utf-8") as f:
+        complete = f.read()
+    torn = complete[:complete.rstrip("\n").rfind("\n") + 1] + "12,Fa"
+    with open(output, "w", encoding="utf-8", newline="") as f:
+        f.write(torn)
+    run("--output", output, "--format", "csv", "--resume")
+    with open(output, encoding="utf-8") as f:
+        resumed = f.read()
+    assert resumed == complete
+    rows = list(csv.reader(resumed.splitlines()))
+    assert rows.count(predict.OUTPUT_FIELDS) == 1 and len(rows) == len(texts) + 1
+
+
+def test_offset_counts_articles_not_blank_lines(batch):
+    run, texts, tmp_path = batch
+    full, skipped = str(tmp_path / "full.jsonl"), str(tmp_path / "skipped.jsonl")
+    run("--output", full)
+    run("--output", skipped, "--offset", "5")
+    assert _jsonl(skipped) == _jsonl(full)[5:]
+
+
+def test_workers_keep_input_order(batch):
+    run, texts, tmp_path = batch
+    single, pooled = str(tmp_path / "single.jsonl"), str(tmp_path / "pooled.jsonl")
+    run("--output", single)
+    run("--output", pooled, "--workers", "2")
+    assert [record['index'] for record in _jsonl(pooled)] == list(range(len(texts)))
+    assert _jsonl(pooled) == _jsonl(single)
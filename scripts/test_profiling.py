@@ -0,0 +1,58 @@
+import os
+import sys
+
+from sklearn.utils import Bunch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.conftest import toy_articles
+from scripts.profiling import RequestProfiler, aggregate, list_profiles
+
+
+def _busy():
+    return sum(i * i for i in range(20000))
+
+
+def test_profiles_rotate_and_aggregate(tmp_path):
+    assert RequestProfiler.from_env({}) is None
+    assert RequestProfiler.from_env({'SATYASCAN_PROFILE_RATE': '0'}) is None
+
+    profiler = RequestProfiler(1.0, str(tmp_path), keep=3)
+    for length in range(5):
+        metadata = {'text_length': length, 'language': 'en'}
+        with profiler.profile(metadata):
+            _busy()
+            metadata['status'] = 200
+
+    profiles = list_profiles(str(tmp_path))
+    assert [p['text_length'] for p in profiles] == [2, 3, 4]
+    assert all(p['status'] == 200 and p['wall_ms'] > 0 for p in profiles)
+    assert len(os.listdir(tmp_path)) == 6
+
+    report = aggregate(str(tmp_path), top=50, sort='cumulative')
+    assert report['profiles'] == 3
+    assert any('_busy' in row['function'] for row in report['functions'])
+
+
+def test_analyze_requests_are_profiled(toy_bundle, tmp_path, monkeypatch):
+    import app as webapp
+
+    monkeypatch.setattr(webapp.model_manager, "active", Bunch(**toy_bundle, version="toy"))
+    monkeypatch.setattr(webapp, "duplicate_index", None)
+    monkeypatch.setattr(webapp, "request_profiler", RequestProfiler(1.0, str(tmp_path)))
+    monkeypatch.setenv('SATYASCAN_ADMIN_TOKEN', 's3cret')
+    client = webapp.app.test_client()
+
+    text = toy_articles(n=1)[0][0]
+    assert client.post('/api/analyze', json={'text': text, 'language': 'en'}).status_code == 200
+    assert client.post('/api/analyze', json={'text': ''}).status_code == 400
+
+    assert client.get('/api/admin/profiles').status_code == 403
+    monkeypatch.delenv('SATYASCAN_ADMIN_TOKEN')
+    assert client.get('/api/admin/profiles', headers={'X-Admin-Token': ''}).status_code == 403
+    monkeypatch.setenv('SATYASCAN_ADMIN_TOKEN', 's3cret')
+    body = client.get('/api/admin/profiles?sort=tottime&top=5', headers={'X-Admin-Token': 's3cret'}).get_json()
+    assert [p['status'] for p in body['profiles']] == [200, 400]
+    assert body['profiles'][0]['text_length'] == len(text)
+    assert body['profiles'][0]['model_version'] == "toy"
+    assert body['aggregate']['profiles'] == 2 and len(body['aggregate']['functions']) == 5
@@ -0,0 +1,76 @@
+import os
+import sys
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.calibration import make_calibrated_svm
+from scripts.inference import top_features
+from scripts.quantize import CompactLinearModel, Float32TfidfVectorizer, compact_bundle
+from scripts.char_ngrams import FastCharVectorizer
+
+REAL_WORDS = "govern offici report minist announc parliament economi growth polici data survey research confirm".split()
+FAKE_WORDS = "shock secret miracl cure expos hoax truth click share viral unbeliev".split()
+
+
+def _toy_corpus(n=240, seed=0):
+    rng = np.random.RandomState(seed)
+    texts, labels = [], []
+    for i in range(n):
+        label = i % 2
+        words = REAL_WORDS if label else FAKE_WORDS
+        texts.append(" ".join(rng.choice(words + REAL_WORDS[:3] + FAKE_WORDS[:3], size=rng.randint(10, 40))))
+        labels.append(label)
+    return texts, np.array(labels)
+
+
+def _toy_model():
+    texts, labels = _toy_corpus()
+    word_vectorizer = TfidfVectorizer(ngram_range=(1, 2)).fit(texts)
+    char_vectorizer = TfidfVectorizer(analyzer='char', ngram_range=(3, 5)).fit(texts)
+    X = sparse.hstack([word_vectorizer.transform(texts), char_vectorizer.transform(texts)]).tocsr()
+    model = make_calibrated_svm().fit(X, labels)
+    return texts, word_vectorizer, char_vectorizer, X, model
+
+
+def test_float32_vectorizer_matches_float64():
+    texts, word_vectorizer, char_vectorizer, _, _ = _toy_model()
+    for vectorizer in (word_vectorizer, char_vectorizer, FastCharVectorizer(char_vectorizer)):
+        expected = vectorizer.transform(texts)
+        actual = Float32TfidfVectorizer(vectorizer).transform(texts)
+        assert actual.dtype == np.float32
+        assert np.allclose(actual.toarray(), expected.toarray(), atol=1e-6)
+
+
+def test_compact_model_matches_calibrated_ensemble():
+    _, _, _, X, model = _toy_model()
+    expected = model.predict_proba(X)
+
+    compact64 = CompactLinearModel(model, 'float64')
+    assert np.allclose(compact64.predict_proba(X), expected, atol=1e-12)
+
+    compact32 = CompactLinearModel(model, 'float32')
+    assert compact32.nbytes < compact64.nbytes
+    assert np.allclose(compact32.predict_proba(X.astype(np.float32)), expected, atol=1e-5)
+
+    int8 = CompactLinearModel(model, 'int8', block_size=64)
+    assert int8.coef.dtype == np.int8
+    assert np.allclose(int8.predict_proba(X.astype(np.float32)), expected, atol=2e-2)
+    assert np.mean(int8.predict(X.astype(np.float32)) == model.predict(X)) >= 0.99
+
+
+def test_compact_bundle_keeps_top_features(toy_bundle):
+    expected = top_features(toy_bundle)
+    assert len(expected) == 5
+    float32 = top_features(compact_bundle(toy_bundle, 'float32'))
+    assert [name for name, _ in float32] == [name for name, _ in expected]
+    assert np.allclose([weight for _, weight in float32], [weight for _, weight in expected], atol=1e-6)
+
+    # int8 rounds each weight to a block scale step, so near-ties may swap
+    weights = dict(top_features(toy_bundle, n=10))
+    int8 = top_features(compact_bundle(toy_bundle, 'int8'))
+    assert int8[0][0] == expected[0][0]
+    assert all(name in weights and abs(weight - weights[name]) < 5e-3 for name, weight in int8)
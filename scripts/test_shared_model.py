@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.char_ngrams import fast_char_vectorizer
+from scripts.conftest import fake_translate, toy_articles
+from scripts.inference import predict_batch, prepare_article
+from scripts.shared_model import attach_bundle, export_bundle
+
+
+def test_attached_bundle_matches_pickled_bundle(toy_bundle, tmp_path):
+    export_bundle(toy_bundle, str(tmp_path))
+    shared = attach_bundle(str(tmp_path))
+    texts, _ = toy_articles(n=12, seed=9)
+    articles = [prepare_article(text, 'en', fake_translate) for text in texts + [""]]
+    words = [article.cleaned_text for article in articles]
+    chars = [article.char_text for article in articles]
+
+    assert np.allclose(toy_bundle.word_vectorizer.transform(words).toarray(),
+                       shared.word_vectorizer.transform(words).toarray(), atol=1e-12)
+    assert np.allclose(fast_char_vectorizer(toy_bundle.char_vectorizer).transform(chars).toarray(),
+                       shared.char_vectorizer.transform(chars).toarray(), atol=1e-12)
+    expected = predict_batch(toy_bundle, texts, translate=fake_translate)
+    actual = predict_batch(shared, texts, translate=fake_translate)
+    assert [r['is_fake'] for r in expected] == [r['is_fake'] for r in actual]
+    assert np.allclose([r['confidence'] for r in expected], [r['confidence'] for r in actual])
+
+
+def test_attached_arrays_are_read_only_maps(toy_bundle, tmp_path):
+    export_bundle(toy_bundle, str(tmp_path), precision='float32')
+    shared = attach_bundle(str(tmp_path))
+    for array in (shared.word_vectorizer.terms, shared.word_vectorizer.idf, shared.model.coef):
+        assert isinstance(array, np.memmap)
+        assert not array.flags.writeable
+    assert shared.model.coef.dtype == np.float32
@@ -0,0 +1,102 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.translation import ChunkedTranslator, TranslationError, chunk_text
+
+
+class FakeProvider:
+    """Rejects requests above limit characters and sleeps latency seconds per call"""
+
+    def __init__(self, limit, latency, fail_on=None):
+        self.limit = limit
+        self.latency = latency
+        self.fail_on = fail_on
+        self.calls = 0
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, text, source):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if len(text) > self.limit:
+                raise ValueError(f"{len(text)} characters exceeds the {self.limit} limit")
+            time.sleep(self.latency)
+            if self.fail_on and self.fail_on in text:
+                raise ConnectionError("provider error")
+            return f"<{source}:{text}>"
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def _article(sentences=40):
+    return "".join(f"यह वाक्य संख्या {i} है और इसमें कुछ शब्द हैं। " for i in range(sentences))
+
+
+def test_chunks_respect_limit_and_sentence_boundaries():
+    text = _article() + "Unterminated tail " + "x" * 300
+    chunks = chunk_text(text, 200)
+    assert "".join(chunks) == text
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert all(chunk.rstrip().endswith("।") for chunk in chunks[:-3])
+
+
+def test_parallel_translation_keeps_order_and_beats_serial():
+    provider = FakeProvider(limit=200, latency=0.05)
+    translator = ChunkedTranslator(provider, max_chars=200, workers=8)
+    text = _article()
+    started = time.perf_counter()
+    translated, n_chunks, failed = translator.translate_chunks(text, 'hi')
+    elapsed = time.perf_counter() - started
+
+    assert not failed and n_chunks == provider.calls > 4
+    expected = "".join(f"<hi:{chunk.rstrip()}>" + chunk[len(chunk.rstrip()):] for chunk in chunk_text(text, 200))
+    assert translated == expected
+    assert provider.peak > 1
+    assert elapsed < n_chunks * provider.latency / 2
+
+
+def test_failures_are_per_chunk():
+    provider = FakeProvider(limit=200, latency=0.0, fail_on="संख्या 7 ")
+    translator = ChunkedTranslator(provider, max_chars=200, workers=4)
+    text = _article()
+    translated, n_chunks, failed = translator.translate_chunks(text, 'hi')
+    assert len(failed) == 1
+    assert chunk_text(text, 200)[failed[0]] in translated
+    assert translated.count("<hi:") == n_chunks - 1
+
+    slow = ChunkedTranslator(FakeProvider(limit=200, latency=0.5), max_chars=200, workers=4, timeout=0.05)
+    with pytest.raises(TranslationError):
+        slow(text, 'hi')
+
+
+def test_concurrent_calls_do_not_share_threads():
+    provider = FakeProvider(limit=200, latency=0.1)
+    translator = ChunkedTranslator(provider, max_chars=200, workers=4)
+    text = _article(16)
+    assert len(chunk_text(text, 200)) == 4
+    threads = [threading.Thread(target=translator, args=(text, 'hi')) for _ in range(4)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert provider.calls == 16 and provider.peak > 4
+    assert time.perf_counter() - started < 0.3
+
+
+def test_timeout_applies_to_a_single_chunk():
+    slow = ChunkedTranslator(FakeProvider(limit=200, latency=0.5), max_chars=200, timeout=0.05)
+    started = time.perf_counter()
+    with pytest.raises(TranslationError):
+        slow("एक छोटा लेख।", 'hi')
+    assert time.perf_counter() - started < 0.3
@@ -0,0 +1,137 @@
+"""
+Chunked, concurrent translation of long articles.
+
+The translation provider rejects requests above a few thousand characters,
+and one long call is slow. ChunkedTranslator splits the text at sentence
+boundaries (including the Devanagari danda and Urdu full stop) into
+provider-sized chunks. Each call translates its chunks on a thread pool of
+its own, so concurrent requests do not queue behind each other's chunks,
+and joins them back in their original order. A chunk that fails or times out
+keeps its original text, so one bad chunk does not discard the rest. Only
+when every chunk fails does the call raise, and the caller then falls back
+to the untranslated article as before.
+
+    SATYASCAN_TRANSLATE_CHUNK_CHARS   characters per provider request (default 4500)
+    SATYASCAN_TRANSLATE_WORKERS       chunks of one article translated concurrently (default 4)
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from deep_translator import GoogleTranslator
+
+DEFAULT_CHUNK_CHARS = int(os.environ.get('SATYASCAN_TRANSLATE_CHUNK_CHARS', 4500))
+DEFAULT_WORKERS = int(os.environ.get('SATYASCAN_TRANSLATE_WORKERS', 4))
+
+_SENTENCE = re.compile(r"(?:[^.!?।॥۔؟\n]|[.!?।॥۔؟](?![.!?।॥۔؟]*(?:\s|$)))*(?:[.!?।॥۔؟]+|\n|$)\s*")
+
+
+class TranslationError(Exception):
+    pass
+
+
+def split_sentences(text):
+    """Split text after sentence-ending punctuation or newlines, keeping trailing whitespace"""
+    return [sentence for sentence in _SENTENCE.findall(text) if sentence]
+
+
+def _split_long(piece, max_chars):
+    """Split a piece longer than max_chars at whitespace, or hard-split unbroken runs"""
+    parts, current = [], ""
+    for word in re.findall(r"\S+\s*", piece):
+        while len(word) > max_chars:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(word[:max_chars])
+            word = word[max_chars:]
+        if len(current) + len(word) > max_chars:
+            parts.append(current)
+            current = ""
+        current += word
+    if current:
+        parts.append(current)
+    return parts
+
+
+def chunk_text(text, max_chars=DEFAULT_CHUNK_CHARS):
+    """Pack whole sentences into chunks of at most max_chars; "".join(chunks) == text"""
+    chunks, current = [], ""
+    for sentence in split_sentences(text):
+        pieces = [sentence] if len(sentence) <= max_chars else _split_long(sentence, max_chars)
+        for piece in pieces:
+            if current and len(current) + len(piece) > max_chars:
+                chunks.append(current)
+                current = ""
+            current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def google_translate_chunk(text, source):
+    return GoogleTranslator(source=source, target='en').translate(text)
+
+
+class ChunkedTranslator:
+    """translate(text, source) that sends provider-sized chunks concurrently.
+
+    timeout bounds the whole call, single-chunk texts included. Without an
+    executor, every call gets up to `workers` threads of its own; the
+    admission translate slots already bound how many calls run at once.
+    """
+
+    def __init__(self, translate_chunk=google_translate_chunk, max_chars=DEFAULT_CHUNK_CHARS,
+                 workers=DEFAULT_WORKERS, timeout=None, executor=None):
+        self.translate_chunk = translate_chunk
+        self.max_chars = max_chars
+        self.workers = workers
+        self.timeout = timeout
+        self.executor = executor
+
+    def _translate_one(self, chunk, source):
+        body = chunk.rstrip()
+        if not body.strip():
+            return chunk
+        translated = self.translate_chunk(body, source)
+        if not translated:
+            raise TranslationError("empty translation")
+        return translated + chunk[len(body):]
+
+    def translate_chunks(self, text, source):
+        """Return (translated_text, number_of_chunks, failed_chunk_indices)"""
+        chunks = chunk_text(text, self.max_chars)
+        if not chunks or (len(chunks) == 1 and self.timeout is None):
+            try:
+                return self._translate_one(text, source), len(chunks), []
+            except Exception:
+                return text, len(chunks), [0]
+
+        executor = self.executor or ThreadPoolExecutor(max_workers=min(self.workers, len(chunks)),
+                                                       thread_name_prefix="translate")
+        try:
+            futures = [executor.submit(self._translate_one, chunk, source) for chunk in chunks]
+            wait(futures, timeout=self.timeout)
+            translated, failed = [], []
+            for i, (chunk, future) in enumerate(zip(chunks, futures)):
+                if future.done() and future.exception() is None:
+                    translated.append(future.result())
+                else:
+                    future.cancel()
+                    translated.append(chunk)
+                    failed.append(i)
+        finally:
+            if self.executor is None:
+                # A timed-out chunk finishes on its thread in the background
+                executor.shutdown(wait=False)
+        return "".join(translated), len(chunks), failed
+
+    def __call__(self, text, source):
+        translated, n_chunks, failed = self.translate_chunks(text, source)
+        if failed and len(failed) == n_chunks:
+            raise TranslationError(f"all {n_chunks} chunks failed to translate")
+        return translated
+
+
+google_translate = ChunkedTranslator()
@@ -1,6 +1,7 @@
 import re
+from functools import lru_cache
 from langdetect import detect
-from deep_translator import GoogleTranslator
+from scripts.translation import google_translate
 from nltk.stem import SnowballStemmer
 from nltk.corpus import stopwords
 from textblob import TextBlob
@@ -8,6 +9,9 @@ from textblob import TextBlob
 import nltk
 nltk.download('stopwords')
 
+# Supported Indian languages
+SUPPORTED_LANGUAGES = ['en', 'hi', 'mr', 'ta', 'te', 'bn', 'gu', 'kn', 'ml', 'pa', 'or', 'ur', 'as']
+
 def extract_features(text):
     """Extract additional features from text"""
    
@@ -65,25 +69,35 @@ def preprocess_text(text):
     except:
         lang = "unknown"
 
-    # Supported Indian languages
-    supported_languages = ['en', 'hi', 'mr', 'ta', 'te', 'bn', 'gu', 'kn', 'ml', 'pa', 'or', 'ur', 'as']
-    if lang not in supported_languages:
+    if lang not in SUPPORTED_LANGUAGES:
         return "", "unsupported"
 
     if lang != 'en':
         try:
-            text = GoogleTranslator(source='auto', target='en').translate(text)
+            text = google_translate(text, 'auto')
         except:
             return "", lang
 
+    return clean_text(text), lang
+
+@lru_cache(maxsize=1)
+def _english_stopwords():
+    return frozenset(stopwords.words('english'))
+
+@lru_cache(maxsize=1)
+def _english_stemmer():
+    return SnowballStemmer("english")
+
+def clean_text(text):
+    """Normalize English text the way the vectorizers were trained on"""
     text = text.lower()
     text = re.sub(r'[^\w\s]', '', text)
     text = re.sub(r'\d+', '', text)
 
-    stop_words = set(stopwords.words('english'))
+    stop_words = _english_stopwords()
     text = " ".join([word for word in text.split() if word not in stop_words])
 
-    stemmer = SnowballStemmer("english")
+    stemmer = _english_stemmer()
     text = " ".join([stemmer.stem(word) for word in text.split()])
 
-    return text, lang
+    return text
@@ -0,0 +1,97 @@
+"""
+Warm up a freshly loaded model bundle before it serves traffic.
+
+The first analysis in a process pays for langdetect profile loading, the
+TextBlob lexicon, NLTK stopwords and the stemmer, lazy imports inside
+sklearn/scipy and first-touch page faults on the large model arrays.
+warm_up runs the full pipeline on one sample article per supported
+language, with the translator stubbed so no network call is made, and
+repeats the pass to confirm latency has settled. Every model a request
+can reach is exercised: the word-only model (cascade and deadline
+fallback) when the bundle has one, and the native model when the server
+scores in native mode.
+"""
+
+import time
+
+import numpy as np
+
+from scripts.inference import analyze_article
+from scripts.native import analyze_native
+
+SAMPLE_TEXTS = {
+    'en': "The finance minister announced a new policy on Tuesday. Officials confirmed the report, "
+          "but viral posts claimed a shocking secret was being hidden!",
+    'hi': "नई दिल्ली में आज एक नई मेट्रो लाइन का उद्घाटन किया गया। यह लाइन शहर के पूर्वी और पश्चिमी हिस्सों को जोड़ेगी।",
+    'mr': "वैज्ञानिकांनी आपल्या सौरमंडळात नवीन ग्रह शोधला. ही शोध प्रगत दुर्बिणींचा वापर करून केली गेली.",
+    'ta': "சென்னையில் இன்று புதிய மெட்ரோ ரயில் பாதை திறக்கப்பட்டது. இது நகரின் இரண்டு பகுதிகளை இணைக்கும்.",
+    'te': "హైదరాబాద్‌లో ఈరోజు కొత్త మెట్రో మార్గాన్ని ప్రారంభించారు. ఇది నగరంలోని రెండు ప్రాంతాలను కలుపుతుంది.",
+    'bn': "কলকাতায় আজ একটি নতুন মেট্রো লাইনের উদ্বোধন করা হয়েছে। এটি শহরের দুই অংশকে যুক্ত করবে।",
+    'gu': "અમદાવાદમાં આજે નવી મેટ્રો લાઇનનું ઉદ્ઘાટન કરવામાં આવ્યું. તે શહેરના બે ભાગોને જોડશે.",
+    'kn': "ಬೆಂಗಳೂರಿನಲ್ಲಿ ಇಂದು ಹೊಸ ಮೆಟ್ರೋ ಮಾರ್ಗವನ್ನು ಉದ್ಘಾಟಿಸಲಾಯಿತು. ಇದು ನಗರದ ಎರಡು ಭಾಗಗಳನ್ನು ಸಂಪರ್ಕಿಸುತ್ತದೆ.",
+    'ml': "കൊച്ചിയിൽ ഇന്ന് പുതിയ മെട്രോ പാത ഉദ്ഘാടനം ചെയ്തു. ഇത് നഗരത്തിന്റെ രണ്ട് ഭാഗങ്ങളെ ബന്ധിപ്പിക്കും.",
+    'pa': "ਅੰਮ੍ਰਿਤਸਰ ਵਿੱਚ ਅੱਜ ਇੱਕ ਨਵੀਂ ਸੜਕ ਦਾ ਉਦਘਾਟਨ ਕੀਤਾ ਗਿਆ। ਇਹ ਸ਼ਹਿਰ ਦੇ ਦੋ ਹਿੱਸਿਆਂ ਨੂੰ ਜੋੜੇਗੀ।",
+    'or': "ଭୁବନେଶ୍ୱରରେ ଆଜି ଏକ ନୂଆ ରାସ୍ତା ଉଦ୍ଘାଟନ କରାଗଲା। ଏହା ସହରର ଦୁଇ ଭାଗକୁ ଯୋଡିବ।",
+    'ur': "لاہور میں آج ایک نئی میٹرو لائن کا افتتاح کیا گیا۔ یہ شہر کے دو حصوں کو جوڑے گی۔",
+    'as': "গুৱাহাটীত আজি এটা নতুন দলঙৰ উদ্বোধন কৰা হ'ল। ই চহৰখনৰ দুটা অংশ সংযোগ কৰিব।",
+}
+
+
+def _stub_translate(text, source):
+    return SAMPLE_TEXTS['en']
+
+
+def _touch(array):
+    """Read one value per page so the array is resident before the first request"""
+    if isinstance(array, np.ndarray) and array.size:
+        step = max(4096 // max(array.itemsize, 1), 1)
+        return float(array.reshape(-1)[::step].sum())
+    return 0.0
+
+
+def _touch_model_arrays(bundle, native=False):
+    arrays = [getattr(bundle.char_vectorizer, name, None) for name in ('keys', 'columns', 'alphabet')]
+    vectorizers = [bundle.word_vectorizer, bundle.char_vectorizer]
+    models = [bundle.model, bundle.get('word_model')]
+    if native:
+        vectorizers.append(bundle.native_model.char_vectorizer)
+        models.append(bundle.native_model.model)
+    for vectorizer in vectorizers:
+        arrays.append(getattr(vectorizer, 'idf', None))
+        arrays.append(getattr(getattr(vectorizer, 'vectorizer', vectorizer), 'idf_', None))
+    for model in models:
+        arrays.append(getattr(model, 'coef', None))
+        for fold in getattr(model, 'calibrated_classifiers_', []):
+            arrays.append(getattr(fold.estimator, 'coef_', None))
+    for array in arrays:
+        _touch(array)
+
+
+def warm_up(bundle, rounds=2, translate=_stub_translate, mode='translate', cascade_threshold=None):
+    """Exercise every serving path on every sample language; returns timing stats.
+
+    mode and cascade_threshold are the server's SATYASCAN_SCORING_MODE and
+    SATYASCAN_CASCADE_THRESHOLD, so /api/ready only turns true once the
+    models those requests use have run.
+    """
+    native = mode == 'native' and bundle.get('native_model') is not None
+    word = bundle.get('word_model') is not None
+    # A threshold of 1.0 runs the word model and then the full model on every sample
+    threshold = (cascade_threshold or 1.0) if word else None
+    started = time.perf_counter()
+    _touch_model_arrays(bundle, native)
+    passes = []
+    for _ in range(rounds):
+        pass_started = time.perf_counter()
+        for language, text in SAMPLE_TEXTS.items():
+            analyze_article(bundle, text, 'auto', translate=translate, cascade_threshold=threshold)
+            if native:
+                analyze_native(bundle, text, 'auto', translate=translate)
+        passes.append((time.perf_counter() - pass_started) / len(SAMPLE_TEXTS))
+    return {
+        'seconds': time.perf_counter() - started,
+        'languages': len(SAMPLE_TEXTS),
+        'paths': ['translate'] + ['word'] * word + ['native'] * native,
+        'first_pass_ms': 1000 * passes[0],
+        'steady_ms': 1000 * passes[-1],
+    }